@@ -0,0 +1,397 @@
+"""Asyncio-native counterpart to `github_checks.github_api`, based on aiohttp.
+
+Requires the optional `async` dependencies: `pip install github-checks[async]`.
+"""
+
+import asyncio
+import logging
+import time
+from collections.abc import AsyncIterator
+from contextlib import asynccontextmanager, nullcontext
+from pathlib import Path
+from types import TracebackType
+from typing import Any, Self
+from urllib.parse import ParseResult, urlparse
+
+from aiohttp import (
+    ClientConnectionError,
+    ClientResponse,
+    ClientSession,
+    ClientTimeout,
+    TCPConnector,
+)
+
+from github_checks.constants import DEFAULT_MAX_BATCH_BYTES
+from github_checks.github_api import (
+    RequestScheduler,
+    _backoff_delay,
+    _CheckRunUpdateEncoder,
+    _gen_github_timestamp,
+    _generate_app_jwt_from_pem,
+    _get_jwt_headers,
+    _infer_conclusion,
+    _parse_github_timestamp,
+)
+from github_checks.models import CheckRunConclusion, CheckRunOutput
+
+
+async def _is_rate_limited(response: ClientResponse) -> bool:
+    """Check whether GitHub rejected a request due to (secondary) rate limiting."""
+    if response.status == 429:  # noqa: PLR2004
+        return True
+    if response.status != 403:  # noqa: PLR2004
+        return False
+    # 403 is also used for plain permission issues, which retrying won't fix
+    return (
+        "Retry-After" in response.headers
+        or response.headers.get("X-RateLimit-Remaining") == "0"
+        or "rate limit" in (await response.text()).lower()
+    )
+
+
+class AsyncGitHubChecks:
+    """Asyncio handler to start, update & finish Check runs for a GitHub repo.
+
+    In contrast to `GitHubChecks`, one instance can drive any number of check runs
+    concurrently on the same event loop, so check runs are identified by the run ID
+    returned from `start_check_run` instead of being tracked as the "current" run.
+    All requests share one pooled connection, and are retried like those of the
+    `RequestScheduler`. Use it as an async context manager:
+
+    ```python
+    async with AsyncGitHubChecks(...) as gh_checks:
+        run_id = await gh_checks.start_check_run(sha, "ruff-checks")
+        await gh_checks.finish_check_run(run_id, output=output)
+    ```
+    """
+
+    repo_base_url: str
+    github_api_base_url: str
+    app_install_access_token: str
+    app_id: str
+    app_installation_id: str
+    app_privkey_pem: Path
+    gh_api_timeout: int
+    max_retries: int
+    backoff_base_seconds: float
+    backoff_cap_seconds: float
+    time_to_reauth: float = 0
+    _api_headers: dict[str, str]
+    _check_names: dict[str, str]
+    _max_connections: int
+    _github_session: ClientSession | None = None
+    _auth_lock: asyncio.Lock
+    _logger: logging.Logger
+
+    def __init__(  # noqa: PLR0913
+        self,
+        repo_base_url: str,
+        app_id: str,
+        app_installation_id: str,
+        app_privkey_pem: Path,
+        gh_api_timeout: int = 10,
+        logger: logging.Logger | None = None,
+        github_api_base_url: str | None = None,
+        max_connections: int = 10,
+        *,
+        max_retries: int = 5,
+        backoff_base_seconds: float = 1,
+        backoff_cap_seconds: float = 60,
+    ) -> None:
+        """Initialize the client, authentication only happens once the session opens.
+
+        :param repo_base_url: the base URL of the repository to run a check for
+        :param app_id: ID of your app, e.g. found in the URL path of your App config
+        :param app_installation_id: ID of the App's installation to the repo
+        :param app_privkey_pem: private key provided by GitHub for this app, PEM format
+        :param gh_api_timeout: API request timeout in seconds, optional, defaults to 10
+        :param github_api_base_url: override for the API URL, optional, by default
+            derived from the repo base URL (e.g. https://api.github.com)
+        :param max_connections: size of the connection pool, optional, defaults to 10
+        :param max_retries: max. number of retries per request, optional
+        :param backoff_base_seconds: delay before the first retry, doubled per retry
+        :param backoff_cap_seconds: upper bound for the delay between retries
+        :raises ValueError: if the repository base URL is invalid
+        """
+        self._logger = logger or logging.getLogger(__name__)
+        self.app_id = app_id
+        self.app_installation_id = app_installation_id
+        self.app_privkey_pem = app_privkey_pem
+        self.gh_api_timeout = gh_api_timeout
+        self._max_connections = max_connections
+        self.max_retries = max_retries
+        self.backoff_base_seconds = backoff_base_seconds
+        self.backoff_cap_seconds = backoff_cap_seconds
+        self._check_names = {}
+        self._auth_lock = asyncio.Lock()
+
+        url_parts: ParseResult = urlparse(repo_base_url)
+        if not url_parts.scheme or not url_parts.netloc or not url_parts.path:
+            msg = f"Invalid GitHub repository base URL provided: {repo_base_url}"
+            raise ValueError(msg)
+        self.github_api_base_url = (
+            github_api_base_url or f"{url_parts.scheme}://api.{url_parts.netloc}"
+        )
+        self.repo_base_url = f"{self.github_api_base_url}/repos{url_parts.path}"
+
+    async def __aenter__(self) -> Self:
+        """Open the pooled session and authenticate as the GitHub App installation."""
+        await self.open()
+        return self
+
+    async def __aexit__(
+        self,
+        exc_type: type[BaseException] | None,
+        exc_val: BaseException | None,
+        exc_tb: TracebackType | None,
+    ) -> None:
+        """Close the pooled session."""
+        await self.close()
+
+    async def open(self) -> None:
+        """Open the pooled session and authenticate as the GitHub App installation."""
+        if self._github_session is None:
+            self._github_session = ClientSession(
+                connector=TCPConnector(limit=self._max_connections),
+                timeout=ClientTimeout(total=self.gh_api_timeout),
+            )
+        await self.auth()
+
+    async def close(self) -> None:
+        """Close the pooled session, releasing all of its connections."""
+        if self._github_session is not None:
+            await self._github_session.close()
+            self._github_session = None
+
+    @property
+    def _session(self) -> ClientSession:
+        if self._github_session is None:
+            msg = "Session is not open, use `async with` or call `open()` first."
+            raise RuntimeError(msg)
+        return self._github_session
+
+    async def auth(self) -> None:
+        """Authenticate the session as the GitHub App installation.
+
+        :raises ClientResponseError: in case the GitHub API rejected the app JWT
+        """
+        # see GitHubChecks.auth for the reasoning behind the conservative JWT TTL
+        app_jwt: str = _generate_app_jwt_from_pem(
+            self.app_privkey_pem,
+            self.app_id,
+            ttl_seconds=570,
+        )
+        async with self._request(
+            "POST",
+            f"{self.github_api_base_url}/app/installations/"
+            f"{self.app_installation_id}/access_tokens",
+            headers=_get_jwt_headers(app_jwt, "application/vnd.github+json"),
+        ) as response:
+            if not response.ok:
+                self._logger.critical(
+                    "GitHub API responded with error code while authenticating: "
+                    "%d - %s",
+                    response.status,
+                    await response.text(),
+                )
+            response.raise_for_status()
+            response_json = await response.json()
+
+        self.app_install_access_token = str(response_json.get("token"))
+        expiry_datetime_str = str(response_json.get("expires_at"))
+        # installation access tokens should last 1h, re-auth 30s earlier to be safe
+        self.time_to_reauth = _parse_github_timestamp(expiry_datetime_str) - 30
+        self._api_headers = _get_jwt_headers(
+            self.app_install_access_token,
+            "application/vnd.github+json",
+        )
+        self._logger.info(
+            "Authenticated as GitHub App installation successfully, token expires at "
+            "%s UTC.",
+            expiry_datetime_str.rstrip("Z"),
+        )
+
+    async def _reauth_if_expiring(self) -> None:
+        """Re-authenticate if our token is about to expire (once for all tasks)."""
+        if time.time() < self.time_to_reauth:
+            return
+        async with self._auth_lock:
+            # another task may have refreshed the token while we were waiting
+            if time.time() >= self.time_to_reauth:
+                await self.auth()
+
+    async def start_check_run(self, revision_sha: str, check_name: str) -> str:
+        """Start a run of this check.
+
+        :param revision_sha: the sha revision being evaluated by this check run
+        :param check_name: the name to be used for this specific check
+        :return: the ID of the started check run, to be passed to `finish_check_run`
+        :raises ClientResponseError: in case the GitHub API could not start the run
+        """
+        await self._reauth_if_expiring()
+        json_payload: dict[str, str] = {
+            "name": check_name,
+            "head_sha": revision_sha,
+            "status": "in_progress",
+            "started_at": _gen_github_timestamp(),
+        }
+        async with self._request(
+            "POST",
+            f"{self.repo_base_url}/check-runs",
+            json=json_payload,
+            headers=self._api_headers,
+        ) as response:
+            if not response.ok:
+                self._logger.critical(
+                    "GitHub API responded with error code while attempting to start "
+                    "check run: %d - %s",
+                    response.status,
+                    await response.text(),
+                )
+            response.raise_for_status()
+            run_id = str((await response.json()).get("id"))
+
+        self._check_names[run_id] = check_name
+        return run_id
+
+    async def finish_check_run(
+        self,
+        run_id: str,
+        conclusion: CheckRunConclusion | None = None,
+        output: CheckRunOutput | None = None,
+        *,
+        max_concurrency: int = 4,
+        max_batch_bytes: int | None = DEFAULT_MAX_BATCH_BYTES,
+    ) -> None:
+        """Finish the given check run.
+
+        If no conclusion is specified, `action_required` is chosen in case of any
+        `failure`-level annotations, and `success` otherwise. All but the final batch
+        of annotations are uploaded concurrently, the final batch sets the conclusion.
+
+        :param run_id: the ID of the check run, as returned by `start_check_run`
+        :param conclusion: the overall success, to be fed back for PR approval, optional
+        :param output: the results of this check run, for annotating a PR, optional
+        :param max_concurrency: max. number of concurrent annotation uploads, optional
+        :param max_batch_bytes: max. size of each request body, optional, defaults to
+            1 MiB, `None` only limits the number of annotations per request
+        :raises KeyError: if the check run was not started through this instance
+        :raises ClientResponseError: in case the GitHub API rejected any update
+        """
+        check_name = self._check_names[run_id]
+        if not output:
+            # set a minimal output, in case e.g. only a conclusion was passed
+            output = CheckRunOutput(
+                title=check_name,
+                summary=f"Check {check_name} completed.",
+            )
+
+        if not conclusion:
+            if output.annotations:
+                conclusion = _infer_conclusion(output.annotations)
+            else:
+                conclusion = CheckRunConclusion.NEUTRAL
+
+        encoder = _CheckRunUpdateEncoder(check_name, output)
+        final_batch: list[bytes] | None = None
+        if encoder.encoded_annotations:
+            packed_batches, in_order_batches = encoder.batches(max_batch_bytes)
+            if len(packed_batches) < in_order_batches:
+                self._logger.info(
+                    "Packed %d annotations into %d batches, saving %d requests.",
+                    len(encoder.encoded_annotations),
+                    len(packed_batches),
+                    in_order_batches - len(packed_batches),
+                )
+            *batches, final_batch = packed_batches
+            semaphore = asyncio.Semaphore(max_concurrency)
+            async with asyncio.TaskGroup() as task_group:
+                for batch in batches:
+                    task_group.create_task(
+                        self._post_check_run_update(
+                            run_id,
+                            encoder.body(batch),
+                            semaphore,
+                        ),
+                    )
+
+        # the conclusion is only set with the final batch, completing the run
+        await self._post_check_run_update(
+            run_id,
+            encoder.body(final_batch, conclusion),
+        )
+        del self._check_names[run_id]
+
+    async def _post_check_run_update(
+        self,
+        run_id: str,
+        body: bytes,
+        semaphore: asyncio.Semaphore | None = None,
+    ) -> None:
+        """PATCH the given check run with an already encoded JSON body."""
+        await self._reauth_if_expiring()
+        async with self._request(
+            "PATCH",
+            f"{self.repo_base_url}/check-runs/{run_id}",
+            semaphore,
+            data=body,
+            headers={**self._api_headers, "Content-Type": "application/json"},
+        ) as response:
+            response.raise_for_status()
+
+    @asynccontextmanager
+    async def _request(
+        self,
+        method: str,
+        url: str,
+        semaphore: asyncio.Semaphore | None = None,
+        **kwargs: Any,  # noqa: ANN401
+    ) -> AsyncIterator[ClientResponse]:
+        """Send a request, retrying it like `RequestScheduler.send` does.
+
+        Requests rejected due to rate limiting or server errors, as well as those
+        failing with connection errors, are retried with jittered exponential backoff.
+
+        :param method: the HTTP method of the request
+        :param url: the URL to send the request to
+        :param semaphore: bounds the number of requests in flight, optional
+        :param kwargs: any further arguments for `ClientSession.request`
+        :return: the final response, which may still be an unsuccessful one
+        :raises ClientConnectionError: if the request failed on each of the retries
+        :raises TimeoutError: if the request timed out on each of the retries
+        """
+        for attempt in range(self.max_retries + 1):
+            delay = _backoff_delay(
+                attempt,
+                self.backoff_base_seconds,
+                self.backoff_cap_seconds,
+            )
+            try:
+                async with semaphore or nullcontext():
+                    response = await self._session.request(method, url, **kwargs)
+            except (ClientConnectionError, TimeoutError):
+                if attempt == self.max_retries:
+                    raise
+            else:
+                throttled = await _is_rate_limited(response)
+                if attempt == self.max_retries or not (
+                    throttled
+                    or response.status in RequestScheduler.RETRYABLE_STATUS_CODES
+                ):
+                    try:
+                        yield response
+                    finally:
+                        response.release()
+                    return
+                retry_after = response.headers.get("Retry-After", "")
+                delay = max(delay, float(retry_after) if retry_after.isdigit() else 0)
+                response.release()
+            self._logger.warning(
+                "GitHub API request %s %s failed, retrying in %.1fs (retry %d of %d).",
+                method,
+                url,
+                delay,
+                attempt + 1,
+                self.max_retries,
+            )
+            await asyncio.sleep(delay)
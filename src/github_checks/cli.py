@@ -1,22 +1,29 @@
 """Provides an interface to run the checks directly, without any proxy Python code."""
 
+import atexit
+import glob
+import json
 import logging
 import os
 import pickle
+import re
+import socket
 import sys
+from importlib import import_module
 from pathlib import Path
-from typing import Protocol, cast
+from typing import TYPE_CHECKING, Any, NamedTuple, Protocol, cast
 
-from configargparse import ArgumentParser
+from configargparse import ArgumentParser, Namespace
 
-from github_checks.formatters.check_jsonschema import format_jsonschema_check_run_output
-from github_checks.formatters.mypy import format_mypy_check_run_output
-from github_checks.formatters.pyright import format_pyright_check_run_output
-from github_checks.formatters.raw import format_raw_check_run_output
-from github_checks.formatters.ruff import format_ruff_check_run_output
-from github_checks.formatters.sarif import format_sarif_check_run_output
-from github_checks.github_api import GitHubChecks
-from github_checks.models import CheckRunConclusion, CheckRunOutput
+from github_checks.constants import DEFAULT_MAX_BATCH_BYTES, CheckRunConclusion
+
+# everything else is imported lazily, such that the commands are cheap to run as thin
+# clients of a `serve` daemon, which keeps the session, pool & formatters loaded
+if TYPE_CHECKING:
+    from collections.abc import Callable, Sequence
+
+    from github_checks.github_api import GitHubChecks
+    from github_checks.models import CheckAnnotation, CheckRunOutput
 
 LOGGER = logging.getLogger(__name__)
 
@@ -31,20 +38,58 @@ class LogOutputFormatter(Protocol):
         *,
         ignored_globs: list[str] | None = None,
         mute_ignored_annotations: bool = False,
-    ) -> tuple[CheckRunOutput, CheckRunConclusion]: ...
+    ) -> "tuple[CheckRunOutput, CheckRunConclusion]": ...
+
+
+# formatter per log format, as `<module in github_checks.formatters>:<function>`
+LOG_OUTPUT_FORMATTERS: dict[str, str] = {
+    "check-jsonschema": "check_jsonschema:format_jsonschema_check_run_output",
+    "ruff-json": "ruff:format_ruff_check_run_output",
+    "mypy-json": "mypy:format_mypy_check_run_output",
+    "pyright-json": "pyright:format_pyright_check_run_output",
+    "sarif": "sarif:format_sarif_check_run_output",
+    "raw": "raw:format_raw_check_run_output",
+}
+
+
+class LineAnnotationParser(Protocol):
+    """Protocol for parsers of a single line of a line-based log output."""
+
+    def __call__(  # noqa: D102
+        self,
+        line: str,
+        local_repo_base: Path | None = None,
+    ) -> "CheckAnnotation | None": ...
 
 
-LOG_OUTPUT_FORMATTERS: dict[str, LogOutputFormatter] = {
-    "check-jsonschema": format_jsonschema_check_run_output,
-    "ruff-json": format_ruff_check_run_output,
-    "mypy-json": format_mypy_check_run_output,
-    "pyright-json": format_pyright_check_run_output,
-    "sarif": format_sarif_check_run_output,
-    "raw": format_raw_check_run_output,
+class ValidationLog(NamedTuple):
+    """A log to format, along with its format, one of `LOG_OUTPUT_FORMATTERS`."""
+
+    path: Path
+    log_format: str
+
+
+# line parser per line-based log format, which `watch` can follow while it's written
+LINE_ANNOTATION_PARSERS: dict[str, str] = {
+    "mypy-json": "mypy:parse_mypy_json_line",
 }
 
 
-def unpickle(pickle_fp: Path, err_msg: str) -> GitHubChecks:
+def load_log_output_formatter(log_format: str) -> LogOutputFormatter:
+    """Import the formatter for the given log format."""
+    module_name, function_name = LOG_OUTPUT_FORMATTERS[log_format].split(":")
+    module = import_module(f"github_checks.formatters.{module_name}")
+    return cast("LogOutputFormatter", getattr(module, function_name))
+
+
+def load_line_annotation_parser(log_format: str) -> LineAnnotationParser:
+    """Import the line parser for the given line-based log format."""
+    module_name, function_name = LINE_ANNOTATION_PARSERS[log_format].split(":")
+    module = import_module(f"github_checks.formatters.{module_name}")
+    return cast("LineAnnotationParser", getattr(module, function_name))
+
+
+def unpickle(pickle_fp: Path, err_msg: str) -> "GitHubChecks":
     """Attempt to read the current checks session from the pickle file."""
     if not pickle_fp.exists():
         LOGGER.critical(err_msg)
@@ -53,7 +98,396 @@ def unpickle(pickle_fp: Path, err_msg: str) -> GitHubChecks:
         return cast("GitHubChecks", pickle.load(pickle_file))  # noqa: S301
 
 
-def main() -> None:  # noqa: C901, PLR0915
+def _safe_check_name(check_name: str) -> str:
+    """Make the check name usable as part of a file name."""
+    return re.sub(r"[^\w-]", "_", check_name)
+
+
+def upload_journal_filepath(pickle_fp: Path, check_name: str | None = None) -> Path:
+    """Get the file recording the upload progress of check runs of this session.
+
+    Check runs finished by name get a journal of their own, as they may be finished
+    concurrently.
+    """
+    if check_name is None:
+        return pickle_fp.with_suffix(".journal.json")
+    return pickle_fp.with_suffix(f".{_safe_check_name(check_name)}.journal.json")
+
+
+def spooled_payloads_filepath(spool_dir: Path, check_name: str) -> Path:
+    """Get the file in the spool directory holding the updates of the given check."""
+    return spool_dir / f"{_safe_check_name(check_name)}.ndjson"
+
+
+def streamed_annotations_filepath(
+    pickle_fp: Path,
+    check_name: str | None = None,
+) -> Path:
+    """Get the file recording the annotations `watch` posted to a check run early."""
+    return upload_journal_filepath(pickle_fp, check_name).with_suffix(".streamed")
+
+
+def resolve_validation_logs(
+    log_specs: list[str],
+    log_format: str | None,
+) -> list[ValidationLog]:
+    """Expand the logs given to `finish-check-run` into the logs to format.
+
+    :param log_specs: paths or globs of logs, each optionally prefixed by its own
+        format, e.g. `ruff-json:packages/*/ruff.json`
+    :param log_format: the format of the logs without a prefix
+    :return: the matched logs in order of the specs, each glob's sorted, once each
+    :raises ValueError: if a log has no format, or a glob matches no files
+    """
+    validation_logs: dict[ValidationLog, None] = {}
+    for log_spec in log_specs:
+        spec_format, _, pattern = log_spec.partition(":")
+        if spec_format not in LOG_OUTPUT_FORMATTERS:
+            spec_format, pattern = log_format or "", log_spec
+        if not spec_format:
+            msg = f"No format given for {log_spec}, prefix it or set --log-format."
+            raise ValueError(msg)
+        if not glob.has_magic(pattern):
+            # formatting reports the log as missing, like for a single log
+            validation_logs[ValidationLog(Path(pattern), spec_format)] = None
+            continue
+        log_fps = sorted(glob.glob(pattern, recursive=True))  # noqa: PTH207
+        if not log_fps:
+            msg = f"No logs match {pattern}."
+            raise ValueError(msg)
+        for log_fp in log_fps:
+            validation_logs[ValidationLog(Path(log_fp), spec_format)] = None
+    return list(validation_logs)
+
+
+def _format_single_log(
+    validation_log: ValidationLog,
+    local_repo_path: Path,
+    ignored_globs: list[str] | None,
+    *,
+    mute_ignored_annotations: bool,
+) -> "tuple[CheckRunOutput, CheckRunConclusion]":
+    return load_log_output_formatter(validation_log.log_format)(
+        validation_log.path,
+        local_repo_path,
+        ignored_globs=ignored_globs,
+        mute_ignored_annotations=mute_ignored_annotations,
+    )
+
+
+def format_log(  # noqa: PLR0913
+    validation_log: "Path | Sequence[ValidationLog]",
+    log_format: str | None,
+    local_repo_path: Path,
+    *,
+    ignored_globs: list[str] | None,
+    mute_ignored_annotations: bool,
+    conclusion: str | None,
+) -> "tuple[CheckRunOutput, CheckRunConclusion]":
+    """Format the given log into the check run output & conclusion.
+
+    Several logs are formatted in a pool of processes, and their outputs merged into
+    the output of a single check run, with the most severe of their conclusions.
+
+    :param validation_log: the log, or several logs along with their formats
+    :param log_format: the format of the log, if a single one is given
+    """
+    validation_logs = (
+        [ValidationLog(validation_log, log_format or "")]
+        if isinstance(validation_log, Path)
+        else list(validation_log)
+    )
+    check_run_output: CheckRunOutput
+    check_run_conclusion: CheckRunConclusion
+    if len(validation_logs) == 1:
+        check_run_output, check_run_conclusion = _format_single_log(
+            validation_logs[0],
+            local_repo_path,
+            ignored_globs,
+            mute_ignored_annotations=mute_ignored_annotations,
+        )
+    else:
+        from concurrent.futures import ProcessPoolExecutor  # noqa: PLC0415
+        from functools import partial  # noqa: PLC0415
+
+        from github_checks.formatters.chunked import mark_pool_worker  # noqa: PLC0415
+        from github_checks.formatters.utils import (  # noqa: PLC0415
+            merge_check_run_outputs,
+        )
+
+        format_single_log = partial(
+            _format_single_log,
+            local_repo_path=local_repo_path,
+            ignored_globs=ignored_globs,
+            mute_ignored_annotations=mute_ignored_annotations,
+        )
+        max_workers = min(len(validation_logs), os.cpu_count() or 1)
+        if max_workers > 1:
+            # each worker formats its log by itself, rather than in a pool of its own
+            with ProcessPoolExecutor(
+                max_workers=max_workers,
+                initializer=mark_pool_worker,
+            ) as executor:
+                outputs = list(executor.map(format_single_log, validation_logs))
+        else:
+            outputs = list(map(format_single_log, validation_logs))
+        check_run_output, check_run_conclusion = merge_check_run_outputs(
+            [
+                (str(log.path), output, log_conclusion)
+                for log, (output, log_conclusion) in zip(
+                    validation_logs,
+                    outputs,
+                    strict=True,
+                )
+            ],
+        )
+    if conclusion:
+        # override if present
+        check_run_conclusion = CheckRunConclusion(conclusion)
+    return check_run_output, check_run_conclusion
+
+
+def finish_check_run_from_log(  # noqa: PLR0913
+    gh_checks: "GitHubChecks",
+    validation_log: "Path | Sequence[ValidationLog]",
+    log_format: str | None,
+    local_repo_path: Path,
+    *,
+    ignored_globs: list[str] | None,
+    mute_ignored_annotations: bool,
+    conclusion: str | None,
+    max_workers: int,
+    journal_fp: Path,
+    max_batch_bytes: int,
+    check_name: str | None = None,
+    streamed_fp: Path | None = None,
+) -> None:
+    """Format the given log into the check run output & finish the check run with it.
+
+    Shared by the `finish-check-run` command and the `serve` daemon executing it.
+    """
+    check_run_output, check_run_conclusion = format_log(
+        validation_log,
+        log_format,
+        local_repo_path,
+        ignored_globs=ignored_globs,
+        mute_ignored_annotations=mute_ignored_annotations,
+        conclusion=conclusion,
+    )
+    gh_checks.finish_check_run(
+        check_run_conclusion,
+        check_run_output,
+        max_workers=max_workers,
+        journal_fp=journal_fp,
+        max_batch_bytes=max_batch_bytes,
+        check_name=check_name,
+        streamed_fp=streamed_fp,
+    )
+
+
+def export_payloads_from_log(  # noqa: PLR0913
+    export_fp: Path,
+    check_name: str,
+    validation_log: "Path | Sequence[ValidationLog]",
+    log_format: str | None,
+    local_repo_path: Path,
+    *,
+    ignored_globs: list[str] | None,
+    mute_ignored_annotations: bool,
+    conclusion: str | None,
+    max_batch_bytes: int,
+) -> None:
+    """Format the given log & append the updates finishing its check run to a file.
+
+    The updates are written as NDJSON, one exact JSON body per line, such that the
+    `replay` command can upload them later, e.g. from another machine. Exporting the
+    same check again appends its updates anew, and `replay` uploads the last ones.
+    """
+    from github_checks.github_api import encode_check_run_updates  # noqa: PLC0415
+
+    check_run_output, check_run_conclusion = format_log(
+        validation_log,
+        log_format,
+        local_repo_path,
+        ignored_globs=ignored_globs,
+        mute_ignored_annotations=mute_ignored_annotations,
+        conclusion=conclusion,
+    )
+    bodies = encode_check_run_updates(
+        check_name,
+        check_run_output,
+        check_run_conclusion,
+        max_batch_bytes=max_batch_bytes,
+    )
+    with export_fp.open("ab") as export_file:
+        export_file.writelines(body + b"\n" for body in bodies)
+
+
+def spool_payloads_from_log(  # noqa: PLR0913
+    spool_dir: Path,
+    check_name: str,
+    validation_log: "Path | Sequence[ValidationLog]",
+    log_format: str | None,
+    local_repo_path: Path,
+    *,
+    ignored_globs: list[str] | None,
+    mute_ignored_annotations: bool,
+    conclusion: str | None,
+    max_batch_bytes: int,
+) -> None:
+    """Format the given log & spool the updates finishing its check run for `flush`.
+
+    The updates are exported to a temporary file first, which then replaces the
+    check's file in the spool directory, such that a crash never leaves a partial
+    file behind, and spooling the same check again replaces its previous updates.
+    """
+    spool_dir.mkdir(parents=True, exist_ok=True)
+    spooled_fp = spooled_payloads_filepath(spool_dir, check_name)
+    tmp_fp = spool_dir / f".{spooled_fp.name}.{os.getpid()}.tmp"
+    tmp_fp.unlink(missing_ok=True)
+    try:
+        export_payloads_from_log(
+            tmp_fp,
+            check_name,
+            validation_log,
+            log_format,
+            local_repo_path,
+            ignored_globs=ignored_globs,
+            mute_ignored_annotations=mute_ignored_annotations,
+            conclusion=conclusion,
+            max_batch_bytes=max_batch_bytes,
+        )
+        with tmp_fp.open("rb") as tmp_file:
+            os.fsync(tmp_file.fileno())
+        tmp_fp.replace(spooled_fp)
+    finally:
+        tmp_fp.unlink(missing_ok=True)
+
+
+def replay_payloads(
+    gh_checks: "GitHubChecks",
+    payloads_fps: list[Path],
+    *,
+    max_workers: int,
+    session_fp: Path,
+    remove_uploaded: bool = False,
+) -> None:
+    """Upload the updates exported by `finish-check-run --export-payloads`.
+
+    Shared by the `replay` & `flush` commands and the `serve` daemon executing them.
+    The updates are grouped per check, whose runs must have been started in this
+    session, and the runs of all checks are uploaded concurrently, each finished once
+    all of its updates are uploaded. Of a check exported several times, only its
+    last complete export is uploaded, i.e. the last one up to the update setting the
+    conclusion.
+
+    :param remove_uploaded: delete each file once all of its check runs are finished,
+        e.g. to flush a spool directory, optional
+    """
+    completed_bodies_per_check: dict[str, list[bytes]] = {}
+    pending_bodies_per_check: dict[str, list[bytes]] = {}
+    payloads_fps_per_check: dict[str, set[Path]] = {}
+    for payloads_fp in payloads_fps:
+        with payloads_fp.open("rb") as payloads_file:
+            for line in payloads_file:
+                if not line.strip():
+                    continue
+                body = line.rstrip(b"\r\n")
+                update = json.loads(body)
+                check_name = update["name"]
+                pending_bodies_per_check.setdefault(check_name, []).append(body)
+                if "conclusion" in update:  # the last update of an export
+                    completed_bodies_per_check[check_name] = (
+                        pending_bodies_per_check.pop(check_name)
+                    )
+                payloads_fps_per_check.setdefault(check_name, set()).add(payloads_fp)
+    # an incomplete export is only uploaded if there is no complete one to replace it
+    bodies_per_check = pending_bodies_per_check | completed_bodies_per_check
+
+    started_checks = set(gh_checks.check_runs)
+    try:
+        gh_checks.upload_check_runs_updates(
+            bodies_per_check,
+            max_workers=max_workers,
+            journal_fps={
+                check_name: upload_journal_filepath(session_fp, check_name)
+                for check_name in bodies_per_check
+            },
+        )
+    finally:
+        if remove_uploaded:
+            # keep the updates of any failed or not started check runs for a retry
+            unfinished_fps: set[Path] = set()
+            for check_name, check_fps in payloads_fps_per_check.items():
+                if (
+                    check_name not in started_checks
+                    or check_name in gh_checks.check_runs
+                ):
+                    unfinished_fps |= check_fps
+            for payloads_fp in set(payloads_fps) - unfinished_fps:
+                payloads_fp.unlink(missing_ok=True)
+
+
+def stream_log_lines(  # noqa: PLR0913
+    gh_checks: "GitHubChecks",
+    lines: list[str],
+    log_format: str,
+    local_repo_path: Path,
+    *,
+    ignored_globs: list[str] | None,
+    mute_ignored_annotations: bool,
+    streamed_fp: Path,
+    max_batch_bytes: int,
+    check_name: str | None = None,
+) -> None:
+    """Parse new lines of a log & post their annotations to the running check run.
+
+    Shared by the `watch` command and the `serve` daemon executing it.
+    """
+    parse_line = load_line_annotation_parser(log_format)
+    annotations: list[CheckAnnotation] = [
+        annotation
+        for line in lines
+        if (annotation := parse_line(line, local_repo_path)) is not None
+    ]
+    if mute_ignored_annotations and ignored_globs:
+        from github_checks.formatters.utils import (  # noqa: PLC0415
+            filter_for_checksignore,
+        )
+
+        annotations = list(
+            filter_for_checksignore(annotations, ignored_globs, local_repo_path),
+        )
+    gh_checks.stream_annotations(
+        annotations,
+        streamed_fp,
+        max_batch_bytes=max_batch_bytes,
+        check_name=check_name,
+    )
+
+
+def request_daemon(socket_fp: Path, command: str, **params: Any) -> Any:  # noqa: ANN401
+    """Have the `serve` daemon listening on the given socket execute a command.
+
+    :param socket_fp: the Unix domain socket the daemon listens on
+    :param command: the CLI command to be executed, e.g. `start-check-run`
+    :param params: the (JSON serializable) parameters of the command
+    :return: the result of the command, if any
+    :raises RuntimeError: if the daemon failed to execute the command
+    """
+    with socket.socket(socket.AF_UNIX, socket.SOCK_STREAM) as daemon_socket:
+        daemon_socket.connect(str(socket_fp))
+        request = {"command": command, "params": params}
+        daemon_socket.sendall(json.dumps(request).encode() + b"\n")
+        with daemon_socket.makefile("rb") as response_file:
+            response: dict[str, Any] = json.loads(response_file.readline() or "{}")
+    if "error" in response or "result" not in response:
+        msg = f"[github-checks] Daemon failed to {command}: {response.get('error')}"
+        raise RuntimeError(msg)
+    return response["result"]
+
+
+def main() -> None:  # noqa: C901, PLR0912, PLR0915
     """Handle the main entry point for the github-checks CLI."""
     argparser = ArgumentParser(
         prog="github-checks",
@@ -68,6 +502,34 @@ def main() -> None:  # noqa: C901, PLR0915
         env_var="GH_PICKLE_FILEPATH",
         help="File in which the authenticated checks session will be cached.",
     )
+    argparser.add_argument(
+        "--daemon-socket",
+        type=Path,
+        env_var="GH_DAEMON_SOCKET",
+        help="Unix domain socket of a daemon started by the `serve` command. If set, "
+        "all other commands are executed by that daemon, which keeps the session and "
+        "its connections alive, instead of each command starting up from scratch.",
+    )
+    argparser.add_argument(
+        "--metrics-filepath",
+        type=Path,
+        env_var="GH_METRICS_FILEPATH",
+        help="If set, metrics of each command are written to this file, e.g. the "
+        "latency percentiles of requests to GitHub, the bytes sent, the annotations "
+        "uploaded per second and the time spent signing the app JWT, exchanging it for"
+        " a token, formatting logs, filtering ignored files, encoding & uploading. "
+        "With --daemon-socket, the `serve` daemon writes the metrics of each command it"
+        " executes instead.",
+    )
+    argparser.add_argument(
+        "--metrics-format",
+        choices=("json", "prometheus"),
+        default="json",
+        env_var="GH_METRICS_FORMAT",
+        help="Format of the --metrics-filepath: `json` appends one line per command, "
+        "`prometheus` replaces the file with the last command's metrics, for e.g. "
+        "node_exporter's textfile collector. Defaults to `json`.",
+    )
     subparsers = argparser.add_subparsers(
         description="Operation to be performed by the CLI.",
         required=True,
@@ -110,6 +572,44 @@ def main() -> None:  # noqa: C901, PLR0915
         help="If an existing checks session is found (pickle file exists), overwrite it"
         ". If a session is found and this is not set, initialization will abort.",
     )
+    init_parser.add_argument(
+        "--rate-limit-state-filepath",
+        type=Path,
+        default=Path("/tmp/github-checks-ratelimit.json"),  # noqa: S108
+        env_var="GH_RATE_LIMIT_STATE_FILEPATH",
+        help="File through which all github-checks processes on this machine share "
+        "their GitHub API request budget, such that all of them pause once GitHub "
+        "reports its rate limit as exhausted, and share the pace of "
+        "--requests-per-minute, if set.",
+    )
+    init_parser.add_argument(
+        "--requests-per-minute",
+        type=float,
+        env_var="GH_REQUESTS_PER_MINUTE",
+        help="Pace all GitHub API requests of this machine to this rate upfront, e.g. "
+        "80, GitHub's limit for content-creating requests. This avoids hitting the "
+        "secondary rate limits when many checks upload at the same time, but caps the"
+        " uploads at 50 annotations per request, e.g. 4000 per minute at 80 requests "
+        "per minute, regardless of --upload-workers. By default, requests are only "
+        "slowed down once GitHub rate limits them.",
+    )
+    init_parser.add_argument(
+        "--burst",
+        type=int,
+        default=20,
+        env_var="GH_REQUEST_BURST",
+        help="Number of requests which may be sent in quick succession before "
+        "--requests-per-minute applies. Defaults to 20.",
+    )
+    init_parser.add_argument(
+        "--token-cache-filepath",
+        type=Path,
+        env_var="GH_TOKEN_CACHE_FILEPATH",
+        help="File through which all github-checks processes of this user on this "
+        "machine share their GitHub App installation access tokens, reusing a token "
+        "until shortly before it expires instead of each `init` minting a new one. "
+        "Only used if set, the file is created accessible only to its owner.",
+    )
     init_parser.add_argument(
         "--print-gh-app-install-token",
         action="store_true",
@@ -132,42 +632,32 @@ def main() -> None:  # noqa: C901, PLR0915
     start_parser.add_argument(
         "--check-name",
         type=str,
+        nargs="+",
         env_var="GH_CHECK_NAME",
-        help="A name for this check run. Will be shown on any respective GitHub PRs.",
+        help="A name for this check run. Will be shown on any respective GitHub PRs. "
+        "If several names are given, a run of each check is started concurrently, each"
+        " of which is then finished by passing its name to `finish-check-run`.",
     )
-
-    finish_parser = subparsers.add_parser(
-        "finish-check-run",
-        help="Finish the currently running check run, posting all the check annotations"
-        ", the surrounding summary output and the appropriate check conclusion.",
-    )
-    finish_parser.add_argument(
-        "validation_log",
-        type=Path,
-        help="Logfile of a supported format (see option --format for details).",
-    )
-    finish_parser.add_argument(
-        "--log-format",
-        choices=LOG_OUTPUT_FORMATTERS.keys(),
-        required=True,
-        help="Format of the provided log file.",
-    )
-    finish_parser.add_argument(
-        "--local-repo-path",
-        type=Path,
-        env_var="GH_LOCAL_REPO_PATH",
-        required=True,
-        help="Path to the local copy of the repository, for deduction of relative paths"
-        " by the formatter, for any absolute paths contained in the logfile.",
+    start_parser.add_argument(
+        "--start-workers",
+        type=int,
+        default=8,
+        env_var="GH_START_WORKERS",
+        help="Maximum number of check runs to start concurrently, if several check "
+        "names are given.",
     )
-    finish_parser.add_argument(
-        "--conclusion",
-        choices=[c.value for c in CheckRunConclusion],
-        required=False,
-        help="Optional override for the conclusion this check run should finish with."
-        "If not provided, success/action_required are used, depending on annotations.",
+    start_parser.add_argument(
+        "--reuse-existing",
+        action="store_true",
+        env_var="GH_REUSE_EXISTING_RUNS",
+        help="If this app already has an in-progress run of a check for the revision "
+        "(e.g. left behind by a previous attempt of a retried build), continue that "
+        "run instead of starting a new one next to it.",
     )
-    finish_parser.add_argument(
+
+    # options shared by `finish-check-run` and `watch`, which post the same findings
+    ignore_parser = ArgumentParser(add_help=False)
+    ignore_parser.add_argument(
         "--ignored-globs-filepath",
         "-i",
         type=Path,
@@ -180,7 +670,7 @@ def main() -> None:  # noqa: C901, PLR0915
         " in the pyproject.toml), as those will also be respected locally (e.g. in IDE "
         "linter integrations or pre-commit hooks).",
     )
-    finish_parser.add_argument(
+    ignore_parser.add_argument(
         "--included-globs-filepath",
         type=Path,
         help="File containing a list of file pattern globs to explicitly include. "
@@ -190,7 +680,7 @@ def main() -> None:  # noqa: C901, PLR0915
         "changed in a pull request, even if a file is generally excluded, thus "
         "encouraging contributors to refactor existing debt in drive-by mode.",
     )
-    finish_parser.add_argument(
+    ignore_parser.add_argument(
         "--ignore-except-included",
         action="store_true",
         help="If set, only files matching the globs in --included-globs-filepath will "
@@ -201,13 +691,208 @@ def main() -> None:  # noqa: C901, PLR0915
         "side-effects, such as breaking type validation elsewhere in the codebase. Use "
         "with caution. Requires --included-globs-filepath to be set.",
     )
-    finish_parser.add_argument(
+    ignore_parser.add_argument(
         "--mute-ignored-annotations",
         action="store_true",
         help="If set, annotations for ignored files will not just be disregarded when "
         "calculating the check's conclusion, but they will be filtered entirely prior "
         "to publishing, silencing them entirely.",
     )
+
+    finish_parser = subparsers.add_parser(
+        "finish-check-run",
+        parents=[ignore_parser],
+        help="Finish the currently running check run, posting all the check annotations"
+        ", the surrounding summary output and the appropriate check conclusion.",
+    )
+    finish_parser.add_argument(
+        "validation_log",
+        nargs="+",
+        help="Logfiles of a supported format (see option --log-format for details), or"
+        " globs matching them. Several logs are formatted in parallel and merged into "
+        "the one check run. Prefix a log with its format to mix formats, e.g. "
+        "`ruff-json:packages/*/ruff.json pyright-json:packages/*/pyright.json`.",
+    )
+    finish_parser.add_argument(
+        "--check-name",
+        type=str,
+        env_var="GH_CHECK_NAME",
+        help="Name of the check whose run to finish, if several check runs were "
+        "started at once. Defaults to the check run started last, i.e. to the check "
+        "named last to `start-check-run`.",
+    )
+    finish_parser.add_argument(
+        "--log-format",
+        choices=LOG_OUTPUT_FORMATTERS.keys(),
+        help="Format of the provided log files, required unless each is prefixed with "
+        "its own format.",
+    )
+    finish_parser.add_argument(
+        "--local-repo-path",
+        type=Path,
+        env_var="GH_LOCAL_REPO_PATH",
+        required=True,
+        help="Path to the local copy of the repository, for deduction of relative paths"
+        " by the formatter, for any absolute paths contained in the logfile.",
+    )
+    finish_parser.add_argument(
+        "--conclusion",
+        choices=[conclusion.value for conclusion in CheckRunConclusion],
+        required=False,
+        help="Optional override for the conclusion this check run should finish with."
+        "If not provided, success/action_required are used, depending on annotations.",
+    )
+    finish_parser.add_argument(
+        "--export-payloads",
+        type=Path,
+        env_var="GH_EXPORT_PAYLOADS",
+        help="Instead of finishing the check run, append the exact updates it would be"
+        " finished with to this NDJSON file, to upload them later via `replay`, e.g. "
+        "from another machine. Requires --check-name, but no initialized session.",
+    )
+    finish_parser.add_argument(
+        "--spool-dir",
+        type=Path,
+        env_var="GH_SPOOL_DIR",
+        help="Instead of finishing the check run, only format the log and spool the "
+        "updates finishing it to this directory, for `flush` to upload them along with"
+        " those of all other checks at the end of the build. Requires --check-name.",
+    )
+    finish_parser.add_argument(
+        "--upload-workers",
+        type=int,
+        default=1,
+        env_var="GH_UPLOAD_WORKERS",
+        help="Maximum number of annotation batches to upload to GitHub concurrently. "
+        "Concurrency is reduced automatically if GitHub responds slowly or rate limits"
+        " the uploads. The final update setting the conclusion is always sent last.",
+    )
+    finish_parser.add_argument(
+        "--max-batch-bytes",
+        type=int,
+        default=DEFAULT_MAX_BATCH_BYTES,
+        env_var="GH_MAX_BATCH_BYTES",
+        help="Maximum size of each request uploading annotations, in bytes. Annotations"
+        " are packed into as few requests as possible within this size and GitHub's "
+        "limit of 50 annotations per request. Defaults to 1 MiB.",
+    )
+    watch_parser = subparsers.add_parser(
+        "watch",
+        parents=[ignore_parser],
+        help="Follow the log of a check while it is still being written, posting its "
+        "annotations to the running check run as they are found, along with the number"
+        " of issues found so far. Run it in the background next to the check, and "
+        "`finish-check-run` with the complete log afterwards, which then only posts the"
+        " remaining annotations and the conclusion.",
+    )
+    watch_parser.add_argument(
+        "validation_log",
+        type=Path,
+        help="Logfile of a supported line-based format, which may not exist yet.",
+    )
+    watch_parser.add_argument(
+        "--check-name",
+        type=str,
+        env_var="GH_CHECK_NAME",
+        help="Name of the check whose run to post to, if several check runs were "
+        "started at once. Defaults to the check run started last, i.e. to the check "
+        "named last to `start-check-run`.",
+    )
+    watch_parser.add_argument(
+        "--log-format",
+        choices=LINE_ANNOTATION_PARSERS.keys(),
+        required=True,
+        help="Format of the provided log file.",
+    )
+    watch_parser.add_argument(
+        "--local-repo-path",
+        type=Path,
+        default=Path(),
+        env_var="GH_LOCAL_REPO_PATH",
+        help="Path to the local copy of the repository, to match the ignored globs in.",
+    )
+    watch_parser.add_argument(
+        "--writer-pid",
+        type=int,
+        help="ID of the process writing the log. If set, watching stops once that "
+        "process exits, otherwise it stops on SIGTERM or SIGINT.",
+    )
+    watch_parser.add_argument(
+        "--flush-interval",
+        type=float,
+        default=10,
+        env_var="GH_WATCH_FLUSH_INTERVAL",
+        help="Minimum seconds between two updates of the check run, unless enough new"
+        " annotations for a full upload batch were found. Defaults to 10 seconds.",
+    )
+    watch_parser.add_argument(
+        "--max-batch-bytes",
+        type=int,
+        default=DEFAULT_MAX_BATCH_BYTES,
+        env_var="GH_MAX_BATCH_BYTES",
+        help="Maximum size of each request uploading annotations, in bytes.",
+    )
+    replay_parser = subparsers.add_parser(
+        "replay",
+        help="Upload the updates exported via `finish-check-run --export-payloads`, "
+        "finishing the runs of their checks, which need to be started in this session"
+        " beforehand (e.g. via `start-check-run --reuse-existing`).",
+    )
+    replay_parser.add_argument(
+        "payloads",
+        type=Path,
+        nargs="+",
+        help="NDJSON files written by `finish-check-run --export-payloads`.",
+    )
+    replay_parser.add_argument(
+        "--upload-workers",
+        type=int,
+        default=8,
+        env_var="GH_UPLOAD_WORKERS",
+        help="Maximum number of updates of each check run to upload concurrently. "
+        "The final update setting the conclusion is always sent last.",
+    )
+    flush_parser = subparsers.add_parser(
+        "flush",
+        help="Upload the updates spooled via `finish-check-run --spool-dir`, finishing"
+        " the runs of all spooled checks concurrently. Spooled files are deleted once "
+        "their check run is finished, such that a failed flush can simply be retried.",
+    )
+    flush_parser.add_argument(
+        "--spool-dir",
+        type=Path,
+        env_var="GH_SPOOL_DIR",
+        required=True,
+        help="Directory the check runs' updates were spooled to.",
+    )
+    flush_parser.add_argument(
+        "--upload-workers",
+        type=int,
+        default=8,
+        env_var="GH_UPLOAD_WORKERS",
+        help="Maximum number of updates of each check run to upload concurrently. "
+        "The final update setting the conclusion is always sent last.",
+    )
+    serve_parser = subparsers.add_parser(
+        "serve",
+        help="Run a daemon listening on the socket configured in `--daemon-socket`, "
+        "which executes the other commands for any CLI invocation with the same "
+        "`--daemon-socket`. This way, imports, authentication and connections to GitHub"
+        " are set up once per build, instead of once per command.",
+    )
+    serve_parser.add_argument(
+        "--detach",
+        action="store_true",
+        help="Run the daemon in the background, returning once it accepts commands.",
+    )
+    serve_parser.add_argument(
+        "--idle-timeout",
+        type=float,
+        default=3600,
+        env_var="GH_DAEMON_IDLE_TIMEOUT",
+        help="Seconds without any commands after which the daemon shuts down, in case "
+        "`cleanup` is never called. Defaults to one hour.",
+    )
     subparsers.add_parser(
         "cleanup",
         help="Clean up the local environment variables and the pickle file, if present."
@@ -216,6 +901,75 @@ def main() -> None:  # noqa: C901, PLR0915
         " (e.g. access token), which can pose a security risk.",
     )
     args = argparser.parse_args(sys.argv[1:])
+    if args.command == "finish-check-run":
+        try:
+            args.validation_logs = resolve_validation_logs(
+                args.validation_log,
+                args.log_format,
+            )
+        except ValueError as err:
+            argparser.error(str(err))
+
+    if args.command == "serve":
+        if not args.daemon_socket:
+            argparser.error("`serve` requires --daemon-socket to be set.")
+        from github_checks.daemon import serve  # noqa: PLC0415
+
+        serve(
+            args.daemon_socket,
+            idle_timeout=args.idle_timeout,
+            detach=args.detach,
+            metrics_fp=args.metrics_filepath,
+            metrics_format=args.metrics_format,
+        )
+        return
+
+    if args.command == "finish-check-run" and (args.export_payloads or args.spool_dir):
+        # only formats the log, so neither needs a session nor a daemon
+        if args.export_payloads and args.spool_dir:
+            argparser.error("--export-payloads and --spool-dir are mutually exclusive.")
+        if not args.check_name:
+            argparser.error("Exporting or spooling requires --check-name to be set.")
+        export = spool_payloads_from_log if args.spool_dir else export_payloads_from_log
+        export(
+            args.spool_dir or args.export_payloads,
+            args.check_name,
+            args.validation_logs,
+            None,
+            Path(args.local_repo_path),
+            ignored_globs=read_ignored_globs(args),
+            mute_ignored_annotations=args.mute_ignored_annotations,
+            conclusion=args.conclusion,
+            max_batch_bytes=args.max_batch_bytes,
+        )
+        return
+
+    if args.daemon_socket and args.command != "cleanup":
+        forward_to_daemon(args)
+        return
+
+    if args.metrics_filepath:
+        from github_checks.metrics import (  # noqa: PLC0415
+            MetricsCollector,
+            register_hooks,
+        )
+
+        collector = MetricsCollector()
+        register_hooks(collector)
+        # also written if the command fails or exits early, e.g. on an HTTP error
+        atexit.register(
+            collector.write,
+            args.metrics_filepath,
+            args.metrics_format,
+            {"command": args.command},
+        )
+
+    from github_checks.github_api import (  # noqa: PLC0415
+        GitHubChecks,
+        InstallationTokenCache,
+        RequestScheduler,
+    )
+
     gh_checks: GitHubChecks
 
     if args.command == "init":
@@ -234,6 +988,16 @@ def main() -> None:  # noqa: C901, PLR0915
             app_id=args.app_id,
             app_installation_id=args.app_install_id,
             app_privkey_pem=args.pem_path,
+            scheduler=RequestScheduler(
+                args.rate_limit_state_filepath,
+                requests_per_minute=args.requests_per_minute,
+                burst=args.burst,
+            ),
+            token_cache=(
+                InstallationTokenCache(args.token_cache_filepath)
+                if args.token_cache_filepath
+                else None
+            ),
         )
         if args.print_gh_app_install_token:
             sys.stdout.write(gh_checks.app_install_access_token)
@@ -249,10 +1013,19 @@ def main() -> None:  # noqa: C901, PLR0915
             "(pickle file not found). Aborting.",
         )
 
-        gh_checks.start_check_run(
-            revision_sha=args.revision,
-            check_name=args.check_name,
-        )
+        if len(args.check_name) == 1:
+            gh_checks.start_check_run(
+                revision_sha=args.revision,
+                check_name=args.check_name[0],
+                reuse_existing=args.reuse_existing,
+            )
+        else:
+            gh_checks.start_check_runs(
+                revision_sha=args.revision,
+                check_names=args.check_name,
+                max_workers=args.start_workers,
+                reuse_existing=args.reuse_existing,
+            )
         with args.pickle_filepath.open("wb") as pickle_file:
             pickle.dump(gh_checks, pickle_file)
 
@@ -270,43 +1043,98 @@ def main() -> None:  # noqa: C901, PLR0915
             "is currently running. Quitting.",
         )
 
-        with args.pickle_filepath.open("rb") as pickle_file:
-            gh_checks = pickle.load(pickle_file)  # noqa: S301
-
-        ignored_globs: list[str] | None = None
-        if (ign_globs_fp := args.ignored_globs_filepath) and ign_globs_fp.exists():
-            with ign_globs_fp.open("r", encoding="utf-8") as ignore_file:
-                ignored_globs = ignore_file.readlines()
-
-        included_globs: list[str] | None = None
-        if (incl_globs_fp := args.included_globs_filepath) and incl_globs_fp.exists():
-            with incl_globs_fp.open("r", encoding="utf-8") as include_file:
-                included_globs = include_file.readlines()
+        finish_check_run_from_log(
+            gh_checks,
+            args.validation_logs,
+            None,
+            Path(args.local_repo_path),
+            ignored_globs=read_ignored_globs(args),
+            mute_ignored_annotations=args.mute_ignored_annotations,
+            conclusion=args.conclusion,
+            max_workers=args.upload_workers,
+            journal_fp=upload_journal_filepath(args.pickle_filepath, args.check_name),
+            max_batch_bytes=args.max_batch_bytes,
+            check_name=args.check_name,
+            streamed_fp=streamed_annotations_filepath(
+                args.pickle_filepath,
+                args.check_name,
+            ),
+        )
 
-        ignored_globs = compute_ignored_globs(
-            ignored_globs,
-            included_globs,
-            ignore_except_included=args.ignore_except_included,
+    elif args.command == "replay":
+        # will throw FileNotFoundError if there's no pickle file, thus exiting uncaught
+        gh_checks = unpickle(
+            args.pickle_filepath,
+            "[github-checks] Error: Trying to replay check run updates without "
+            "initialization (pickle file not found). Aborting.",
+        )
+        replay_payloads(
+            gh_checks,
+            args.payloads,
+            max_workers=args.upload_workers,
+            session_fp=args.pickle_filepath,
         )
+        with args.pickle_filepath.open("wb") as pickle_file:
+            pickle.dump(gh_checks, pickle_file)
 
-        check_run_output: CheckRunOutput
-        check_run_conclusion: CheckRunConclusion
-        check_run_output, check_run_conclusion = LOG_OUTPUT_FORMATTERS[args.log_format](
-            Path(args.validation_log),
-            Path(args.local_repo_path),
-            ignored_globs=ignored_globs,
-            mute_ignored_annotations=args.mute_ignored_annotations,
+    elif args.command == "flush":
+        # will throw FileNotFoundError if there's no pickle file, thus exiting uncaught
+        gh_checks = unpickle(
+            args.pickle_filepath,
+            "[github-checks] Error: Trying to flush spooled check runs without "
+            "initialization (pickle file not found). Aborting.",
         )
-        if args.conclusion:
-            # override if present
-            check_run_conclusion = CheckRunConclusion(args.conclusion)
+        try:
+            replay_payloads(
+                gh_checks,
+                sorted(Path(args.spool_dir).glob("*.ndjson")),
+                max_workers=args.upload_workers,
+                session_fp=args.pickle_filepath,
+                remove_uploaded=True,
+            )
+        finally:
+            # keep track of the finished check runs, even if others failed
+            with args.pickle_filepath.open("wb") as pickle_file:
+                pickle.dump(gh_checks, pickle_file)
 
-        gh_checks.finish_check_run(check_run_conclusion, check_run_output)
+    elif args.command == "watch":
+        # will throw FileNotFoundError if there's no pickle file, thus exiting uncaught
+        gh_checks = unpickle(
+            args.pickle_filepath,
+            "[github-checks] Error: Trying to watch a github check, but no check "
+            "is currently running. Quitting.",
+        )
+        ignored_globs = read_ignored_globs(args)
+        watch_and_post(
+            args,
+            lambda lines: stream_log_lines(
+                gh_checks,
+                lines,
+                args.log_format,
+                Path(args.local_repo_path),
+                ignored_globs=ignored_globs,
+                mute_ignored_annotations=args.mute_ignored_annotations,
+                streamed_fp=streamed_annotations_filepath(
+                    args.pickle_filepath,
+                    args.check_name,
+                ),
+                max_batch_bytes=args.max_batch_bytes,
+                check_name=args.check_name,
+            ),
+        )
 
     elif args.command == "cleanup":
+        if args.daemon_socket and args.daemon_socket.exists():
+            try:
+                request_daemon(args.daemon_socket, "cleanup")
+            except (OSError, RuntimeError):
+                LOGGER.warning("[github-checks] Daemon already stopped, skipping.")
         # delete the pickle file, the config won't be needed anymore
         if args.pickle_filepath.exists():
             args.pickle_filepath.unlink()
+        pickle_fp: Path = args.pickle_filepath
+        for journal_fp in pickle_fp.parent.glob(f"{pickle_fp.stem}*.journal.*"):
+            journal_fp.unlink(missing_ok=True)
 
         # delete all environment variables for good measure
         for env_var in [
@@ -320,6 +1148,154 @@ def main() -> None:  # noqa: C901, PLR0915
             os.environ.pop(env_var, default=None)
 
 
+def forward_to_daemon(args: Namespace) -> None:
+    """Have the `serve` daemon execute the given command, instead of this process."""
+    if args.command == "init":
+        token: str = request_daemon(
+            args.daemon_socket,
+            "init",
+            app_id=args.app_id,
+            app_installation_id=args.app_install_id,
+            app_privkey_pem=str(args.pem_path),
+            repo_base_url=args.repo_base_url,
+            rate_limit_state_filepath=str(args.rate_limit_state_filepath),
+            requests_per_minute=args.requests_per_minute,
+            burst=args.burst,
+            token_cache_filepath=(
+                str(args.token_cache_filepath) if args.token_cache_filepath else None
+            ),
+            overwrite_existing=args.overwrite_existing,
+        )
+        if args.print_gh_app_install_token:
+            sys.stdout.write(token)
+
+    elif args.command == "start-check-run":
+        request_daemon(
+            args.daemon_socket,
+            "start-check-run",
+            revision_sha=args.revision,
+            check_names=args.check_name,
+            max_workers=args.start_workers,
+            reuse_existing=args.reuse_existing,
+        )
+
+    elif args.command == "finish-check-run":
+        if not Path(args.local_repo_path).exists():
+            LOGGER.critical(
+                "[github-checks] Cannot find local repository copy for resolution "
+                "of relative paths. Aborting.",
+            )
+            sys.exit("-1")
+        # the daemon might run in another working directory than this client
+        request_daemon(
+            args.daemon_socket,
+            "finish-check-run",
+            validation_log=[
+                [str(validation_log.path.resolve()), validation_log.log_format]
+                for validation_log in args.validation_logs
+            ],
+            log_format=None,
+            local_repo_path=str(Path(args.local_repo_path).resolve()),
+            ignored_globs=read_ignored_globs(args),
+            mute_ignored_annotations=args.mute_ignored_annotations,
+            conclusion=args.conclusion,
+            max_workers=args.upload_workers,
+            journal_fp=str(
+                upload_journal_filepath(
+                    args.pickle_filepath,
+                    args.check_name,
+                ).resolve(),
+            ),
+            max_batch_bytes=args.max_batch_bytes,
+            check_name=args.check_name,
+            streamed_fp=str(
+                streamed_annotations_filepath(
+                    args.pickle_filepath,
+                    args.check_name,
+                ).resolve(),
+            ),
+        )
+
+    elif args.command == "replay":
+        request_daemon(
+            args.daemon_socket,
+            "replay",
+            payloads_fps=[str(Path(fp).resolve()) for fp in args.payloads],
+            max_workers=args.upload_workers,
+            session_fp=str(Path(args.pickle_filepath).resolve()),
+        )
+
+    elif args.command == "flush":
+        request_daemon(
+            args.daemon_socket,
+            "replay",
+            payloads_fps=[
+                str(fp.resolve())
+                for fp in sorted(Path(args.spool_dir).glob("*.ndjson"))
+            ],
+            max_workers=args.upload_workers,
+            session_fp=str(Path(args.pickle_filepath).resolve()),
+            remove_uploaded=True,
+        )
+
+    elif args.command == "watch":
+        ignored_globs = read_ignored_globs(args)
+        local_repo_path = str(Path(args.local_repo_path).resolve())
+        streamed_fp = str(
+            streamed_annotations_filepath(
+                args.pickle_filepath,
+                args.check_name,
+            ).resolve(),
+        )
+        watch_and_post(
+            args,
+            lambda lines: request_daemon(
+                args.daemon_socket,
+                "watch",
+                lines=lines,
+                log_format=args.log_format,
+                local_repo_path=local_repo_path,
+                ignored_globs=ignored_globs,
+                mute_ignored_annotations=args.mute_ignored_annotations,
+                streamed_fp=streamed_fp,
+                max_batch_bytes=args.max_batch_bytes,
+                check_name=args.check_name,
+            ),
+        )
+
+
+def watch_and_post(args: Namespace, post_lines: "Callable[[list[str]], None]") -> None:
+    """Follow the log given to `watch`, posting each batch of new lines."""
+    from github_checks.watch import watch_log  # noqa: PLC0415
+
+    lines_posted = watch_log(
+        Path(args.validation_log),
+        post_lines,
+        flush_interval=args.flush_interval,
+        writer_pid=args.writer_pid,
+    )
+    LOGGER.info("[github-checks] Stopped watching after %d lines.", lines_posted)
+
+
+def read_ignored_globs(args: Namespace) -> list[str] | None:
+    """Read the ignored & included globs of `finish-check-run` into the ignored ones."""
+    ignored_globs: list[str] | None = None
+    if (ign_globs_fp := args.ignored_globs_filepath) and ign_globs_fp.exists():
+        with ign_globs_fp.open("r", encoding="utf-8") as ignore_file:
+            ignored_globs = ignore_file.readlines()
+
+    included_globs: list[str] | None = None
+    if (incl_globs_fp := args.included_globs_filepath) and incl_globs_fp.exists():
+        with incl_globs_fp.open("r", encoding="utf-8") as include_file:
+            included_globs = include_file.readlines()
+
+    return compute_ignored_globs(
+        ignored_globs,
+        included_globs,
+        ignore_except_included=args.ignore_except_included,
+    )
+
+
 def compute_ignored_globs(
     ignored_globs: list[str] | None,
     included_globs: list[str] | None,
@@ -350,7 +1326,7 @@ def compute_ignored_globs(
         final_ignored_globs = ignored_globs or []
         final_ignored_globs.extend(negative_ignores or [])
 
-    return final_ignored_globs if final_ignored_globs else None
+    return final_ignored_globs or None
 
 
 if __name__ == "__main__":
@@ -0,0 +1,27 @@
+"""Constants shared by the library & its CLI, importing only the standard library.
+
+This way, the CLI can build its parser from them, without importing the library, as
+it's also run as a thin client of a `serve` daemon.
+"""
+
+from enum import StrEnum, auto
+
+
+class CheckRunConclusion(StrEnum):
+    """The valid conclusion states of a check run.
+
+    See https://docs.github.com/en/rest/checks/runs#update-a-check-run for details.
+    """
+
+    ACTION_REQUIRED = auto()
+    SUCCESS = auto()
+    FAILURE = auto()
+    NEUTRAL = auto()
+    SKIPPED = auto()
+    STALE = auto()
+    TIMED_OUT = auto()
+    CANCELLED = auto()
+
+
+# the maximum size of each check run update's JSON body, see `encode_check_run_updates`
+DEFAULT_MAX_BATCH_BYTES = 1024 * 1024
@@ -0,0 +1,340 @@
+"""Long-lived local daemon, executing the CLI's commands for its thin clients.
+
+Started by `github-checks --daemon-socket <path> serve`, it keeps the authenticated
+`GitHubChecks` session, its connection pool and the formatters loaded, such that the
+other commands only need to forward their arguments over the Unix domain socket.
+Each command is sent as one JSON line of `{"command": ..., "params": {...}}`, and is
+answered with one JSON line of either `{"result": ...}` or `{"error": "..."}`.
+"""
+
+import json
+import logging
+import os
+import socket
+import socketserver
+from pathlib import Path
+from typing import TYPE_CHECKING, Any, Literal
+
+from github_checks.cli import (
+    LINE_ANNOTATION_PARSERS,
+    LOG_OUTPUT_FORMATTERS,
+    ValidationLog,
+    finish_check_run_from_log,
+    load_line_annotation_parser,
+    load_log_output_formatter,
+    replay_payloads,
+    stream_log_lines,
+)
+from github_checks.github_api import (
+    GitHubChecks,
+    InstallationTokenCache,
+    RequestScheduler,
+)
+from github_checks.metrics import MetricsCollector, register_hooks, unregister_hooks
+
+if TYPE_CHECKING:
+    from collections.abc import Callable
+
+LOGGER = logging.getLogger(__name__)
+
+
+class ChecksDaemon(socketserver.UnixStreamServer):
+    """Serves the check run commands over a Unix domain socket, one at a time.
+
+    Commands are executed sequentially, as a `GitHubChecks` session tracks a single
+    current check run, just like the pickled session of the plain CLI does.
+    """
+
+    gh_checks: GitHubChecks | None = None
+    _shutdown_requested: bool = False
+    _metrics: tuple[MetricsCollector, Path, Literal["json", "prometheus"]] | None = None
+
+    def __init__(
+        self,
+        socket_fp: Path,
+        idle_timeout: float | None = 3600,
+        *,
+        metrics_fp: Path | None = None,
+        metrics_format: Literal["json", "prometheus"] = "json",
+    ) -> None:
+        """Bind the socket, after which clients can already connect.
+
+        :param socket_fp: the Unix domain socket to listen on
+        :param idle_timeout: seconds without commands until shutdown, optional
+        :param metrics_fp: file to write the metrics of each command to, optional
+        :param metrics_format: `json` or `prometheus`, see `MetricsCollector.write`
+        :raises OSError: if another daemon is already listening on the socket
+        """
+        if socket_fp.exists():
+            with socket.socket(socket.AF_UNIX, socket.SOCK_STREAM) as probe:
+                if probe.connect_ex(str(socket_fp)) == 0:
+                    msg = f"A daemon is already listening on {socket_fp}."
+                    raise OSError(msg)
+            socket_fp.unlink()  # left behind by a daemon that didn't shut down cleanly
+
+        # the session holds an access token, so only our user may connect
+        previous_umask = os.umask(0o177)
+        try:
+            super().__init__(str(socket_fp), _ChecksRequestHandler)
+        finally:
+            os.umask(previous_umask)
+        self.timeout = idle_timeout
+        if metrics_fp:
+            collector = MetricsCollector()
+            register_hooks(collector)
+            self._metrics = (collector, metrics_fp, metrics_format)
+        self._commands: dict[str, Callable[..., Any]] = {
+            "init": self._init,
+            "start-check-run": self._start_check_run,
+            "finish-check-run": self._finish_check_run,
+            "replay": self._replay,
+            "watch": self._watch,
+            "cleanup": self._cleanup,
+        }
+
+    def serve_until_cleanup(self) -> None:
+        """Handle commands until `cleanup` is requested or the idle timeout passes."""
+        while not self._shutdown_requested:
+            self.handle_request()
+
+    def handle_timeout(self) -> None:
+        """Shut down once idle for too long, e.g. if a build never ran `cleanup`."""
+        LOGGER.warning("[github-checks] Daemon idle for too long, shutting down.")
+        self._shutdown_requested = True
+
+    def server_close(self) -> None:
+        """Close & remove the socket."""
+        if self._metrics:
+            unregister_hooks(self._metrics[0])
+        super().server_close()
+        Path(self.server_address).unlink(missing_ok=True)  # type: ignore[arg-type]
+
+    def execute(self, command: str, params: dict[str, Any]) -> Any:  # noqa: ANN401
+        """Execute the given CLI command with its parameters.
+
+        :param command: the CLI command, e.g. `start-check-run`
+        :param params: the parameters of the command, as sent by the client
+        :return: the JSON serializable result of the command, if any
+        :raises ValueError: if the command is unknown
+        """
+        if command not in self._commands:
+            msg = f"Unknown command: {command}"
+            raise ValueError(msg)
+        if not self._metrics:
+            return self._commands[command](**params)
+        collector, metrics_fp, metrics_format = self._metrics
+        try:
+            return self._commands[command](**params)
+        finally:
+            collector.write(metrics_fp, metrics_format, {"command": command})
+            collector.reset()
+
+    def _init(  # noqa: PLR0913
+        self,
+        app_id: str,
+        app_installation_id: str,
+        app_privkey_pem: str,
+        repo_base_url: str,
+        rate_limit_state_filepath: str,
+        *,
+        token_cache_filepath: str | None = None,
+        overwrite_existing: bool = False,
+        requests_per_minute: float | None = None,
+        burst: int = 20,
+    ) -> str:
+        if self.gh_checks and not overwrite_existing:
+            msg = (
+                "Trying to initialize GitHub checks, but the daemon is already "
+                "initialized and `--overwrite-existing` is not set."
+            )
+            raise RuntimeError(msg)
+        self.gh_checks = GitHubChecks(
+            repo_base_url=repo_base_url,
+            app_id=app_id,
+            app_installation_id=app_installation_id,
+            app_privkey_pem=Path(app_privkey_pem),
+            scheduler=RequestScheduler(
+                Path(rate_limit_state_filepath),
+                requests_per_minute=requests_per_minute,
+                burst=burst,
+            ),
+            token_cache=(
+                InstallationTokenCache(Path(token_cache_filepath))
+                if token_cache_filepath
+                else None
+            ),
+        )
+        return self.gh_checks.app_install_access_token
+
+    def _start_check_run(
+        self,
+        revision_sha: str,
+        check_names: list[str],
+        max_workers: int = 8,
+        *,
+        reuse_existing: bool = False,
+    ) -> None:
+        gh_checks = self._initialized_checks()
+        if len(check_names) == 1:
+            gh_checks.start_check_run(
+                revision_sha,
+                check_names[0],
+                reuse_existing=reuse_existing,
+            )
+        else:
+            gh_checks.start_check_runs(
+                revision_sha,
+                check_names,
+                max_workers=max_workers,
+                reuse_existing=reuse_existing,
+            )
+
+    def _finish_check_run(  # noqa: PLR0913
+        self,
+        validation_log: str | list[list[str]],
+        log_format: str | None,
+        local_repo_path: str,
+        ignored_globs: list[str] | None,
+        *,
+        mute_ignored_annotations: bool,
+        conclusion: str | None,
+        max_workers: int,
+        journal_fp: str,
+        max_batch_bytes: int,
+        check_name: str | None = None,
+        streamed_fp: str | None = None,
+    ) -> None:
+        finish_check_run_from_log(
+            self._initialized_checks(),
+            Path(validation_log)
+            if isinstance(validation_log, str)
+            else [
+                ValidationLog(Path(log_fp), log_fp_format)
+                for log_fp, log_fp_format in validation_log
+            ],
+            log_format,
+            Path(local_repo_path),
+            ignored_globs=ignored_globs,
+            mute_ignored_annotations=mute_ignored_annotations,
+            conclusion=conclusion,
+            max_workers=max_workers,
+            journal_fp=Path(journal_fp),
+            max_batch_bytes=max_batch_bytes,
+            check_name=check_name,
+            streamed_fp=Path(streamed_fp) if streamed_fp else None,
+        )
+
+    def _replay(
+        self,
+        payloads_fps: list[str],
+        max_workers: int,
+        session_fp: str,
+        *,
+        remove_uploaded: bool = False,
+    ) -> None:
+        replay_payloads(
+            self._initialized_checks(),
+            [Path(payloads_fp) for payloads_fp in payloads_fps],
+            max_workers=max_workers,
+            session_fp=Path(session_fp),
+            remove_uploaded=remove_uploaded,
+        )
+
+    def _watch(  # noqa: PLR0913
+        self,
+        lines: list[str],
+        log_format: str,
+        local_repo_path: str,
+        ignored_globs: list[str] | None,
+        *,
+        mute_ignored_annotations: bool,
+        streamed_fp: str,
+        max_batch_bytes: int,
+        check_name: str | None = None,
+    ) -> None:
+        # the client follows the log, the daemon parses & posts each batch of lines
+        stream_log_lines(
+            self._initialized_checks(),
+            lines,
+            log_format,
+            Path(local_repo_path),
+            ignored_globs=ignored_globs,
+            mute_ignored_annotations=mute_ignored_annotations,
+            streamed_fp=Path(streamed_fp),
+            max_batch_bytes=max_batch_bytes,
+            check_name=check_name,
+        )
+
+    def _cleanup(self) -> None:
+        self.gh_checks = None
+        self._shutdown_requested = True
+
+    def _initialized_checks(self) -> GitHubChecks:
+        if not self.gh_checks:
+            msg = "The daemon's checks session is not initialized, run `init` first."
+            raise RuntimeError(msg)
+        return self.gh_checks
+
+
+class _ChecksRequestHandler(socketserver.StreamRequestHandler):
+    server: ChecksDaemon
+
+    def handle(self) -> None:
+        request_line = self.rfile.readline()
+        if not request_line:
+            return  # e.g. another daemon probing whether this one is alive
+        response: dict[str, Any]
+        try:
+            request = json.loads(request_line)
+            result = self.server.execute(request["command"], request.get("params", {}))
+            response = {"result": result}
+        except Exception as err:  # noqa: BLE001 - report any failure to the client
+            LOGGER.critical("[github-checks] Daemon failed to execute command: %s", err)
+            response = {"error": f"{type(err).__name__}: {err}"}
+        self.wfile.write(json.dumps(response).encode() + b"\n")
+
+
+def serve(
+    socket_fp: Path,
+    *,
+    idle_timeout: float | None,
+    detach: bool,
+    metrics_fp: Path | None = None,
+    metrics_format: Literal["json", "prometheus"] = "json",
+) -> None:
+    """Run the daemon on the given socket until `cleanup` is requested.
+
+    :param socket_fp: the Unix domain socket to listen on
+    :param idle_timeout: seconds without commands until shutdown, optional
+    :param detach: whether to fork into the background once the socket accepts
+        connections, returning right away in the calling process
+    :param metrics_fp: file to write the metrics of each command to, optional
+    :param metrics_format: `json` or `prometheus`, see `MetricsCollector.write`
+    """
+    # load all formatters upfront, rather than on the (timed) path of a command
+    for log_format in LOG_OUTPUT_FORMATTERS:
+        load_log_output_formatter(log_format)
+    for log_format in LINE_ANNOTATION_PARSERS:
+        load_line_annotation_parser(log_format)
+
+    daemon = ChecksDaemon(
+        socket_fp,
+        idle_timeout,
+        metrics_fp=metrics_fp,
+        metrics_format=metrics_format,
+    )
+    if detach and os.fork() != 0:
+        daemon.socket.close()  # the forked daemon keeps listening
+        return
+    if detach:
+        os.setsid()  # don't get killed along with the shell that started us
+        # release the caller's stdio, else anyone reading its output waits for us
+        devnull_fd = os.open(os.devnull, os.O_RDWR)
+        for std_fd in (0, 1, 2):
+            os.dup2(devnull_fd, std_fd)
+        os.close(devnull_fd)
+    LOGGER.info("[github-checks] Daemon listening on %s.", socket_fp)
+    try:
+        daemon.serve_until_cleanup()
+    finally:
+        daemon.server_close()
@@ -0,0 +1,367 @@
+"""Local fake of GitHub's installation token & Checks API endpoints, for offline tests.
+
+Serves just enough of the API for `GitHubChecks` and `AsyncGitHubChecks` to run
+against it, incl. GitHub's limit of 50 annotations per update, with configurable
+latency, injected failures and rate limit headers. All requests are recorded:
+
+```python
+with running_fake_github(latency_seconds=0.05) as fake:
+    gh_checks = GitHubChecks(..., github_api_base_url=fake.base_url)
+    fake.inject_failures(429, count=2, method="PATCH")
+    ...
+    assert fake.requests[-1].body["conclusion"] == "success"
+```
+
+To keep its CPU usage apart from the client's, e.g. in benchmarks, run it in its own
+process via `python -m github_checks.fake_github --port 8080`, and read its counters
+from `GET /_fake/stats`.
+"""
+
+import argparse
+import json
+import threading
+import time
+from collections.abc import Iterator
+from contextlib import contextmanager
+from dataclasses import dataclass
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+from typing import Any, NamedTuple
+from urllib.parse import ParseResult, parse_qs, urlparse
+
+# GitHub rejects updates of a check run with more annotations than this
+MAX_ANNOTATIONS_PER_REQUEST = 50
+
+
+class RecordedRequest(NamedTuple):
+    """A request received by the fake, with its decoded JSON body."""
+
+    method: str
+    path: str
+    body: dict[str, Any]
+
+
+@dataclass
+class _InjectedFailure:
+    status_code: int
+    remaining: int
+    method: str | None
+    retry_after: int | None
+
+
+class FakeGitHubServer(ThreadingHTTPServer):
+    """Fake of the GitHub API, serving each request on its own thread."""
+
+    daemon_threads = True
+
+    def __init__(  # noqa: PLR0913
+        self,
+        host: str = "127.0.0.1",
+        port: int = 0,
+        *,
+        latency_seconds: float = 0.0,
+        rate_limit: int = 1_000_000,
+        rate_limit_window_seconds: int = 3600,
+        record_bodies: bool = True,
+    ) -> None:
+        """Bind the server, it then needs to be run, e.g. via `serve_forever`.
+
+        :param host: the host to listen on, optional, defaults to localhost only
+        :param port: the port to listen on, optional, defaults to any free port
+        :param latency_seconds: delay before answering each request, optional
+        :param rate_limit: requests per window until requests are rejected with 429,
+            optional, defaults to practically unlimited
+        :param rate_limit_window_seconds: length of the rate limit window, optional
+        :param record_bodies: whether to keep the bodies of recorded requests,
+            optional, turn off to save memory when sending many annotations
+        """
+        super().__init__((host, port), _FakeGitHubHandler)
+        self.latency_seconds = latency_seconds
+        self.rate_limit = rate_limit
+        self.rate_limit_window_seconds = rate_limit_window_seconds
+        self.record_bodies = record_bodies
+        self.requests: list[RecordedRequest] = []
+        self.check_runs: list[dict[str, Any]] = []  # created via POST, listed via GET
+        self.bytes_received = 0
+        self.annotations_received = 0
+        self._failures: list[_InjectedFailure] = []
+        self._lock = threading.Lock()
+        self._next_run_id = 1
+        self._window_start = time.time()
+        self._window_requests = 0
+
+    @property
+    def base_url(self) -> str:
+        """The URL to pass as `github_api_base_url`."""
+        return f"http://{self.server_address[0]!s}:{self.server_address[1]}"
+
+    def inject_failures(
+        self,
+        status_code: int,
+        count: int = 1,
+        *,
+        method: str | None = None,
+        retry_after: int | None = None,
+    ) -> None:
+        """Answer the next requests with an error, instead of handling them.
+
+        :param status_code: the error to respond with, e.g. 422, 429 or 502
+        :param count: the number of requests to fail, optional, defaults to 1
+        :param method: only fail requests of this HTTP method, optional
+        :param retry_after: value of the `Retry-After` header to send, optional
+        """
+        with self._lock:
+            self._failures.append(
+                _InjectedFailure(status_code, count, method, retry_after),
+            )
+
+    def stats(self) -> dict[str, int]:
+        """Count the requests per method, and the bytes & annotations received."""
+        with self._lock:
+            stats: dict[str, int] = {
+                "requests": len(self.requests),
+                "bytes_received": self.bytes_received,
+                "annotations_received": self.annotations_received,
+            }
+            for request in self.requests:
+                stats[f"{request.method.lower()}_requests"] = (
+                    stats.get(f"{request.method.lower()}_requests", 0) + 1
+                )
+            return stats
+
+    def _record(self, method: str, path: str, body: dict[str, Any], size: int) -> int:
+        """Record a request, returning an ID to use for anything it creates."""
+        with self._lock:
+            self.requests.append(
+                RecordedRequest(method, path, body if self.record_bodies else {}),
+            )
+            self.bytes_received += size
+            self.annotations_received += len(
+                body.get("output", {}).get("annotations", []),
+            )
+            run_id = self._next_run_id
+            self._next_run_id += 1
+            return run_id
+
+    def _take_failure(self, method: str) -> _InjectedFailure | None:
+        with self._lock:
+            for failure in self._failures:
+                if failure.method in {None, method}:
+                    failure.remaining -= 1
+                    if not failure.remaining:
+                        self._failures.remove(failure)
+                    return failure
+            return None
+
+    def _take_rate_limit(self) -> tuple[bool, dict[str, str]]:
+        """Count a request against the rate limit.
+
+        :return: whether the request is within the rate limit, and the headers
+            reporting the state of the rate limit
+        """
+        with self._lock:
+            now = time.time()
+            if now - self._window_start >= self.rate_limit_window_seconds:
+                self._window_start, self._window_requests = now, 0
+            self._window_requests += 1
+            used = min(self._window_requests, self.rate_limit)
+            return self._window_requests <= self.rate_limit, {
+                "X-RateLimit-Limit": str(self.rate_limit),
+                "X-RateLimit-Remaining": str(self.rate_limit - used),
+                "X-RateLimit-Used": str(used),
+                "X-RateLimit-Reset": str(
+                    int(self._window_start + self.rate_limit_window_seconds),
+                ),
+            }
+
+
+class _FakeGitHubHandler(BaseHTTPRequestHandler):
+    server: FakeGitHubServer
+
+    def log_message(self, *_: object) -> None:
+        pass  # keep the output of tests & benchmarks clean
+
+    def _read_body(self) -> tuple[dict[str, Any], int]:
+        length = int(self.headers.get("Content-Length", 0))
+        return (json.loads(self.rfile.read(length)) if length else {}), length
+
+    def _respond(
+        self,
+        status: int,
+        body: dict[str, Any],
+        headers: dict[str, str] | None = None,
+    ) -> None:
+        payload = json.dumps(body).encode()
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(payload)))
+        for name, value in (headers or {}).items():
+            self.send_header(name, value)
+        self.end_headers()
+        self.wfile.write(payload)
+
+    def _handle(self, method: str) -> None:
+        """Apply latency, injected failures & rate limits, then answer the request."""
+        body, size = self._read_body()
+        url = urlparse(self.path)
+        if url.path == "/_fake/stats":
+            self._respond(200, self.server.stats())
+            return
+        if self.server.latency_seconds:
+            time.sleep(self.server.latency_seconds)
+        run_id = self.server._record(method, url.path, body, size)  # noqa: SLF001
+
+        within_limit, rate_limit_headers = self.server._take_rate_limit()  # noqa: SLF001
+        if not within_limit:
+            self._respond(
+                429,
+                {"message": "API rate limit exceeded"},
+                {**rate_limit_headers, "Retry-After": "1"},
+            )
+            return
+        if failure := self.server._take_failure(method):  # noqa: SLF001
+            headers = dict(rate_limit_headers)
+            if failure.retry_after is not None:
+                headers["Retry-After"] = str(failure.retry_after)
+            self._respond(
+                failure.status_code,
+                {"message": f"Injected failure {failure.status_code}"},
+                headers,
+            )
+            return
+
+        status, response = getattr(self, f"_{method.lower()}")(url, body, run_id)
+        self._respond(status, response, rate_limit_headers)
+
+    def do_GET(self) -> None:
+        self._handle("GET")
+
+    def do_POST(self) -> None:
+        self._handle("POST")
+
+    def do_PATCH(self) -> None:
+        self._handle("PATCH")
+
+    def _get(
+        self,
+        url: ParseResult,
+        _body: dict[str, Any],
+        _run_id: int,
+    ) -> tuple[int, dict[str, Any]]:
+        query = {key: values[0] for key, values in parse_qs(url.query).items()}
+        head_sha = url.path.split("/commits/")[-1].removesuffix("/check-runs")
+        check_runs = [
+            check_run
+            for check_run in self.server.check_runs
+            if check_run["head_sha"] == head_sha
+            and check_run["name"] == query.get("check_name", check_run["name"])
+            and check_run["status"] == query.get("status", check_run["status"])
+        ]
+        page, per_page = int(query.get("page", 1)), int(query.get("per_page", 30))
+        return 200, {
+            "total_count": len(check_runs),
+            "check_runs": check_runs[(page - 1) * per_page : page * per_page],
+        }
+
+    def _post(
+        self,
+        url: ParseResult,
+        body: dict[str, Any],
+        run_id: int,
+    ) -> tuple[int, dict[str, Any]]:
+        if url.path.endswith("/access_tokens"):
+            return 201, {"token": "fake-token", "expires_at": "2099-01-01T00:00:00Z"}
+        check_run = {
+            "id": run_id,
+            "name": body.get("name"),
+            "head_sha": body.get("head_sha"),
+            "status": body.get("status", "queued"),
+            "app": {"id": 1},
+        }
+        self.server.check_runs.append(check_run)
+        return 201, check_run
+
+    def _patch(
+        self,
+        url: ParseResult,
+        body: dict[str, Any],
+        _run_id: int,
+    ) -> tuple[int, dict[str, Any]]:
+        annotations = body.get("output", {}).get("annotations", [])
+        if len(annotations) > MAX_ANNOTATIONS_PER_REQUEST:
+            return 422, {"message": "Only 50 annotations are allowed per request."}
+        run_id = int(url.path.rsplit("/", 1)[-1])
+        for check_run in self.server.check_runs:
+            if check_run["id"] == run_id and "conclusion" in body:
+                check_run["status"] = "completed"
+                check_run["conclusion"] = body["conclusion"]
+        return 200, {"id": run_id}
+
+
+@contextmanager
+def running_fake_github(**kwargs: Any) -> Iterator[FakeGitHubServer]:  # noqa: ANN401
+    """Run a fake on a background thread, for the duration of the context.
+
+    :param kwargs: any arguments of `FakeGitHubServer`
+    """
+    server = FakeGitHubServer(**kwargs)
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    try:
+        yield server
+    finally:
+        server.shutdown()
+        server.server_close()
+
+
+def write_app_private_key(pem_fp: Path) -> Path:
+    """Write a new private key of a fake app, to sign its JWTs with.
+
+    The fake accepts any JWT, so any RSA key does.
+
+    :param pem_fp: the PEM file to write the key to
+    :return: the PEM file, e.g. as `app_privkey_pem` of `GitHubChecks`
+    """
+    # imported lazily, as only needed by tests & benchmarks setting up a client
+    from cryptography.hazmat.primitives import serialization  # noqa: PLC0415
+    from cryptography.hazmat.primitives.asymmetric import rsa  # noqa: PLC0415
+
+    private_key = rsa.generate_private_key(public_exponent=65537, key_size=2048)
+    pem_fp.write_bytes(
+        private_key.private_bytes(
+            encoding=serialization.Encoding.PEM,
+            format=serialization.PrivateFormat.TraditionalOpenSSL,
+            encryption_algorithm=serialization.NoEncryption(),
+        ),
+    )
+    return pem_fp
+
+
+def main() -> None:
+    """Run a fake in the foreground, until interrupted."""
+    argparser = argparse.ArgumentParser(description=__doc__.split("\n")[0])
+    argparser.add_argument("--host", default="127.0.0.1")
+    argparser.add_argument("--port", type=int, default=0)
+    argparser.add_argument("--latency-seconds", type=float, default=0.0)
+    argparser.add_argument("--rate-limit", type=int, default=1_000_000)
+    args = argparser.parse_args()
+
+    server = FakeGitHubServer(
+        args.host,
+        args.port,
+        latency_seconds=args.latency_seconds,
+        rate_limit=args.rate_limit,
+        record_bodies=False,
+    )
+    # announce where we're listening, e.g. for a benchmark which started us on port 0
+    print(server.base_url, flush=True)  # noqa: T201
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
+
+
+if __name__ == "__main__":
+    main()
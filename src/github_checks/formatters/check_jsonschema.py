@@ -1,18 +1,36 @@
 """Formatter to process check-jsonschema output and yield GitHub annotations."""
 
-import json
+import re
+from bisect import bisect_right
+from concurrent.futures import ProcessPoolExecutor
+from functools import lru_cache
+from json.decoder import scanstring  # type: ignore[attr-defined]
 from pathlib import Path
+from typing import Any
 
 from pydantic import BaseModel
 
-from github_checks.formatters.utils import filter_for_checksignore, get_conclusion
+from github_checks.formatters.chunked import available_cpus
+from github_checks.formatters.json_stream import iter_json_items
+from github_checks.formatters.paths import get_path_normalizer
+from github_checks.formatters.utils import (
+    filter_for_checksignore,
+    get_conclusion,
+    validate_in_batches,
+)
+from github_checks.metrics import timed_phase
 from github_checks.models import (
     AnnotationLevel,
-    CheckAnnotation,
+    AnnotationStore,
     CheckRunConclusion,
     CheckRunOutput,
 )
 
+try:
+    import yaml  # type: ignore[import-untyped, unused-ignore]
+except ImportError:  # pragma: no cover - depends on the installed extras
+    yaml = None
+
 
 class _CheckJsonSchemaSubError(BaseModel):
     path: str
@@ -32,30 +50,256 @@ class _CheckJsonSchemaError(BaseModel):
     sub_errors: list[_CheckJsonSchemaSubError] | None = None
 
 
-def get_err_loc(filename: Path, path: str) -> tuple[int, int, int]:
-    """Get the line number of the error in the file."""
-    # path looks something like "@.attributeA.attributeB"
+# total size of the instance files from which they're indexed in parallel, as each
+# worker process first has to import the formatter
+PARALLEL_MIN_BYTES = 4 * 1024 * 1024
+_YAML_SUFFIXES = frozenset((".yaml", ".yml"))
+_WHITESPACE = re.compile(r"[ \t\n\r]*")
+_JSON_SCALAR = re.compile(
+    r"-?(?:0|[1-9]\d*)(?:\.\d+)?(?:[eE][-+]?\d+)?|true|false|null",
+)
+
+
+class _PositionIndex:
+    """The position of each value within an instance file, by its JSON path.
+
+    The paths are rendered like check-jsonschema renders those of its errors, e.g.
+    `$.a.b[3]`, such that each error resolves via a single dictionary lookup. Members
+    are located at their key, array elements at their value.
+    """
+
+    def __init__(self, text: str, *, is_yaml: bool) -> None:
+        raw_lines = text.split("\n")
+        self.lines = [line.removesuffix("\r") for line in raw_lines]
+        self._line_starts = [0]
+        for line in raw_lines[:-1]:
+            self._line_starts.append(self._line_starts[-1] + len(line) + 1)
+        # the offset of each value in the text, `None` if the file couldn't be parsed
+        self._offsets: dict[str, int] | None
+        try:
+            self._offsets = _yaml_offsets(text) if is_yaml else _json_offsets(text)
+        except (ValueError, RecursionError):
+            self._offsets = None
+        except Exception as err:
+            if yaml is None or not isinstance(err, yaml.YAMLError):
+                raise
+            self._offsets = None
+
+    def locate(self, path: str) -> tuple[int, int, int]:
+        """Get the line, start & end column of the value at the path, 0-based.
+
+        :param path: the JSON path of a check-jsonschema error, e.g. `$.a.b[3]`
+        :return: the position of the value, the line's end as its end column
+        """
+        if path.startswith("@"):  # the root as rendered by older versions
+            path = "$" + path[1:]
+        if path == "$":
+            return 0, 0, 0  # error was global (e.g. missing field)
+        offset = self._offsets.get(path) if self._offsets is not None else None
+        if offset is None:
+            return _find_err_loc_by_text(self.lines, path)
+        line_idx = bisect_right(self._line_starts, offset) - 1
+        return line_idx, offset - self._line_starts[line_idx], len(self.lines[line_idx])
+
+
+def _skip_whitespace(text: str, pos: int) -> int:
+    return _WHITESPACE.match(text, pos).end()  # type: ignore[union-attr]
+
+
+def _expect(text: str, pos: int, char: str) -> int:
+    """Check for the given character, returning the position after it."""
+    if text[pos : pos + 1] != char:
+        msg = f"Expected {char!r} at offset {pos}."
+        raise ValueError(msg)
+    return pos + 1
+
+
+def _json_offsets(text: str) -> dict[str, int]:
+    """Scan a JSON document, for the offset of each of its values by JSON path."""
+    offsets: dict[str, int] = {}
+    end = _scan_json_value(text, _skip_whitespace(text, 0), "$", offsets)
+    if _skip_whitespace(text, end) != len(text):
+        msg = f"Extra data after the JSON document at offset {end}."
+        raise ValueError(msg)
+    return offsets
+
+
+def _scan_json_value(text: str, pos: int, path: str, offsets: dict[str, int]) -> int:
+    """Record the offsets of the value's members or elements, returning its end."""
+    char = text[pos : pos + 1]
+    if char == "{":
+        return _scan_json_object(text, pos, path, offsets)
+    if char == "[":
+        return _scan_json_array(text, pos, path, offsets)
+    if char == '"':
+        string_end: int = scanstring(text, pos + 1)[1]
+        return string_end
+    if scalar := _JSON_SCALAR.match(text, pos):
+        return scalar.end()
+    msg = f"Expected a JSON value at offset {pos}."
+    raise ValueError(msg)
+
+
+def _scan_json_object(text: str, pos: int, path: str, offsets: dict[str, int]) -> int:
+    pos = _skip_whitespace(text, pos + 1)
+    if text[pos : pos + 1] == "}":
+        return pos + 1
+    while True:
+        key_start = _expect(text, pos, '"')
+        key, pos = scanstring(text, key_start)
+        member_path = f"{path}.{key}"
+        # at the key, just after its opening quote, the last one of repeated keys
+        offsets[member_path] = key_start
+        pos = _skip_whitespace(text, _expect(text, _skip_whitespace(text, pos), ":"))
+        pos = _skip_whitespace(
+            text,
+            _scan_json_value(text, pos, member_path, offsets),
+        )
+        if text[pos : pos + 1] == "}":
+            return pos + 1
+        pos = _skip_whitespace(text, _expect(text, pos, ","))
+
+
+def _scan_json_array(text: str, pos: int, path: str, offsets: dict[str, int]) -> int:
+    pos = _skip_whitespace(text, pos + 1)
+    if text[pos : pos + 1] == "]":
+        return pos + 1
+    item_idx = 0
+    while True:
+        item_path = f"{path}[{item_idx}]"
+        offsets[item_path] = pos
+        pos = _skip_whitespace(text, _scan_json_value(text, pos, item_path, offsets))
+        if text[pos : pos + 1] == "]":
+            return pos + 1
+        pos = _skip_whitespace(text, _expect(text, pos, ","))
+        item_idx += 1
+
+
+def _yaml_offsets(text: str) -> dict[str, int]:
+    """Compose a YAML document, for the offset of each of its values by JSON path."""
+    if yaml is None:
+        msg = "Locating errors in YAML files requires PyYAML."
+        raise ValueError(msg)
+    offsets: dict[str, int] = {}
+    root = yaml.compose(text, Loader=getattr(yaml, "CSafeLoader", yaml.SafeLoader))
+    if root is not None:
+        _index_yaml_node(root, "$", offsets, ancestors=set())
+    return offsets
+
+
+def _index_yaml_node(
+    node: Any,  # noqa: ANN401
+    path: str,
+    offsets: dict[str, int],
+    ancestors: set[int],
+) -> None:
+    if id(node) in ancestors:
+        return  # an alias of one of its ancestors, which would recurse endlessly
+    ancestors.add(id(node))
+    if isinstance(node, yaml.MappingNode):
+        for key_node, value_node in node.value:
+            member_path = f"{path}.{key_node.value}"
+            # at the key, just after its opening quote if quoted
+            offsets[member_path] = key_node.start_mark.index + (
+                1 if key_node.style in {"'", '"'} else 0
+            )
+            _index_yaml_node(value_node, member_path, offsets, ancestors)
+    elif isinstance(node, yaml.SequenceNode):
+        for item_idx, item_node in enumerate(node.value):
+            item_path = f"{path}[{item_idx}]"
+            offsets[item_path] = item_node.start_mark.index
+            _index_yaml_node(item_node, item_path, offsets, ancestors)
+    ancestors.discard(id(node))
+
+
+def _find_err_loc_by_text(lines: list[str], path: str) -> tuple[int, int, int]:
+    """Find the error by the keys in its path, for files which couldn't be parsed."""
+    # path looks something like "$.attributeA.attributeB"
     offending_attr_parts = path.split(".")[1:]
     num_attr_parts = len(offending_attr_parts)
     if num_attr_parts == 0:
         return 0, 0, 0  # No path to validate, error was global (e.g. missing field)
     num_validated_parts = 0
 
-    with filename.open("r", encoding="utf-8") as file:
-        for i, line in enumerate(file.readlines()):
-            if (
-                line.strip()
-                .strip('"')
-                .startswith(offending_attr_parts[num_validated_parts])
-            ):
-                num_validated_parts += 1
-            if num_validated_parts == num_attr_parts:
-                # If all parts of the path are found, return the line number with col
-                column = line.index(offending_attr_parts[-1])
-                return i, column, len(line) - 1
+    for i, line in enumerate(lines):
+        if (
+            line.strip()
+            .strip('"')
+            .startswith(offending_attr_parts[num_validated_parts])
+        ):
+            num_validated_parts += 1
+        if num_validated_parts == num_attr_parts:
+            # If all parts of the path are found, return the line number with col
+            column = line.index(offending_attr_parts[-1])
+            return i, column, len(line)
     return 0, 0, 0
 
 
+@lru_cache(maxsize=16)
+def _cached_position_index(filename: str, mtime_ns: int, size: int) -> _PositionIndex:  # noqa: ARG001
+    filepath = Path(filename)
+    return _PositionIndex(
+        filepath.read_text(encoding="utf-8"),
+        is_yaml=filepath.suffix.lower() in _YAML_SUFFIXES,
+    )
+
+
+def _position_index(filepath: Path) -> _PositionIndex:
+    """Index the file once, re-indexing it only if it changed since."""
+    stat = filepath.stat()
+    return _cached_position_index(str(filepath), stat.st_mtime_ns, stat.st_size)
+
+
+def _locate_in_file(filename: str, paths: list[str]) -> list[tuple[int, int, int]]:
+    position_index = _position_index(Path(filename))
+    return [position_index.locate(path) for path in paths]
+
+
+def _locate_errors(
+    json_errs: list[_CheckJsonSchemaError],
+) -> list[tuple[int, int, int]]:
+    """Locate each error, indexing each instance file once, several in parallel."""
+    paths_by_filename: dict[str, list[str]] = {}
+    for json_err in json_errs:
+        paths_by_filename.setdefault(json_err.filename, []).append(json_err.path)
+
+    max_workers = min(len(paths_by_filename), available_cpus())
+    if (
+        max_workers > 1
+        and sum(Path(filename).stat().st_size for filename in paths_by_filename)
+        >= PARALLEL_MIN_BYTES
+    ):
+        with ProcessPoolExecutor(max_workers=max_workers) as executor:
+            locations_per_file = list(
+                executor.map(
+                    _locate_in_file,
+                    paths_by_filename,
+                    paths_by_filename.values(),
+                ),
+            )
+    else:
+        locations_per_file = list(
+            map(_locate_in_file, paths_by_filename, paths_by_filename.values()),
+        )
+
+    # the errors of each file are in order, so hand out their locations in turn
+    locations = {
+        filename: iter(file_locations)
+        for filename, file_locations in zip(
+            paths_by_filename,
+            locations_per_file,
+            strict=True,
+        )
+    }
+    return [next(locations[json_err.filename]) for json_err in json_errs]
+
+
+def get_err_loc(filename: Path, path: str) -> tuple[int, int, int]:
+    """Get the line number of the error in the file."""
+    return _position_index(filename).locate(path)
+
+
+@timed_phase("formatting")
 def format_jsonschema_check_run_output(
     json_output_fp: Path,
     local_repo_base: Path,
@@ -64,43 +308,39 @@ def format_jsonschema_check_run_output(
     mute_ignored_annotations: bool = False,
 ) -> tuple[CheckRunOutput, CheckRunConclusion]:
     """Generate high level results, to be shown on the "Checks" tab."""
-    with json_output_fp.open("r", encoding="utf-8") as json_file:
-        file_content = json_file.read()
-    if not file_content.strip() or file_content in ("{}", "[]"):
-        errors = []
-    else:
-        errors = json.loads(file_content).get("errors", [])
-
-    annotations = []
-
-    for error_dict in errors:
-        json_err: _CheckJsonSchemaError = _CheckJsonSchemaError.model_validate(
-            error_dict,
+    # an empty output, `{}` or `[]` simply contain no errors
+    with json_output_fp.open("rb") as json_file:
+        json_errs = list(
+            validate_in_batches(
+                _CheckJsonSchemaError,
+                iter_json_items(json_file, "errors"),
+            ),
         )
 
-        err_line, err_start_column, err_end_column = get_err_loc(
-            Path(json_err.filename),
-            json_err.path,
-        )
+    annotations = AnnotationStore()
+    path_normalizer = get_path_normalizer(local_repo_base)
+    for json_err, (err_line, err_start_column, err_end_column) in zip(
+        json_errs,
+        _locate_errors(json_errs),
+        strict=True,
+    ):
         message = json_err.message
         if json_err.has_sub_errors and json_err.best_match:
             message += "\n" + json_err.best_match.message
-        annotations.append(
-            CheckAnnotation(
-                path=json_err.filename,
-                start_line=err_line + 1,  # GitHub uses 1-based indexing
-                end_line=err_line + 1,  # GitHub uses 1-based indexing
-                start_column=err_start_column + 1,  # GitHub uses 1-based indexing
-                end_column=err_end_column + 1,  # GitHub uses 1-based indexing
-                annotation_level=AnnotationLevel.WARNING,
-                message=message,
-                title=f"Schema validation error on {json_err.path}",
-            ),
+        annotations.add(
+            path_normalizer.relative_path(json_err.filename),
+            message,
+            AnnotationLevel.WARNING,
+            start_line=err_line + 1,  # GitHub uses 1-based indexing
+            end_line=err_line + 1,  # GitHub uses 1-based indexing
+            start_column=err_start_column + 1,  # GitHub uses 1-based indexing
+            end_column=err_end_column + 1,  # GitHub uses 1-based indexing
+            title=f"Schema validation error on {json_err.path}",
         )
 
     # Filter out ignored files from the verdict / annotations (depending on settings)
     if ignored_globs:
-        filtered_annotations: list[CheckAnnotation] = list(
+        filtered_annotations = AnnotationStore(
             filter_for_checksignore(
                 annotations,
                 ignored_globs,
@@ -0,0 +1,138 @@
+"""Formatting of very large tool outputs in chunks, in a pool of processes.
+
+Line-based outputs (e.g. mypy's) are split at line boundaries, such that each worker
+reads & validates its own byte range of the file. JSON arrays are read as a stream,
+and their items are handed to the workers in chunks. Either way, the annotations of
+the chunks are merged back in order of the output.
+"""
+
+import os
+from collections import deque
+from collections.abc import Callable, Iterable, Iterator
+from concurrent.futures import Future, ProcessPoolExecutor
+from itertools import islice
+from pathlib import Path
+from typing import Any, TypeVar
+
+# size of an output from which it's formatted in parallel, as each worker process
+# first has to import the formatter, and each chunk has to be sent to it
+PARALLEL_MIN_BYTES = 32 * 1024 * 1024
+# items of a JSON array per chunk, and bytes of a line-based output per chunk
+ITEMS_PER_CHUNK = 2000
+BYTES_PER_CHUNK = 4 * 1024 * 1024
+
+_C = TypeVar("_C")
+_R = TypeVar("_R")
+
+# whether this process is itself a worker of a pool, formatting one of several logs
+_in_pool_worker = False
+
+
+def mark_pool_worker() -> None:
+    """Keep this process from starting pools of its own, as initializer of a pool.
+
+    Otherwise, each worker formatting one of several logs in parallel would start
+    a pool with a process per CPU for a large output, i.e. up to CPUs² processes.
+    """
+    global _in_pool_worker  # noqa: PLW0603
+    _in_pool_worker = True
+
+
+def available_cpus() -> int:
+    """Get the number of CPUs this process may spread its formatting over.
+
+    :return: the number of CPUs, 1 in a worker of a pool
+    """
+    return 1 if _in_pool_worker else os.cpu_count() or 1
+
+
+def parallel_workers(output_fp: Path) -> int:
+    """Get the number of processes to format the output with, 0 if not worth it.
+
+    :param output_fp: the tool's output file
+    :return: the number of worker processes, or 0 to format it in this process
+    """
+    max_workers = available_cpus()
+    if max_workers < 2 or output_fp.stat().st_size < PARALLEL_MIN_BYTES:  # noqa: PLR2004
+        return 0
+    return max_workers
+
+
+def line_chunks(
+    output_fp: Path,
+    chunk_bytes: int | None = None,
+) -> Iterator[tuple[int, int]]:
+    """Split a line-based output into byte ranges of whole lines.
+
+    :param output_fp: the tool's output file
+    :param chunk_bytes: the size of each range, extended to the end of its last line,
+        `BYTES_PER_CHUNK` by default
+    :return: the start & end offset of each range, in order
+    """
+    chunk_bytes = chunk_bytes or BYTES_PER_CHUNK
+    size = output_fp.stat().st_size
+    with output_fp.open("rb") as output_file:
+        start = 0
+        while start < size:
+            output_file.seek(min(start + chunk_bytes, size))
+            output_file.readline()  # up to the end of the line
+            end = output_file.tell()
+            yield start, end
+            start = end
+
+
+def read_lines(output_fp: Path, start: int, end: int) -> list[str]:
+    """Read the lines of a byte range of a line-based output.
+
+    :param output_fp: the tool's output file
+    :param start: the offset of the range, at the start of a line
+    :param end: the end of the range, at the end of a line
+    :return: the lines of the range
+    """
+    with output_fp.open("rb") as output_file:
+        output_file.seek(start)
+        return output_file.read(end - start).decode("utf-8").split("\n")
+
+
+def item_chunks(
+    items: Iterable[Any],
+    chunk_size: int | None = None,
+) -> Iterator[list[Any]]:
+    """Split a stream of JSON array items into lists of consecutive items.
+
+    :param items: the items, e.g. from `json_stream.iter_json_items`
+    :param chunk_size: the number of items per chunk, `ITEMS_PER_CHUNK` by default
+    :return: the chunks, in order
+    """
+    chunk_size = chunk_size or ITEMS_PER_CHUNK
+    items = iter(items)
+    while chunk := list(islice(items, chunk_size)):
+        yield chunk
+
+
+def map_chunks(
+    format_chunk: Callable[[_C], _R],
+    chunks: Iterable[_C],
+    max_workers: int,
+) -> Iterator[_R]:
+    """Format each chunk in a pool of processes, yielding the results in order.
+
+    The number of chunks in flight is bounded, such that memory stays bounded even if
+    reading the chunks outpaces the workers.
+
+    :param format_chunk: formats a chunk, picklable, e.g. a module-level function
+    :param chunks: the chunks to format
+    :param max_workers: the number of worker processes
+    :return: the result of each chunk, in order of the chunks
+    """
+    executor = ProcessPoolExecutor(max_workers=max_workers)
+    in_flight: deque[Future[_R]] = deque()
+    try:
+        for chunk in chunks:
+            in_flight.append(executor.submit(format_chunk, chunk))
+            while len(in_flight) > 2 * max_workers:
+                yield in_flight.popleft().result()
+        while in_flight:
+            yield in_flight.popleft().result()
+    finally:
+        executor.shutdown(cancel_futures=True)
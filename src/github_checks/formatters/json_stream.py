@@ -0,0 +1,288 @@
+"""Incremental reader for large JSON documents, yielding one array element at a time.
+
+Tool outputs are usually an array of findings, possibly nested, e.g. SARIF's
+`runs[*].results`. Instead of loading the whole document, the formatters select the
+values they need by their path, where `*` stands for each element of an array:
+
+```python
+with json_output_fp.open("rb") as json_file:
+    for json_value in iter_json_values(json_file, ("runs", "*", "results", "*")):
+        run_idx, result_idx = json_value.indices
+        ...
+```
+
+Only the selected values are ever decoded, each on its own, so memory is bounded by
+the largest of them, rather than by the whole document. If the optional `ijson`
+package is installed (`pip install github-checks[stream]`), its C parser is used,
+otherwise a built-in parser decoding each value via the standard `json` module.
+"""
+
+import codecs
+import json
+import re
+from collections.abc import Iterator
+from typing import IO, Any, NamedTuple
+
+try:
+    import ijson  # type: ignore[import-not-found, unused-ignore]
+except ImportError:  # pragma: no cover - depends on the installed extras
+    ijson = None
+
+# matches each element of an array in a path
+ANY_ITEM = "*"
+_CHUNK_SIZE = 1024 * 1024
+_NON_WHITESPACE = re.compile(r"[^ \t\n\r]")
+_NUMBER_START = frozenset("-0123456789")
+_NUMBER_END = re.compile(r"[^0-9eE.+-]")
+
+
+class JSONValue(NamedTuple):
+    """A value selected from a JSON document."""
+
+    path: tuple[str, ...]  # the selecting path, of the ones passed
+    indices: tuple[int, ...]  # the position in each array matched by `*` in the path
+    value: Any
+
+
+def iter_json_values(
+    json_file: IO[bytes],
+    *paths: tuple[str, ...],
+) -> Iterator[JSONValue]:
+    """Decode the values at the given paths, one by one, in order of the document.
+
+    A path consists of the keys of objects and `*` for each element of an array, e.g.
+    `("*",)` selects the elements of a top-level array. Values not matching the
+    expected structure, e.g. `null` instead of an array, or an empty document, simply
+    contain no matches. None of the paths may be a prefix of another one.
+
+    :param json_file: the JSON document, opened in binary mode
+    :param paths: the paths of the values to decode
+    :return: the selected values, along with their path & array indices
+    :raises ValueError: if the document is not valid JSON, up to where it was read
+    """
+    if ijson is not None:
+        # ijson rejects empty documents, which we treat as having no matches
+        head = json_file.read(_CHUNK_SIZE)
+        if head.strip():
+            try:
+                yield from _iter_ijson_values(_PrefixedFile(head, json_file), paths)
+            except ijson.JSONError as err:
+                # consistent with the built-in parser's `json.JSONDecodeError`
+                raise ValueError(str(err)) from err
+    else:
+        yield from _JSONStreamReader(json_file).iter_values(paths)
+
+
+def iter_json_items(json_file: IO[bytes], *path: str) -> Iterator[Any]:
+    """Decode the elements of the array at the given path, one by one.
+
+    :param json_file: the JSON document, opened in binary mode
+    :param path: the keys leading to the array, none for a top-level array
+    """
+    for json_value in iter_json_values(json_file, (*path, ANY_ITEM)):
+        yield json_value.value
+
+
+class _JSONStreamReader:
+    """Walks a JSON document chunk by chunk, decoding only the selected values."""
+
+    def __init__(self, json_file: IO[bytes]) -> None:
+        self._file = json_file
+        self._decoder = codecs.getincrementaldecoder("utf-8")()
+        self._json_decoder = json.JSONDecoder()
+        self._buffer = ""
+        self._pos = 0
+        self._eof = False
+
+    def iter_values(self, paths: tuple[tuple[str, ...], ...]) -> Iterator[JSONValue]:
+        if self._peek() is None:
+            return  # an empty document has no values
+        yield from self._iter_matches(paths, 0, ())
+
+    def _iter_matches(
+        self,
+        paths: tuple[tuple[str, ...], ...],
+        depth: int,
+        indices: tuple[int, ...],
+    ) -> Iterator[JSONValue]:
+        """Yield the matches within the value at the current position, consuming it."""
+        for path in paths:
+            if len(path) == depth:
+                yield JSONValue(path, indices, self._read_value())
+                return
+        char = self._peek()
+        if char == "[" and any(path[depth] == ANY_ITEM for path in paths):
+            item_paths = tuple(path for path in paths if path[depth] == ANY_ITEM)
+            for item_idx in self._iter_container("[", "]"):
+                yield from self._iter_matches(
+                    item_paths,
+                    depth + 1,
+                    (*indices, item_idx),
+                )
+        elif char == "{":
+            for _ in self._iter_container("{", "}"):
+                key = self._read_value()
+                self._consume(":")
+                member_paths = tuple(path for path in paths if path[depth] == key)
+                if member_paths:
+                    yield from self._iter_matches(member_paths, depth + 1, indices)
+                else:
+                    self._read_value()  # not selected, skip it
+        else:
+            self._read_value()  # a scalar, or an array where an object is expected
+
+    def _iter_container(self, start: str, end: str) -> Iterator[int]:
+        """Yield the index of each member of an array/object, positioned at it."""
+        self._consume(start)
+        if self._peek() == end:
+            self._consume(end)
+            return
+        member_idx = 0
+        while True:
+            yield member_idx  # the caller consumes the member
+            member_idx += 1
+            if self._peek() == end:
+                self._consume(end)
+                return
+            self._consume(",")
+
+    def _peek(self) -> str | None:
+        """Skip whitespace, returning the next character, `None` at the end."""
+        while True:
+            if match := _NON_WHITESPACE.search(self._buffer, self._pos):
+                self._pos = match.start()
+                return self._buffer[self._pos]
+            self._pos = len(self._buffer)
+            if not self._fill():
+                return None
+
+    def _consume(self, char: str) -> None:
+        if self._peek() != char:
+            msg = f"Expected {char!r} at offset {self._pos} of the current chunk."
+            raise json.JSONDecodeError(msg, self._buffer, self._pos)
+        self._pos += 1
+
+    def _read_value(self) -> Any:  # noqa: ANN401
+        """Decode the next value, reading further chunks until it's complete."""
+        if self._peek() in _NUMBER_START:
+            # a number's prefix is a valid number too, so read up to the number's end
+            while not _NUMBER_END.search(self._buffer, self._pos) and self._fill():
+                pass
+        while True:
+            try:
+                value, end = self._json_decoder.raw_decode(self._buffer, self._pos)
+            except json.JSONDecodeError:
+                if not self._fill(min_size=len(self._buffer) - self._pos):
+                    raise
+                continue
+            self._pos = end
+            return value
+
+    def _fill(self, min_size: int = 0) -> bool:
+        """Read the next chunk, dropping everything consumed so far.
+
+        :param min_size: read at least this many bytes, such that a value spanning
+            many chunks is re-decoded a logarithmic number of times only
+        :return: whether anything was read
+        """
+        if self._eof:
+            return False
+        chunk = self._file.read(max(_CHUNK_SIZE, min_size))
+        if not chunk:
+            self._eof = True
+        text = self._decoder.decode(chunk, final=self._eof)
+        self._buffer = self._buffer[self._pos :] + text
+        self._pos = 0
+        return bool(chunk)
+
+
+class _PrefixedFile:
+    """A binary file whose first bytes were already read, to put them back."""
+
+    def __init__(self, head: bytes, json_file: IO[bytes]) -> None:
+        self._head = head
+        self._file = json_file
+
+    def read(self, size: int = -1) -> bytes:
+        if not self._head:
+            return self._file.read(size)
+        if size < 0:
+            data, self._head = self._head + self._file.read(), b""
+        else:
+            data, self._head = self._head[:size], self._head[size:]
+        return data
+
+
+def _ijson_prefix(path: tuple[str, ...]) -> str:
+    """Get ijson's prefix of the values at the given path."""
+    return ".".join("item" if key == ANY_ITEM else key for key in path)
+
+
+def _iter_ijson_values(
+    json_file: _PrefixedFile,
+    paths: tuple[tuple[str, ...], ...],
+) -> Iterator[JSONValue]:
+    """Select the values at the given paths via ijson."""
+    if len(paths) == 1 and paths[0].count(ANY_ITEM) == 1 and paths[0][-1] == ANY_ITEM:
+        # the elements of a single array, which ijson builds in C rather than Python
+        for item_idx, item in enumerate(
+            ijson.items(json_file, _ijson_prefix(paths[0]), use_float=True),
+        ):
+            yield JSONValue(paths[0], (item_idx,), item)
+    else:
+        yield from _iter_ijson_events(json_file, paths)
+
+
+def _iter_ijson_events(
+    json_file: _PrefixedFile,
+    paths: tuple[tuple[str, ...], ...],
+) -> Iterator[JSONValue]:
+    """Select the values at the given paths from the events of ijson's parser."""
+    paths_by_prefix = {_ijson_prefix(path): path for path in paths}
+    # the prefixes of the elements of the arrays matched by `*` in each path
+    item_prefixes_by_path = {
+        path: [
+            _ijson_prefix(path[: depth + 1])
+            for depth, key in enumerate(path)
+            if key == ANY_ITEM
+        ]
+        for path in paths
+    }
+    # the current index of each array matched by `*`
+    item_indices: dict[str, int] = {
+        item_prefix: -1
+        for item_prefixes in item_prefixes_by_path.values()
+        for item_prefix in item_prefixes
+    }
+
+    def json_value(path: tuple[str, ...], value: Any) -> JSONValue:  # noqa: ANN401
+        indices = tuple(item_indices[prefix] for prefix in item_prefixes_by_path[path])
+        return JSONValue(path, indices, value)
+
+    builder: Any = None
+    builder_prefix = ""
+    for event_prefix, event, value in ijson.parse(json_file, use_float=True):
+        if builder is not None:
+            builder.event(event, value)
+            if event_prefix == builder_prefix and event in {"end_map", "end_array"}:
+                yield json_value(paths_by_prefix[builder_prefix], builder.value)
+                builder = None
+            continue
+        if event in {"end_map", "end_array", "map_key"}:
+            continue
+        if event_prefix in item_indices:
+            _count_item(item_indices, event_prefix)
+        if event_prefix in paths_by_prefix:
+            if event in {"start_map", "start_array"}:
+                builder, builder_prefix = ijson.ObjectBuilder(), event_prefix
+                builder.event(event, value)
+            else:
+                yield json_value(paths_by_prefix[event_prefix], value)
+
+
+def _count_item(item_indices: dict[str, int], item_prefix: str) -> None:
+    """Count a new element of an array matched by `*`, restarting nested counts."""
+    item_indices[item_prefix] += 1
+    for nested_prefix in item_indices:
+        if nested_prefix.startswith(item_prefix + "."):
+            item_indices[nested_prefix] = -1
@@ -1,14 +1,29 @@
 """Formatter to process mypy output and yield GitHub annotations."""
 
-import json
+from collections.abc import Iterable
 from enum import StrEnum
+from functools import partial
 from pathlib import Path
+from typing import Any
 
 from pydantic import BaseModel
 
-from github_checks.formatters.utils import filter_for_checksignore, get_conclusion
+from github_checks.formatters.chunked import (
+    line_chunks,
+    map_chunks,
+    parallel_workers,
+    read_lines,
+)
+from github_checks.formatters.paths import PathNormalizer, get_path_normalizer
+from github_checks.formatters.utils import (
+    filter_for_checksignore,
+    get_conclusion,
+    validate_json_lines_in_batches,
+)
+from github_checks.metrics import timed_phase
 from github_checks.models import (
     AnnotationLevel,
+    AnnotationStore,
     CheckAnnotation,
     CheckRunConclusion,
     CheckRunOutput,
@@ -39,6 +54,83 @@ class _MyPyJSONError(BaseModel):
     severity: _MyPySeverity
 
 
+def _mypy_error_fields(
+    mypy_err: _MyPyJSONError,
+    path_normalizer: PathNormalizer | None = None,
+) -> dict[str, Any]:
+    """Get the fields of a mypy error's annotation, for a store or `CheckAnnotation`."""
+    message = (
+        mypy_err.message
+        + "\n\n"
+        + MYPY_DETAILS_HINT_TEMPLATE.format(
+            code=mypy_err.code,
+        )
+    )
+    annotation_level = (
+        AnnotationLevel.NOTICE
+        if mypy_err.severity == _MyPySeverity.NOTE
+        else AnnotationLevel.WARNING
+    )
+    return {
+        "path": path_normalizer.relative_path(mypy_err.file)
+        if path_normalizer
+        else mypy_err.file,
+        "message": message,
+        "annotation_level": annotation_level,
+        "start_line": mypy_err.line,
+        "end_line": mypy_err.line,
+        "start_column": mypy_err.column,
+        "end_column": mypy_err.column,
+        "title": f"[{mypy_err.code}]",
+    }
+
+
+def parse_mypy_json_line(
+    line: str,
+    local_repo_base: Path | None = None,
+) -> CheckAnnotation | None:
+    """Parse a single line of mypy output, e.g. while mypy is still running.
+
+    :param line: a line of mypy's JSON output
+    :param local_repo_base: local repository base path, for deriving repo-relative
+        paths, the path is kept as reported by mypy if not given
+    """
+    if not line.strip():
+        return None
+    return CheckAnnotation(
+        **_mypy_error_fields(
+            _MyPyJSONError.model_validate_json(line),
+            get_path_normalizer(local_repo_base) if local_repo_base else None,
+        ),
+    )
+
+
+def _annotate_mypy_lines(
+    lines: Iterable[str],
+    local_repo_base: Path,
+) -> tuple[AnnotationStore, dict[str, None]]:
+    """Annotate the errors in lines of mypy's output, collecting their codes."""
+    annotations = AnnotationStore()
+    issue_codes: dict[str, None] = {}  # in order of findings, for a stable summary
+    path_normalizer = get_path_normalizer(local_repo_base)
+    for mypy_err in validate_json_lines_in_batches(_MyPyJSONError, lines):
+        annotations.add(**_mypy_error_fields(mypy_err, path_normalizer))
+        issue_codes.setdefault(mypy_err.code)
+    return annotations, issue_codes
+
+
+def _annotate_mypy_line_range(
+    line_range: tuple[int, int],
+    json_output_fp: Path,
+    local_repo_base: Path,
+) -> tuple[AnnotationStore, dict[str, None]]:
+    return _annotate_mypy_lines(
+        read_lines(json_output_fp, *line_range),
+        local_repo_base,
+    )
+
+
+@timed_phase("formatting")
 def format_mypy_check_run_output(
     json_output_fp: Path,
     local_repo_base: Path,
@@ -47,44 +139,28 @@ def format_mypy_check_run_output(
     mute_ignored_annotations: bool = False,
 ) -> tuple[CheckRunOutput, CheckRunConclusion]:
     """Generate high level results, to be shown on the "Checks" tab."""
-    with json_output_fp.open("r", encoding="utf-8") as json_file:
-        json_content = [
-            json.loads(line) for line in json_file.readlines() if line.strip()
-        ]  # mypy outputs one JSON object per line
-
-    annotations: list[CheckAnnotation] = []
-    issue_codes = set()
-    for error_dict in json_content:
-        mypy_err: _MyPyJSONError = _MyPyJSONError.model_validate(error_dict)
-        message = (
-            mypy_err.message
-            + "\n\n"
-            + MYPY_DETAILS_HINT_TEMPLATE.format(
-                code=mypy_err.code,
-            )
-        )
-        annotation_level = (
-            AnnotationLevel.NOTICE
-            if mypy_err.severity == _MyPySeverity.NOTE
-            else AnnotationLevel.WARNING
-        )
-        annotations.append(
-            CheckAnnotation(
-                path=mypy_err.file,
-                start_line=mypy_err.line,
-                end_line=mypy_err.line,
-                start_column=mypy_err.column,
-                end_column=mypy_err.column,
-                annotation_level=annotation_level,
-                message=message,
-                title=f"[{mypy_err.code}]",
+    # mypy outputs one JSON object per line, so large outputs are split at lines
+    if max_workers := parallel_workers(json_output_fp):
+        annotations = AnnotationStore()
+        issue_codes: dict[str, None] = {}
+        for chunk_annotations, chunk_issue_codes in map_chunks(
+            partial(
+                _annotate_mypy_line_range,
+                json_output_fp=json_output_fp,
+                local_repo_base=local_repo_base,
             ),
-        )
-        issue_codes.add(mypy_err.code)
+            line_chunks(json_output_fp),
+            max_workers,
+        ):
+            annotations.extend(chunk_annotations)
+            issue_codes |= chunk_issue_codes
+    else:
+        with json_output_fp.open("r", encoding="utf-8") as json_file:
+            annotations, issue_codes = _annotate_mypy_lines(json_file, local_repo_base)
 
     # Filter out ignored files from the verdict / annotations (depending on settings)
     if ignored_globs:
-        filtered_annotations: list[CheckAnnotation] = list(
+        filtered_annotations = AnnotationStore(
             filter_for_checksignore(
                 annotations,
                 ignored_globs,
@@ -0,0 +1,105 @@
+"""Normalization of the files findings are reported in to repository-relative paths."""
+
+import os
+from functools import lru_cache
+from pathlib import Path
+from urllib.parse import unquote, urljoin, urlsplit
+
+# number of distinct paths remembered per normalizer, beyond which it starts over
+_MAX_CACHED_PATHS = 100_000
+
+
+def join_uri(base_uri: str, uri: str) -> str:
+    """Resolve a relative URI against a base URI, which denotes a directory.
+
+    :param base_uri: the base URI, e.g. of a SARIF `uriBaseId`, with or without its
+        trailing slash
+    :param uri: the URI to resolve, returned as is if absolute
+    :return: the resolved URI
+    """
+    if not base_uri or urlsplit(uri).scheme:
+        return uri
+    return urljoin(base_uri if base_uri.endswith("/") else base_uri + "/", uri)
+
+
+class PathNormalizer:
+    """Normalizes the files of findings to paths relative to the repository base.
+
+    Tools report files as absolute or relative paths, or as URIs, and possibly via a
+    symlink to the checkout. Findings usually concentrate on a few hundred files, so
+    each distinct path is normalized only once, without building `Path` objects.
+    """
+
+    def __init__(self, local_repo_base: Path) -> None:
+        """Resolve the repository base, via its symlinks, once.
+
+        :param local_repo_base: local repository base path
+        """
+        base = os.path.abspath(local_repo_base)  # noqa: PTH100
+        # the prefixes of absolute paths in the repository, via its symlink or not
+        self._base_prefixes = tuple(
+            dict.fromkeys(
+                os.path.join(repo_base, "")  # noqa: PTH118
+                for repo_base in (base, os.path.realpath(base))
+            ),
+        )
+        self._cache: dict[tuple[str, str | None], str] = {}
+
+    def relative_path(self, path: str) -> str:
+        """Normalize a file path to the path relative to the repository base.
+
+        :param path: an absolute path, or a path relative to the repository base
+        :return: the repository-relative path, or the normalized path as is if it's
+            outside of the repository
+        """
+        key = (path, None)
+        if key not in self._cache:
+            self._remember(key, self._relative(path))
+        return self._cache[key]
+
+    def relative_uri(self, uri: str, base_uri: str | None = None) -> str:
+        """Normalize a URI, e.g. `file:///repo/a%20b.py`, to a repository-relative path.
+
+        :param uri: a `file` URI, or a URI relative to the base URI or the repository
+        :param base_uri: the base URI to resolve a relative URI against, e.g. that of
+            the SARIF `uriBaseId` of the URI
+        :return: the repository-relative path, or the URI's normalized path as is if
+            it's outside of the repository
+        """
+        key = (uri, base_uri or "")
+        if key not in self._cache:
+            self._remember(
+                key,
+                self._relative(unquote(urlsplit(join_uri(base_uri or "", uri)).path)),
+            )
+        return self._cache[key]
+
+    def _remember(self, key: tuple[str, str | None], relative_path: str) -> None:
+        if len(self._cache) >= _MAX_CACHED_PATHS:
+            self._cache.clear()
+        self._cache[key] = relative_path
+
+    def _relative(self, path: str) -> str:
+        path = os.path.normpath(path)
+        if not os.path.isabs(path):  # noqa: PTH117
+            return path
+        for prefix in self._base_prefixes:
+            if path.startswith(prefix):
+                return path[len(prefix) :]
+        # only hit the file system for paths via a symlink into the repository
+        real_path = os.path.realpath(path)
+        for prefix in self._base_prefixes:
+            if real_path.startswith(prefix):
+                return real_path[len(prefix) :]
+        # outside of the repository, e.g. in an installed package, kept as reported
+        return path
+
+
+@lru_cache(maxsize=8)
+def get_path_normalizer(local_repo_base: Path) -> PathNormalizer:
+    """Get the normalizer for the repository, shared by all formatters of a process.
+
+    :param local_repo_base: local repository base path
+    :return: the normalizer, resolving the repository base only once
+    """
+    return PathNormalizer(local_repo_base)
@@ -6,16 +6,27 @@ and convert it into annotations and summaries suitable for GitHub Checks.
 It includes models for diagnostics, severity levels, and report summaries.
 """
 
-import json
 from collections import defaultdict
+from collections.abc import Iterable, Iterator
 from enum import StrEnum, auto
+from functools import partial
 from pathlib import Path
+from typing import IO, Any
 
 from pydantic import BaseModel
 
-from github_checks.formatters.utils import filter_for_checksignore, get_conclusion
+from github_checks.formatters.chunked import item_chunks, map_chunks, parallel_workers
+from github_checks.formatters.json_stream import ANY_ITEM, iter_json_values
+from github_checks.formatters.paths import PathNormalizer, get_path_normalizer
+from github_checks.formatters.utils import (
+    filter_for_checksignore,
+    get_conclusion,
+    validate_in_batches,
+)
+from github_checks.metrics import timed_phase
 from github_checks.models import (
     AnnotationLevel,
+    AnnotationStore,
     CheckAnnotation,
     CheckRunConclusion,
     CheckRunOutput,
@@ -126,6 +137,26 @@ class PyrightReport(BaseModel):
     summary: PyrightSummary
 
 
+_DIAGNOSTICS_PATH = ("generalDiagnostics", ANY_ITEM)
+_SUMMARY_PATH = ("summary",)
+
+
+def _annotate_pyright_diagnostics(
+    diags_json: Iterable[Any],
+    local_repo_base: Path,
+) -> tuple[AnnotationStore, defaultdict[str, int]]:
+    """Annotate pyright's diagnostics, counting the occurrences of each rule."""
+    annotations = AnnotationStore()
+    rule_counts: defaultdict[str, int] = defaultdict(int)  # auto-initialized to 0
+    path_normalizer = get_path_normalizer(local_repo_base)
+    for diag in validate_in_batches(PyrightDiagnostic, diags_json):
+        annotations.add(**_diagnostic_fields(diag, path_normalizer))
+        if diag.rule:
+            rule_counts[diag.rule] += 1
+    return annotations, rule_counts
+
+
+@timed_phase("formatting")
 def format_pyright_check_run_output(
     json_output_fp: Path,
     local_repo_base: Path,
@@ -134,31 +165,50 @@ def format_pyright_check_run_output(
     mute_ignored_annotations: bool = False,
 ) -> tuple[CheckRunOutput, CheckRunConclusion]:
     """Generate high level results, to be shown on the "Checks" tab."""
-    with json_output_fp.open("r", encoding="utf-8") as json_file:
+    summary_json: Any = None
+
+    def iter_diagnostics_json(json_file: IO[bytes]) -> Iterator[Any]:
+        # only the diagnostics & summary of the report are used, one at a time
+        nonlocal summary_json
+        for json_value in iter_json_values(json_file, _DIAGNOSTICS_PATH, _SUMMARY_PATH):
+            if json_value.path == _SUMMARY_PATH:
+                summary_json = json_value.value
+            else:
+                yield json_value.value
+
+    with json_output_fp.open("rb") as json_file:
         first_line = json_file.readline()
         # for some reason, pyright stdout sometimes starts with a line like this:
         # {'x86': False, 'risc': False, 'lts': False}  # noqa: ERA001
         # I suspect it's a side effect of running node, but don't know for sure.
-        if first_line.startswith("{'x86'"):
+        if first_line.startswith(b"{'x86'"):
             # it's here, skip it, as it's neither relevant to the report nor valid JSON
             pass
         else:
             # weird line is not present, rewind to start
             json_file.seek(0)
-        json_content = json.load(json_file)
-    report = PyrightReport.model_validate(json_content)
-
-    annotations: list[CheckAnnotation] = []
-    rule_counts: defaultdict[str, int] = defaultdict(int)  # auto-initialized to 0
-
-    for diag in report.generalDiagnostics:
-        annotations.append(get_annotation(diag, local_repo_base))
-        if diag.rule:
-            rule_counts[diag.rule] += 1
+        if max_workers := parallel_workers(json_output_fp):
+            # large outputs are annotated in chunks of diagnostics, merged in order
+            annotations = AnnotationStore()
+            rule_counts: defaultdict[str, int] = defaultdict(int)
+            for chunk_annotations, chunk_rule_counts in map_chunks(
+                partial(_annotate_pyright_diagnostics, local_repo_base=local_repo_base),
+                item_chunks(iter_diagnostics_json(json_file)),
+                max_workers,
+            ):
+                annotations.extend(chunk_annotations)
+                for rule, count in chunk_rule_counts.items():
+                    rule_counts[rule] += count
+        else:
+            annotations, rule_counts = _annotate_pyright_diagnostics(
+                iter_diagnostics_json(json_file),
+                local_repo_base,
+            )
+    report_summary = PyrightSummary.model_validate(summary_json)
 
     # Filter out ignored files from the verdict / annotations (depending on settings)
     if ignored_globs:
-        filtered_annotations: list[CheckAnnotation] = list(
+        filtered_annotations = AnnotationStore(
             filter_for_checksignore(
                 annotations,
                 ignored_globs,
@@ -171,7 +221,7 @@ def format_pyright_check_run_output(
     else:
         conclusion = get_conclusion(annotations)
 
-    title, summary = get_summary_and_title(conclusion, report.summary, rule_counts)
+    title, summary = get_summary_and_title(conclusion, report_summary, rule_counts)
 
     return (
         CheckRunOutput(
@@ -242,11 +292,31 @@ def get_annotation(diag: PyrightDiagnostic, local_repo_base: Path) -> CheckAnnot
     Args:
         diag (PyrightDiagnostic): The diagnostic object containing details
             about the issue, such as its location, severity, and message.
+        local_repo_base (Path): The local repository base path, for deriving
+            repository-relative paths.
 
     Returns:
         CheckAnnotation: A formatted annotation object containing the file path,
             issue range, severity level, and message for GitHub Checks.
     """
+    return CheckAnnotation(
+        **_diagnostic_fields(diag, get_path_normalizer(local_repo_base)),
+    )
+
+
+def _diagnostic_fields(
+    diag: PyrightDiagnostic,
+    path_normalizer: PathNormalizer,
+) -> dict[str, Any]:
+    """Get the fields of a Pyright diagnostic's annotation, like `get_annotation`.
+
+    Args:
+        diag (PyrightDiagnostic): The diagnostic to annotate.
+        path_normalizer (PathNormalizer): For deriving repository-relative paths.
+
+    Returns:
+        dict[str, Any]: The fields, for `AnnotationStore.add` or `CheckAnnotation`.
+    """
     rng = diag.range
     start_line = rng.start.line + 1
     end_line = rng.end.line + 1
@@ -255,13 +325,13 @@ def get_annotation(diag: PyrightDiagnostic, local_repo_base: Path) -> CheckAnnot
 
     annotation_level = PyrightSeverity.to_annotation_level(diag.severity)
 
-    return CheckAnnotation(
-        path=str(Path(diag.file).relative_to(local_repo_base)),
-        start_line=start_line,
-        end_line=end_line,
-        start_column=start_column,
-        end_column=end_column,
-        annotation_level=annotation_level,
-        title=f"[{diag.rule}]" if diag.rule else "Uncategorized Pyright Issue",
-        message=diag.message,
-    )
+    return {
+        "path": path_normalizer.relative_path(diag.file),
+        "message": diag.message,
+        "annotation_level": annotation_level,
+        "start_line": start_line,
+        "end_line": end_line,
+        "start_column": start_column,
+        "end_column": end_column,
+        "title": f"[{diag.rule}]" if diag.rule else "Uncategorized Pyright Issue",
+    }
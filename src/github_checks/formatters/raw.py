@@ -2,6 +2,7 @@
 
 from pathlib import Path
 
+from github_checks.metrics import timed_phase
 from github_checks.models import (
     CheckRunConclusion,
     CheckRunOutput,
@@ -12,6 +13,7 @@ from github_checks.models import (
 MAX_OUTPUT_LENGTH = 30000
 
 
+@timed_phase("formatting")
 def format_raw_check_run_output(
     json_output_fp: Path,
     local_repo_base: Path,  # noqa: ARG001
@@ -1,19 +1,31 @@
 """Formatter to process SARIF output and yield GitHub annotations."""
 
-import json
-from collections.abc import Iterable
+from collections.abc import Iterable, Iterator
+from functools import partial
+from itertools import chain, groupby
 from pathlib import Path
+from typing import Any, NamedTuple
 
-from pysarif import Region, ReportingDescriptor, Result, load_from_dict
+from pysarif import Region, ReportingDescriptor, Result, Tool
 
+from github_checks.formatters.chunked import item_chunks, map_chunks, parallel_workers
+from github_checks.formatters.json_stream import ANY_ITEM, JSONValue, iter_json_values
+from github_checks.formatters.paths import get_path_normalizer, join_uri
 from github_checks.formatters.utils import filter_for_checksignore, get_conclusion
+from github_checks.metrics import timed_phase
 from github_checks.models import (
     AnnotationLevel,
-    CheckAnnotation,
+    AnnotationStore,
     CheckRunConclusion,
     CheckRunOutput,
 )
 
+_TOOL_PATH = ("runs", ANY_ITEM, "tool")
+_RESULTS_PATH = ("runs", ANY_ITEM, "results", ANY_ITEM)
+# usually written before the results, which are resolved against the base IDs read
+# so far, or otherwise against the repository base
+_URI_BASE_IDS_PATH = ("runs", ANY_ITEM, "originalUriBaseIds")
+
 
 def get_rule_name(full_rule: ReportingDescriptor) -> str:
     """Extract the rule name from a SARIF ReportingDescriptor.
@@ -30,108 +42,333 @@ def get_rule_name(full_rule: ReportingDescriptor) -> str:
     return "Unknown Rule"
 
 
-def _format_annotations_for_sarif_json_output(
-    json_output_fp: Path,
+class _RuleTexts(NamedTuple):
+    """The parts of a result's annotation texts which only depend on its rule."""
+
+    name: str
+    has_background: bool  # whether the rule has a description, in text or markdown
+    raw_details: str | None
+    help_uri: str | None
+
+
+def _get_rule_texts(full_rule: ReportingDescriptor) -> _RuleTexts:
+    """Derive the texts shared by the annotations of all results of the given rule.
+
+    :param full_rule: SARIF ReportingDescriptor for the rule
+    """
+    description = full_rule.full_description
+    raw_details: str | None = None
+    if description and description.text:
+        raw_details = (
+            "Background for this rule per tool's documentation:\n> "
+            + "\n> ".join(description.text.split("\n"))
+        )
+    return _RuleTexts(
+        name=get_rule_name(full_rule),
+        has_background=bool(description and (description.text or description.markdown)),
+        raw_details=raw_details,
+        help_uri=full_rule.help_uri,
+    )
+
+
+def _find_rule(
+    result: Result,
+    num_rules: int,
+    rule_indices_by_id: dict[str, int],
+) -> int | None:
+    """Find the index of the result's rule, by its ID or else by its `ruleIndex`."""
+    rule_id: str | None = result.rule_id or (result.rule.id if result.rule else None)
+    if rule_id is not None and rule_id in rule_indices_by_id:
+        return rule_indices_by_id[rule_id]
+    rule_index: int | None = result.rule_index
+    if rule_index is None and result.rule:
+        rule_index = result.rule.index
+    if rule_index is not None and 0 <= rule_index < num_rules:
+        return rule_index
+    return None
+
+
+def _result_regions(result: Result) -> Iterator[tuple[str, str | None, Region]]:
+    """Yield the URI, its base ID & the region of each of the result's locations."""
+    for location in result.locations or []:
+        region: Region | None
+        try:
+            artifact_location = location.physical_location.artifact_location  # pyright: ignore[reportOptionalMemberAccess]
+            uri = artifact_location.uri  # pyright: ignore[reportOptionalMemberAccess]
+            region = location.physical_location.region  # pyright: ignore[reportOptionalMemberAccess]
+        except AttributeError:
+            # error without any sensible location, skip it
+            continue
+        if not (uri and region and region.start_line and region.end_line):
+            # error without any sensible location, skip it
+            continue
+        yield uri, artifact_location.uri_base_id, region  # pyright: ignore[reportOptionalMemberAccess]
+
+
+def _resolve_uri_base_ids(uri_base_ids_json: dict[str, Any]) -> dict[str, str]:
+    """Resolve the run's `originalUriBaseIds`, which may be relative to one another.
+
+    :param uri_base_ids_json: the run's `originalUriBaseIds`, by base ID
+    :return: the absolute URI of each base ID which has one
+    """
+    base_uris: dict[str, str] = {}
+    for base_id, artifact_location_json in uri_base_ids_json.items():
+        artifact_location, uri, seen = artifact_location_json, "", {base_id}
+        while isinstance(artifact_location, dict):
+            uri = join_uri(artifact_location.get("uri") or "", uri)
+            parent_id = artifact_location.get("uriBaseId")
+            if parent_id is None or parent_id in seen:
+                break
+            seen.add(parent_id)
+            artifact_location = uri_base_ids_json.get(parent_id)
+        if uri:
+            base_uris[base_id] = uri
+    return base_uris
+
+
+class _SarifRunFormatter:
+    """Formats the results of one run of a tool, i.e. of one entry in `runs`."""
+
+    def __init__(
+        self,
+        tool_json: dict[str, Any],
+        local_repo_base: Path,
+        annotation_level: AnnotationLevel,
+    ) -> None:
+        # Implicitly validates the JSON content against SARIF schema
+        self.tool = Tool.from_dict(tool_json)
+        self.rules: list[ReportingDescriptor] = self.tool.driver.rules or []
+        self._path_normalizer = get_path_normalizer(local_repo_base)
+        self._annotation_level = annotation_level
+        # index the rules once, instead of scanning all of them for each result
+        self._rule_indices_by_id: dict[str, int] = {}
+        for idx, rule in enumerate(self.rules):
+            if rule.id is not None:
+                self._rule_indices_by_id.setdefault(rule.id, idx)
+        self._rule_texts: dict[int, _RuleTexts] = {}
+
+    def format_results(
+        self,
+        results_json: list[dict[str, Any]],
+        base_uris: dict[str, str] | None = None,
+    ) -> AnnotationStore:
+        """Generate the annotations for the given results of the run.
+
+        :param results_json: the results of the run
+        :param base_uris: the absolute URI of each of the run's `uriBaseId`s
+        :return: the annotations of the results, in order
+        """
+        base_uris = base_uris or {}
+        annotations = AnnotationStore()
+        for result_json in results_json:
+            # Implicitly validates the JSON content against SARIF schema
+            result = Result.from_dict(result_json)
+            rule_idx = _find_rule(result, len(self.rules), self._rule_indices_by_id)
+            if rule_idx is None:
+                # This result's rule is not in the tool's rules list, should never occur
+                continue
+            if rule_idx not in self._rule_texts:
+                self._rule_texts[rule_idx] = _get_rule_texts(self.rules[rule_idx])
+
+            title, message, raw_details = get_annotation_texts_from_sarif_result(
+                result,
+                self.rules[rule_idx],
+                self._rule_texts[rule_idx],
+            )
+            for uri, uri_base_id, region in _result_regions(result):
+                err_is_on_one_line: bool = region.start_line == region.end_line
+                annotations.add(
+                    self._path_normalizer.relative_uri(
+                        uri,
+                        base_uris.get(uri_base_id) if uri_base_id else None,
+                    ),
+                    message,
+                    self._annotation_level,
+                    start_line=region.start_line,
+                    end_line=region.end_line,
+                    start_column=region.start_column if err_is_on_one_line else None,
+                    end_column=region.end_column if err_is_on_one_line else None,
+                    title=title,
+                    raw_details=raw_details,
+                )
+        return annotations
+
+
+class _ResultsChunk(NamedTuple):
+    """Consecutive results of a run, along with all it takes to format them."""
+
+    run_idx: int
+    tool_json: dict[str, Any]
+    results_json: list[dict[str, Any]]
+    base_uris: dict[str, str]
+
+
+# the formatters of the runs a worker process received results of, by run index
+_worker_run_formatters: dict[int, _SarifRunFormatter] = {}
+
+
+def _format_chunk_in_worker(
+    chunk: _ResultsChunk,
     local_repo_base: Path,
     annotation_level: AnnotationLevel,
-) -> Iterable[CheckAnnotation]:
-    """Generate annotations for any SARIF json output.
+) -> AnnotationStore:
+    """Format a chunk of a run's results, validating the run's tool only once."""
+    if chunk.run_idx not in _worker_run_formatters:
+        _worker_run_formatters[chunk.run_idx] = _SarifRunFormatter(
+            chunk.tool_json,
+            local_repo_base,
+            annotation_level,
+        )
+    return _worker_run_formatters[chunk.run_idx].format_results(
+        chunk.results_json,
+        chunk.base_uris,
+    )
+
 
-    :param json_output_fp: filepath to the full SARIF json output
-    :param local_repo_base: local repository base path, for deriving repo-relative paths
+class _SarifLogFormatter:
+    """Splits the results of all runs of a SARIF log into chunks, as they're read.
+
+    The results of a run are chunked once the run's tool is known, to be formatted in
+    this process, or in a pool of processes via `map_chunks`, as validating them is
+    CPU bound. Runs follow each other in the log, so the chunks are in its order.
     """
-    with json_output_fp.open("r", encoding="utf-8") as json_file:
-        json_content = json.load(json_file)
-
-    # Implicitly validates the JSON content against SARIF schema
-    sarif_output = load_from_dict(json_content)
-    if not sarif_output.runs:
-        return
-
-    # We only support processing one run in the SARIF output for now
-    run = sarif_output.runs[0]
-    tool_rules: list[ReportingDescriptor] = run.tool.driver.rules or []
-
-    for result in run.results or []:
-        if not (
-            full_rule := next(
-                (rule for rule in tool_rules if rule.id == result.rule_id),
-                None,
-            )
+
+    def __init__(
+        self,
+        local_repo_base: Path,
+        annotation_level: AnnotationLevel,
+    ) -> None:
+        self.run_formatters: dict[int, _SarifRunFormatter] = {}
+        self._base_uris: dict[int, dict[str, str]] = {}
+        self._local_repo_base = local_repo_base
+        self._annotation_level = annotation_level
+
+    def chunks(self, json_values: Iterable[JSONValue]) -> Iterator[_ResultsChunk]:
+        """Split the tools, base IDs & results read from the log into chunks.
+
+        :param json_values: the values read from the log, see `iter_json_values`
+        :return: the chunks of results, in order of the log
+        """
+        for run_idx, run_values in groupby(
+            json_values,
+            key=lambda json_value: json_value.indices[0],
         ):
-            # This result's rule is not in the tool's rules list, should never occur
-            continue
+            yield from self._run_chunks(run_idx, run_values)
 
-        title, message, raw_details = get_annotation_texts_from_sarif_result(
-            result,
-            full_rule,
+    def format_chunk(self, chunk: _ResultsChunk) -> AnnotationStore:
+        """Format a chunk of results in this process."""
+        return self.run_formatters[chunk.run_idx].format_results(
+            chunk.results_json,
+            chunk.base_uris,
         )
 
-        for location in result.locations or []:
-            region: Region | None
-            try:
-                filepath = Path(
-                    location.physical_location.artifact_location.uri.partition(":")[2],  # pyright: ignore[reportOptionalMemberAccess]
-                )
-                region = location.physical_location.region  # pyright: ignore[reportOptionalMemberAccess]
-            except AttributeError:
-                # error without any sensible location, skip it
-                continue
-            if not (region and region.start_line and region.end_line):
-                # error without any sensible location, skip it
-                continue
-            err_is_on_one_line: bool = region.start_line == region.end_line
-
-            yield CheckAnnotation(
-                annotation_level=annotation_level,
-                start_line=region.start_line,
-                start_column=region.start_column if err_is_on_one_line else None,
-                end_line=region.end_line,
-                end_column=region.end_column if err_is_on_one_line else None,
-                path=str(filepath.relative_to(local_repo_base)),
-                message=message,
-                raw_details=raw_details,
-                title=title,
+    def _run_chunks(
+        self,
+        run_idx: int,
+        run_values: Iterator[JSONValue],
+    ) -> Iterator[_ResultsChunk]:
+        results_before_tool: list[dict[str, Any]] = []
+        for json_value in run_values:
+            if json_value.path == _TOOL_PATH:
+                tool_json = json_value.value
+                break
+            if json_value.path == _URI_BASE_IDS_PATH:
+                self._add_uri_base_ids(run_idx, json_value.value)
+            else:
+                results_before_tool.append(json_value.value)
+        else:
+            return  # results of a run without its tool can't be formatted
+
+        self.run_formatters[run_idx] = _SarifRunFormatter(
+            tool_json,
+            self._local_repo_base,
+            self._annotation_level,
+        )
+        for results_json in item_chunks(
+            chain(results_before_tool, self._run_results(run_idx, run_values)),
+        ):
+            yield _ResultsChunk(
+                run_idx,
+                tool_json,
+                results_json,
+                self._base_uris.get(run_idx, {}),
+            )
+
+    def _run_results(
+        self,
+        run_idx: int,
+        run_values: Iterator[JSONValue],
+    ) -> Iterator[dict[str, Any]]:
+        for json_value in run_values:
+            if json_value.path == _RESULTS_PATH:
+                yield json_value.value
+            elif json_value.path == _URI_BASE_IDS_PATH:
+                self._add_uri_base_ids(run_idx, json_value.value)
+
+    def _add_uri_base_ids(self, run_idx: int, uri_base_ids_json: Any) -> None:  # noqa: ANN401
+        if isinstance(uri_base_ids_json, dict):
+            self._base_uris[run_idx] = _resolve_uri_base_ids(uri_base_ids_json)
+
+
+def _format_sarif_log(
+    json_output_fp: Path,
+    local_repo_base: Path,
+) -> tuple[AnnotationStore, list[_SarifRunFormatter]]:
+    """Stream the tools & results of all runs from the log into their formatters."""
+    # Use warning level for annotations (since nothing broke, but still needs fixing)
+    log_formatter = _SarifLogFormatter(local_repo_base, AnnotationLevel.WARNING)
+    annotations = AnnotationStore()
+    with json_output_fp.open("rb") as json_file:
+        chunks = log_formatter.chunks(
+            iter_json_values(
+                json_file,
+                _TOOL_PATH,
+                _URI_BASE_IDS_PATH,
+                _RESULTS_PATH,
+            ),
+        )
+        if max_workers := parallel_workers(json_output_fp):
+            # large logs are annotated in chunks of results, merged back in order
+            chunks_annotations: Iterable[AnnotationStore] = map_chunks(
+                partial(
+                    _format_chunk_in_worker,
+                    local_repo_base=local_repo_base,
+                    annotation_level=AnnotationLevel.WARNING,
+                ),
+                chunks,
+                max_workers,
             )
+        else:
+            chunks_annotations = map(log_formatter.format_chunk, chunks)
+        for chunk_annotations in chunks_annotations:
+            annotations.extend(chunk_annotations)
+    return annotations, [
+        log_formatter.run_formatters[run_idx]
+        for run_idx in sorted(log_formatter.run_formatters)
+    ]
 
 
-def get_annotation_texts_from_sarif_result(  # noqa: C901, PLR0912
+def get_annotation_texts_from_sarif_result(
     result: Result,
     full_rule: ReportingDescriptor,
+    rule_texts: _RuleTexts | None = None,
 ) -> tuple[str, str, str | None]:
     """Extract title, message, and raw_details for a SARIF result annotation.
 
     :param result: SARIF result object
     :param full_rule: SARIF ReportingDescriptor for the rule that triggered this result
+    :param rule_texts: the texts derived from the rule, optional, to reuse them for all
+        of its results, derived from `full_rule` if not given
     :return: tuple of (title, message, raw_details)
     """
-    rule_name: str
-    if full_rule.name:
-        # name should be in full_rule.name, sadly pysarif often fails to parse it
-        rule_name = full_rule.name
-    elif full_rule.help_uri:
-        # if we have a URI for the rule, the final part is usually the rule name
-        rule_name = full_rule.help_uri.split("/")[-1]
-    else:
-        rule_name = "Unknown Rule"
+    if rule_texts is None:
+        rule_texts = _get_rule_texts(full_rule)
 
     # Note: github annotations do not have markdown support, only check run summaries do
-    title: str = f"[{result.rule_id}]: {rule_name}" if result.rule_id else rule_name
-
-    raw_details: str | None = None
+    title: str = (
+        f"[{result.rule_id}]: {rule_texts.name}" if result.rule_id else rule_texts.name
+    )
 
-    if full_rule.full_description and full_rule.full_description.text:
-        raw_details = (
-            "Background for this rule per tool's documentation:\n> "
-            + "\n> ".join(full_rule.full_description.text.split("\n"))
-        )
-    elif full_rule.full_description and full_rule.full_description.markdown:
-        # we'll only use markdown if plain text is not available, as with the raw detail
-        # display of comments not supporting markdown, it's less readable than plain
-        raw_details = (
-            "Background for this rule per tool's documentation:\n> "
-            + "\n> ".join(full_rule.full_description.markdown.split("\n"))
-        )
     message: str | None = None
     if result.message.markdown:
         message = result.message.markdown
@@ -139,12 +376,12 @@ def get_annotation_texts_from_sarif_result(  # noqa: C901, PLR0912
         message = result.message.text
 
     message_add = ""
-    if raw_details:
+    if rule_texts.has_background:
         message_add += "the raw details of this comment"
     if result.rule_id:
         if message_add:
             message_add += " or "
-        rule_uri = f"({full_rule.help_uri}) " if full_rule.help_uri else ""
+        rule_uri = f"({rule_texts.help_uri}) " if rule_texts.help_uri else ""
         message_add += (
             f"documentation for rule {result.rule_id} {rule_uri}for more information."
         )
@@ -154,17 +391,11 @@ def get_annotation_texts_from_sarif_result(  # noqa: C901, PLR0912
     if not message:
         message = "No additional information provided."
 
-    raw_details = None
-
-    if full_rule.full_description and full_rule.full_description.text:
-        raw_details = (
-            "Background for this rule per tool's documentation:\n> "
-            + "\n> ".join(full_rule.full_description.text.split("\n"))
-        )
-
-    return title, message, raw_details
+    # the raw details don't support markdown, so only the plain text is shown there
+    return title, message, rule_texts.raw_details
 
 
+@timed_phase("formatting")
 def format_sarif_check_run_output(
     json_output_fp: Path,
     local_repo_base: Path,
@@ -173,21 +404,15 @@ def format_sarif_check_run_output(
     mute_ignored_annotations: bool = False,
 ) -> tuple[CheckRunOutput, CheckRunConclusion]:
     """Generate high level results, to be shown on the "Checks" tab."""
-    with json_output_fp.open("r", encoding="utf-8") as json_file:
-        json_content = json.load(json_file)
-
-    # Implicitly validates the JSON content against SARIF schema
-    sarif_output = load_from_dict(json_content)
+    annotations, run_formatters = _format_sarif_log(json_output_fp, local_repo_base)
+    # the runs usually come from the same tool, e.g. one per language analyzed
     tool_name = (
-        sarif_output.runs[0].tool.driver.name if sarif_output.runs else "Unknown"
-    )
-    # Use warning level for annotations (since nothing broke, but still needs fixing)
-    annotations: list[CheckAnnotation] = list(
-        _format_annotations_for_sarif_json_output(
-            json_output_fp,
-            local_repo_base,
-            AnnotationLevel.WARNING,
-        ),
+        " & ".join(
+            dict.fromkeys(
+                run_formatter.tool.driver.name for run_formatter in run_formatters
+            ),
+        )
+        or "Unknown"
     )
     if not annotations:
         return (
@@ -204,29 +429,35 @@ def format_sarif_check_run_output(
     # the name _should_ be in full_rule.properties.name, but pysarif fails to parse it,
     # so we use the last part of the help_uri instead, which is identical thankfully
     issues: list[str] = []
-    for rule in sarif_output.runs[0].tool.driver.rules or []:
-        rule_id_str = (
-            f"[[{rule.id}]({rule.help_uri})]" if rule.help_uri else f"[{rule.id}]"
-        )
-        full_desc: str | None = (
-            rule.full_description.markdown
-            if rule.full_description and rule.full_description.markdown
-            else rule.full_description.text
-            if rule.full_description and rule.full_description.text
-            else None
-        )
-
-        issue_str = f"##{rule_id_str} {get_rule_name(rule)}\n"
-        if full_desc:
-            issue_str += (
-                f"Background for this rule per {tool_name}'s documentation:\n> "
+    listed_rules: set[tuple[str, str | None]] = set()
+    for run_formatter in run_formatters:
+        run_tool_name = run_formatter.tool.driver.name
+        for rule in run_formatter.rules:
+            if (run_tool_name, rule.id) in listed_rules:
+                continue  # e.g. in each of the runs of one tool for several languages
+            listed_rules.add((run_tool_name, rule.id))
+            rule_id_str = (
+                f"[[{rule.id}]({rule.help_uri})]" if rule.help_uri else f"[{rule.id}]"
+            )
+            full_desc: str | None = (
+                rule.full_description.markdown
+                if rule.full_description and rule.full_description.markdown
+                else rule.full_description.text
+                if rule.full_description and rule.full_description.text
+                else None
             )
-            issue_str += "\n> ".join(full_desc.split("\n")) + "\n"
-        issues.append(issue_str)
+
+            issue_str = f"##{rule_id_str} {get_rule_name(rule)}\n"
+            if full_desc:
+                issue_str += (
+                    f"Background for this rule per {run_tool_name}'s documentation:\n> "
+                )
+                issue_str += "\n> ".join(full_desc.split("\n")) + "\n"
+            issues.append(issue_str)
 
     # Filter out ignored files from the verdict / annotations (depending on settings)
     if ignored_globs:
-        filtered_annotations: list[CheckAnnotation] = list(
+        filtered_annotations = AnnotationStore(
             filter_for_checksignore(
                 annotations,
                 ignored_globs,
@@ -1,21 +1,61 @@
 """Utility functions for formatting and filtering GitHub check annotations."""
 
 import os
-from collections.abc import Generator, Iterable
+import time
+from collections.abc import Generator, Iterable, Iterator, Sequence
+from itertools import islice
 from pathlib import Path
+from typing import Any, TypeVar
 
 from pathspec import GitIgnoreSpec
+from pydantic import TypeAdapter
 
-from github_checks.models import AnnotationLevel, CheckAnnotation, CheckRunConclusion
+from github_checks.metrics import hooks
+from github_checks.models import (
+    AnnotationLevel,
+    AnnotationStore,
+    CheckAnnotation,
+    CheckRunConclusion,
+    CheckRunOutput,
+)
+
+# number of findings validated at once, which bounds the memory held for them
+VALIDATION_BATCH_SIZE = 1000
+# GitHub rejects check run outputs whose summary or text is longer than this
+MAX_OUTPUT_CHARS = 65535
+
+# the conclusions of merged check run outputs, from the one taking precedence
+_CONCLUSION_PRECEDENCE = (
+    CheckRunConclusion.FAILURE,
+    CheckRunConclusion.TIMED_OUT,
+    CheckRunConclusion.CANCELLED,
+    CheckRunConclusion.ACTION_REQUIRED,
+    CheckRunConclusion.STALE,
+    CheckRunConclusion.NEUTRAL,
+    CheckRunConclusion.SUCCESS,
+    CheckRunConclusion.SKIPPED,
+)
+_CONCLUSIONS_WITHOUT_ISSUES = frozenset(
+    (
+        CheckRunConclusion.SUCCESS,
+        CheckRunConclusion.NEUTRAL,
+        CheckRunConclusion.SKIPPED,
+    ),
+)
+
+_T = TypeVar("_T")
+_list_adapters: dict[type, TypeAdapter[Any]] = {}
 
 
 def get_conclusion(annotations: Iterable[CheckAnnotation]) -> CheckRunConclusion:
     """Determine the conclusion based on the annotations."""
+    annotation_levels = (
+        annotations.annotation_levels()
+        if isinstance(annotations, AnnotationStore)
+        else (annotation.annotation_level for annotation in annotations)
+    )
     # If any annotation is not a notice, we consider it an action required
-    if any(
-        annotation.annotation_level != AnnotationLevel.NOTICE
-        for annotation in annotations
-    ):
+    if any(level != AnnotationLevel.NOTICE for level in annotation_levels):
         return CheckRunConclusion.ACTION_REQUIRED
 
     return CheckRunConclusion.SUCCESS
@@ -33,9 +73,136 @@ def filter_for_checksignore(
 
     # Make sure we're in repo base, otherwise globs won't match correctly
     os.chdir(local_repo_base)
+    start_time = time.perf_counter()
     ignore_matcher = GitIgnoreSpec.from_lines(ignore_globs)
+    # only time the matching, not whatever the caller does with the results
+    filtering_seconds = time.perf_counter() - start_time
+
+    try:
+        for annotation in annotations:
+            start_time = time.perf_counter()
+            # Check if the annotation path matches any of the ignore globs
+            ignored = ignore_matcher.match_file(annotation.path)
+            filtering_seconds += time.perf_counter() - start_time
+            if not ignored:
+                yield annotation
+    finally:
+        hooks.phase_finished(phase="filtering", seconds=filtering_seconds)
+
+
+def _list_adapter(model: type[_T]) -> TypeAdapter[list[_T]]:
+    """Get the adapter validating a list of the model, which is built only once."""
+    if model not in _list_adapters:
+        _list_adapters[model] = TypeAdapter(list[model])  # type: ignore[valid-type]
+    return _list_adapters[model]
+
+
+def validate_in_batches(
+    model: type[_T],
+    items: Iterable[Any],
+    batch_size: int = VALIDATION_BATCH_SIZE,
+) -> Iterator[_T]:
+    """Validate findings as they're read, a batch at a time in a single call each.
+
+    :param model: the model of the findings
+    :param items: the findings' JSON values, e.g. from `json_stream.iter_json_items`
+    :param batch_size: the number of findings to validate at once
+    :return: the validated findings, in order
+    """
+    items = iter(items)
+    while batch := list(islice(items, batch_size)):
+        yield from _list_adapter(model).validate_python(batch)
+
+
+def validate_json_lines_in_batches(
+    model: type[_T],
+    lines: Iterable[str],
+    batch_size: int = VALIDATION_BATCH_SIZE,
+) -> Iterator[_T]:
+    """Validate findings from JSON lines, straight from the JSON a batch at a time.
+
+    :param model: the model of the findings
+    :param lines: one JSON object per line, blank lines are skipped
+    :param batch_size: the number of findings to validate at once
+    :return: the validated findings, in order
+    """
+    lines = (line for line in lines if line.strip())
+    while batch := list(islice(lines, batch_size)):
+        yield from _list_adapter(model).validate_json("[" + ",".join(batch) + "]")
+
+
+def _join_sections(sections: Sequence[str], max_chars: int = MAX_OUTPUT_CHARS) -> str:
+    """Join sections of a summary or text, leaving out those beyond GitHub's limit.
+
+    :param sections: the sections, in order
+    :param max_chars: the max. length of the joined sections, incl. the note on any
+        sections left out
+    :return: the sections which fit, followed by a note on those left out, if any
+    """
+    joined = "\n\n".join(sections)
+    if len(joined) <= max_chars:
+        return joined
+    note = "_{} more sections were left out, as GitHub limits this to {} characters._"
+    # room for the sections, incl. their separators, keeping room for the note
+    budget = max_chars - len(note.format(len(sections), max_chars)) - 2
+    kept: list[str] = []
+    length = -2  # no separator before the first section
+    for section in sections:
+        length += len(section) + 2
+        if length > budget:
+            break
+        kept.append(section)
+    if not kept:  # even the first section is too long, so it's shortened instead
+        kept.append(sections[0][: budget - 1] + "…")
+    return "\n\n".join([*kept, note.format(len(sections) - len(kept), max_chars)])
+
+
+def merge_check_run_outputs(
+    labelled_outputs: Sequence[tuple[str, CheckRunOutput, CheckRunConclusion]],
+) -> tuple[CheckRunOutput, CheckRunConclusion]:
+    """Merge the outputs of several logs into the output of a single check run.
+
+    The annotations are kept in order of the logs, and the summary gets a section
+    per log, with its title & summary. The conclusion is the most severe of all.
+    Sections beyond GitHub's limit of `MAX_OUTPUT_CHARS` per summary and text are
+    left out, with a note on how many.
+
+    :param labelled_outputs: the label (e.g. the log's path), output & conclusion of
+        each log
+    :return: the merged check run output & conclusion
+    """
+    annotations = AnnotationStore()
+    images = []
+    summaries: list[str] = []
+    texts: list[str] = []
+    for label, output, _ in labelled_outputs:
+        annotations.extend(output.annotations or [])
+        images.extend(output.images or [])
+        summaries.append(f"### {label}\n\n**{output.title}**\n\n{output.summary}")
+        if output.text:
+            texts.append(f"### {label}\n\n{output.text}")
 
-    for annotation in annotations:
-        # Check if the annotation path matches any of the ignore globs
-        if not ignore_matcher.match_file(annotation.path):
-            yield annotation
+    conclusions = {conclusion for _, _, conclusion in labelled_outputs}
+    conclusion = next(
+        (c for c in _CONCLUSION_PRECEDENCE if c in conclusions),
+        CheckRunConclusion.SUCCESS,
+    )
+    num_logs_with_issues = sum(
+        log_conclusion not in _CONCLUSIONS_WITHOUT_ISSUES
+        for _, _, log_conclusion in labelled_outputs
+    )
+    title = (
+        f"{num_logs_with_issues} of {len(labelled_outputs)} logs found issues"
+        if num_logs_with_issues
+        else f"No issues found in {len(labelled_outputs)} logs"
+    )
+    return (
+        CheckRunOutput(
+            title=title,
+            summary=_join_sections(summaries),
+            text=_join_sections(texts) or None,
+            annotations=annotations,
+            images=images or None,
+        ),
+        conclusion,
+    )
@@ -1,26 +1,41 @@
 """Utility functions to help interface with the GitHub checks API."""
 
+import fcntl
+import hashlib
 import json
 import logging
+import os
+import random
 import sys
+import threading
 import time
-from collections.abc import Iterable
+from collections import Counter
+from collections.abc import Callable, Iterator, Sequence
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import contextmanager
 from datetime import datetime, timezone
 from pathlib import Path
-from typing import Any
+from typing import IO, Any, cast
 from urllib.parse import ParseResult, urlparse
 
 import jwt
-from requests import HTTPError, Response, Session
+from pydantic import BaseModel, Field, PrivateAttr
+from requests import ConnectionError, HTTPError, Response, Session, Timeout  # noqa: A004
+from requests.adapters import DEFAULT_POOLSIZE, HTTPAdapter
 
+from github_checks.constants import DEFAULT_MAX_BATCH_BYTES
+from github_checks.metrics import hooks, timed_phase
 from github_checks.models import (
     AnnotationLevel,
+    AnnotationStore,
     CheckAnnotation,
     CheckRunConclusion,
     CheckRunOutput,
-    CheckRunUpdatePOSTBody,
 )
 
+# installation access tokens should last 1h, re-auth 30s earlier to be safe
+_REAUTH_MARGIN_SECONDS = 30
+
 
 def _get_jwt_headers(jwt_str: str, accept_type: str) -> dict[str, str]:
     return {
@@ -30,25 +45,78 @@ def _get_jwt_headers(jwt_str: str, accept_type: str) -> dict[str, str]:
     }
 
 
+# an app JWT is reused until this long before it expires, then signed anew
+_JWT_REUSE_MARGIN_SECONDS = 60
+
+
+class _AppJWTSigner:
+    """Signs the JWTs of a GitHub App, with its private key parsed only once.
+
+    Each JWT is reused until shortly before it expires, such that authenticating many
+    installations, or re-authenticating a long-lived session, neither re-reads &
+    re-parses the PEM nor signs a new RS256 token each time. The key is only loaded
+    again if its file changes, e.g. when the key is rotated.
+    """
+
+    def __init__(self, pem_filepath: Path, app_id: str, ttl_seconds: int) -> None:
+        self._pem_filepath = pem_filepath
+        self._app_id = app_id
+        self._ttl_seconds = ttl_seconds
+        self._lock = threading.Lock()
+        self._jwk: jwt.AbstractJWKBase | None = None
+        self._pem_mtime_ns = -1
+        self._app_jwt = ""
+        self._jwt_expiry = 0
+
+    def app_jwt(self) -> str:
+        """Get a JWT of the app which is valid for at least another minute."""
+        with self._lock:
+            pem_mtime_ns = self._pem_filepath.stat().st_mtime_ns
+            if self._jwk is None or pem_mtime_ns != self._pem_mtime_ns:
+                with self._pem_filepath.open("rb") as pem_file:
+                    self._jwk = jwt.jwk_from_pem(pem_file.read())
+                self._pem_mtime_ns = pem_mtime_ns
+                self._jwt_expiry = 0  # signed with the previous key
+            if time.time() >= self._jwt_expiry - _JWT_REUSE_MARGIN_SECONDS:
+                with timed_phase("jwt_signing"):
+                    issued_at = int(time.time())
+                    self._app_jwt = str(
+                        jwt.JWT().encode(
+                            {
+                                "iat": issued_at,
+                                "exp": issued_at + self._ttl_seconds,
+                                "iss": self._app_id,
+                            },
+                            self._jwk,
+                            alg="RS256",
+                        ),
+                    )
+                self._jwt_expiry = issued_at + self._ttl_seconds
+            return self._app_jwt
+
+
+_app_jwt_signers: dict[tuple[Path, str, int], _AppJWTSigner] = {}
+_app_jwt_signers_lock = threading.Lock()
+
+
 def _generate_app_jwt_from_pem(
     pem_filepath: Path,
     app_id: str,
     ttl_seconds: int,
 ) -> str:
-    with pem_filepath.open("rb") as pem_file:
-        priv_key = pem_file.read()
-    jwt_payload = {
-        "iat": int(time.time()),
-        "exp": int(time.time()) + ttl_seconds,
-        "iss": app_id,
-    }
-    return str(
-        jwt.JWT().encode(
-            jwt_payload,
-            jwt.jwk_from_pem(priv_key),
-            alg="RS256",
-        ),
-    )
+    """Get a JWT of the app, reusing its parsed key & last JWT, see `_AppJWTSigner`."""
+    key = (pem_filepath.resolve(), app_id, ttl_seconds)
+    with _app_jwt_signers_lock:
+        if key not in _app_jwt_signers:
+            _app_jwt_signers[key] = _AppJWTSigner(pem_filepath, app_id, ttl_seconds)
+        signer = _app_jwt_signers[key]
+    return signer.app_jwt()
+
+
+def _parse_github_timestamp(timestamp: str) -> int:
+    """Convert a timestamp in the GitHub format (e.g. `expires_at`) to a UNIX time."""
+    expiry_datetime = datetime.fromisoformat(timestamp.rstrip("Z"))
+    return int(expiry_datetime.replace(tzinfo=timezone.utc).timestamp())
 
 
 def _authenticate_as_github_app(  # noqa: PLR0913
@@ -58,6 +126,7 @@ def _authenticate_as_github_app(  # noqa: PLR0913
     logger: logging.Logger,
     github_api_base_url: str = "https://api.github.com",
     timeout: int = 10,
+    scheduler: "RequestScheduler | None" = None,
 ) -> tuple[str, int]:
     """Authenticate as the specified GitHub App installation to get an access token.
 
@@ -65,6 +134,7 @@ def _authenticate_as_github_app(  # noqa: PLR0913
     :param app_installation_id: ID of the App's installation to the repo
     :param github_api_base_url: API URL of your GitHub instance (cloud or enterprise)
     :param timeout: request timeout in seconds, optional, defaults to 10
+    :param scheduler: scheduler to pace & retry the request through, optional
     :return: the GitHub App access token and its expiration time
     """
     url: str = (
@@ -74,7 +144,14 @@ def _authenticate_as_github_app(  # noqa: PLR0913
         app_jwt,
         "application/vnd.github+json",
     )
-    response: Response = github_session.post(url, headers=headers, timeout=timeout)
+    with timed_phase("token_exchange"):
+        response: Response = (scheduler or RequestScheduler()).send(
+            github_session,
+            "POST",
+            url,
+            headers=headers,
+            timeout=timeout,
+        )
     try:
         response.raise_for_status()
     except HTTPError:
@@ -83,8 +160,7 @@ def _authenticate_as_github_app(  # noqa: PLR0913
 
     token = str(response.json().get("token"))
     expiry_datetime_str = str(response.json().get("expires_at")).rstrip("Z")
-    expiry_datetime = datetime.fromisoformat(expiry_datetime_str)
-    expiry_timestamp = int(expiry_datetime.replace(tzinfo=timezone.utc).timestamp())
+    expiry_timestamp = _parse_github_timestamp(expiry_datetime_str)
 
     logger.info(
         "Authenticated as GitHub App installation successfully, token expires at %s UTC.",  # noqa: E501
@@ -93,12 +169,770 @@ def _authenticate_as_github_app(  # noqa: PLR0913
     return token, expiry_timestamp
 
 
-def _delete_keys_from_nested_dict(dictionary: dict[str, Any]) -> None:
-    for key in list(dictionary.keys()):
-        if dictionary[key] is None:
-            del dictionary[key]
-        elif type(dictionary[key]) is dict:
-            _delete_keys_from_nested_dict(dictionary[key])
+def mint_installation_tokens(  # noqa: PLR0913
+    app_id: str,
+    app_privkey_pem: Path,
+    app_installation_ids: list[str],
+    github_api_base_url: str = "https://api.github.com",
+    *,
+    max_workers: int = 8,
+    scheduler: "RequestScheduler | None" = None,
+    token_cache: "InstallationTokenCache | None" = None,
+) -> dict[str, tuple[str, int]]:
+    """Mint access tokens for many installations of the same GitHub App at once.
+
+    The app's key is loaded and its JWT signed once for all installations, whose
+    tokens are then exchanged concurrently over one pooled session.
+
+    :param app_id: ID of the GitHub App
+    :param app_privkey_pem: private key provided by GitHub for this app, PEM format
+    :param app_installation_ids: IDs of the App's installations to mint tokens for
+    :param github_api_base_url: API URL of your GitHub instance (cloud or enterprise)
+    :param max_workers: max. number of concurrent token exchanges, optional
+    :param scheduler: scheduler to pace & retry the requests through, optional
+    :param token_cache: cache to share the tokens through with other processes,
+        optional, see `InstallationTokenCache`
+    :return: the access token and its expiration time, per installation ID
+    """
+    scheduler = scheduler or RequestScheduler()
+    logger = logging.getLogger(__name__)
+    session = Session()
+    if max_workers > DEFAULT_POOLSIZE:
+        session.mount(
+            "https://",
+            HTTPAdapter(pool_connections=1, pool_maxsize=max_workers),
+        )
+
+    def mint_token(app_installation_id: str) -> tuple[str, int]:
+        # see GitHubChecks.auth for the reasoning behind the conservative JWT TTL
+        app_jwt = _generate_app_jwt_from_pem(app_privkey_pem, app_id, ttl_seconds=570)
+        return _authenticate_as_github_app(
+            app_jwt,
+            app_installation_id,
+            session,
+            logger,
+            github_api_base_url,
+            scheduler=scheduler,
+        )
+
+    def get_token(app_installation_id: str) -> tuple[str, int]:
+        if token_cache is None:
+            return mint_token(app_installation_id)
+        return token_cache.get_or_mint(
+            github_api_base_url,
+            app_id,
+            app_installation_id,
+            lambda: mint_token(app_installation_id),
+        )
+
+    with session, ThreadPoolExecutor(max_workers=max_workers) as executor:
+        tokens = executor.map(get_token, app_installation_ids)
+        return dict(zip(app_installation_ids, tokens, strict=True))
+
+
+def _is_rate_limited(response: Response) -> bool:
+    """Check whether GitHub rejected a request due to (secondary) rate limiting."""
+    if response.status_code == 429:  # noqa: PLR2004
+        return True
+    if response.status_code != 403:  # noqa: PLR2004
+        return False
+    # 403 is also used for plain permission issues, which retrying won't fix
+    return (
+        "Retry-After" in response.headers
+        or response.headers.get("X-RateLimit-Remaining") == "0"
+        or "rate limit" in response.text.lower()
+    )
+
+
+class _AdaptiveConcurrencyLimiter:
+    """Bound the number of in-flight requests, shrinking the bound under pushback.
+
+    Follows additive increase / multiplicative decrease: every fast, successful
+    response widens the window by one slot (up to the configured maximum), while
+    every throttled or slow response halves it, down to a single request at a time.
+    """
+
+    def __init__(self, max_concurrency: int, slow_response_seconds: float) -> None:
+        self._max_concurrency = max_concurrency
+        self._slow_response_seconds = slow_response_seconds
+        self._limit = max_concurrency
+        self._in_flight = 0
+        self._condition = threading.Condition()
+
+    @property
+    def limit(self) -> int:
+        """The current number of requests permitted to be in flight at once."""
+        return self._limit
+
+    def acquire(self) -> None:
+        """Block until a request slot is available, then claim it."""
+        with self._condition:
+            while self._in_flight >= self._limit:
+                self._condition.wait()
+            self._in_flight += 1
+
+    def release(self, latency_seconds: float, *, throttled: bool) -> None:
+        """Free a request slot and adjust the window based on the response."""
+        with self._condition:
+            self._in_flight -= 1
+            if throttled or latency_seconds >= self._slow_response_seconds:
+                self._limit = max(1, self._limit // 2)
+            else:
+                self._limit = min(self._max_concurrency, self._limit + 1)
+            self._condition.notify_all()
+
+
+@contextmanager
+def _exclusively_locked(filepath: Path) -> Iterator[IO[str]]:
+    """Open (and create, if needed) a file, holding an exclusive lock while in use.
+
+    The lock is an advisory `flock`, which all processes on the same host respect.
+    """
+    # never follow symlinks, e.g. planted in a shared /tmp by another user
+    fd = os.open(filepath, os.O_RDWR | os.O_CREAT | os.O_NOFOLLOW, 0o600)
+    with os.fdopen(fd, "r+", encoding="utf-8") as locked_file:
+        fcntl.flock(locked_file, fcntl.LOCK_EX)
+        try:
+            yield locked_file
+        finally:
+            # any changes must be written before the next process reads the file
+            locked_file.flush()
+            fcntl.flock(locked_file, fcntl.LOCK_UN)
+
+
+class RequestScheduler:
+    """Paces & retries GitHub API requests according to GitHub's rate limits.
+
+    By default, requests are only slowed down once GitHub pushes back: the
+    `X-RateLimit-Remaining`, `X-RateLimit-Reset` and `Retry-After` headers of each
+    response pause all requests until GitHub accepts more. When a state file is given,
+    that pause lives in the file, guarded by a file lock, such that parallel CLI
+    processes on one build machine share it instead of each tripping the limits.
+
+    With `requests_per_minute`, requests additionally draw from a token bucket, shared
+    through the same file, which keeps clear of GitHub's secondary rate limits upfront
+    at the cost of throughput, e.g. 80 per minute caps uploads at 4000 annotations per
+    minute, however many of them are uploaded concurrently.
+    Requests rejected due to rate limiting or server errors, as well as those failing
+    with connection errors, are retried with jittered exponential backoff.
+    """
+
+    RETRYABLE_STATUS_CODES: frozenset[int] = frozenset({429, 500, 502, 503, 504})
+
+    def __init__(  # noqa: PLR0913
+        self,
+        state_fp: Path | None = None,
+        *,
+        requests_per_minute: float | None = None,
+        burst: int = 20,
+        max_retries: int = 5,
+        backoff_base_seconds: float = 1,
+        backoff_cap_seconds: float = 60,
+    ) -> None:
+        """Configure the scheduler.
+
+        :param state_fp: file to share the request budget through, optional, by default
+            the budget is only shared within this process
+        :param requests_per_minute: sustained request rate, optional, e.g. 80, GitHub's
+            documented limit for content-creating requests, by default requests are
+            only slowed down once GitHub pushes back
+        :param burst: max. number of requests sent in quick succession when pacing
+            them, optional
+        :param max_retries: max. number of retries per request, optional
+        :param backoff_base_seconds: delay before the first retry, doubled per retry
+        :param backoff_cap_seconds: upper bound for the delay between retries
+        """
+        self.state_fp = state_fp
+        self.requests_per_minute = requests_per_minute
+        self.burst = burst
+        self.max_retries = max_retries
+        self.backoff_base_seconds = backoff_base_seconds
+        self.backoff_cap_seconds = backoff_cap_seconds
+        self._lock = threading.Lock()
+        self._state: dict[str, float] = {}
+
+    def __getstate__(self) -> dict[str, Any]:
+        """Drop the process-local parts of the scheduler when pickling it."""
+        state = self.__dict__.copy()
+        del state["_lock"]
+        return state
+
+    def __setstate__(self, state: dict[str, Any]) -> None:
+        """Restore the scheduler, with a fresh lock for this process."""
+        self.__dict__.update(state)
+        self._lock = threading.Lock()
+
+    def send(
+        self,
+        session: Session,
+        method: str,
+        url: str,
+        *,
+        limiter: _AdaptiveConcurrencyLimiter | None = None,
+        **kwargs: Any,  # noqa: ANN401
+    ) -> Response:
+        """Send a request once the budget permits, retrying it if GitHub pushes back.
+
+        :param session: the session to send the request through
+        :param method: the HTTP method of the request
+        :param url: the URL to send the request to
+        :param limiter: limiter to bound the request's concurrency by, optional, one
+            per upload, such that concurrent uploads don't interfere
+        :param kwargs: any further arguments for `Session.request`
+        :return: the final response, which may still be an unsuccessful one
+        :raises ConnectionError: if the request could not be sent after all retries
+        :raises Timeout: if the request timed out on each of the retries
+        """
+        body = kwargs.get("data")
+        bytes_sent = len(body) if isinstance(body, bytes | str) else 0
+        for attempt in range(self.max_retries + 1):
+            self._wait_for_budget()
+            if limiter:
+                limiter.acquire()
+            hooks.request_started(method=method, url=url)
+            start_time = time.monotonic()
+            throttled = False
+            try:
+                response: Response = session.request(method, url, **kwargs)
+            except (ConnectionError, Timeout):
+                hooks.request_finished(
+                    method=method,
+                    url=url,
+                    status_code=None,
+                    seconds=time.monotonic() - start_time,
+                    bytes_sent=bytes_sent,
+                )
+                if attempt == self.max_retries:
+                    raise
+                delay = self._backoff_delay(attempt)
+            else:
+                hooks.request_finished(
+                    method=method,
+                    url=url,
+                    status_code=response.status_code,
+                    seconds=time.monotonic() - start_time,
+                    bytes_sent=bytes_sent,
+                )
+                throttled = _is_rate_limited(response)
+                self._observe_rate_limit_headers(response)
+                if attempt == self.max_retries or not (
+                    throttled or response.status_code in self.RETRYABLE_STATUS_CODES
+                ):
+                    return response
+                delay = max(self._backoff_delay(attempt), _retry_after(response))
+            finally:
+                if limiter:
+                    limiter.release(time.monotonic() - start_time, throttled=throttled)
+            logging.getLogger(__name__).warning(
+                "GitHub API request %s %s failed, retrying in %.1fs (retry %d of %d).",
+                method,
+                url,
+                delay,
+                attempt + 1,
+                self.max_retries,
+            )
+            hooks.request_retried(method=method, url=url, delay_seconds=delay)
+            time.sleep(delay)
+        # unreachable, the final attempt always returns or raises
+        raise AssertionError
+
+    def _backoff_delay(self, attempt: int) -> float:
+        """Exponential backoff with full jitter, to keep retrying processes apart."""
+        return _backoff_delay(
+            attempt,
+            self.backoff_base_seconds,
+            self.backoff_cap_seconds,
+        )
+
+    def _wait_for_budget(self) -> None:
+        """Block until the shared budget permits sending another request."""
+        while (delay := self._take_token()) > 0:
+            time.sleep(delay)
+
+    def _take_token(self) -> float:
+        """Take a token from the bucket, or return how long to wait for the next one."""
+        with self._locked_state() as state:
+            now = time.time()
+            if (blocked_until := state.get("blocked_until", 0)) > now:
+                return blocked_until - now
+            if self.requests_per_minute is None:
+                return 0
+            refill_per_second = self.requests_per_minute / 60
+            tokens = min(
+                self.burst,
+                state.get("tokens", self.burst)
+                + (now - state.get("updated_at", now)) * refill_per_second,
+            )
+            state["updated_at"] = now
+            if tokens < 1:
+                state["tokens"] = tokens
+                return (1 - tokens) / refill_per_second
+            state["tokens"] = tokens - 1
+            return 0
+
+    def _observe_rate_limit_headers(self, response: Response) -> None:
+        """Pause all requests if GitHub told us that the budget is exhausted."""
+        blocked_until = time.time() + _retry_after(response)
+        if response.headers.get("X-RateLimit-Remaining") == "0":
+            reset = response.headers.get("X-RateLimit-Reset", "")
+            if reset.isdigit():
+                blocked_until = max(blocked_until, int(reset))
+        if blocked_until <= time.time():
+            return
+        with self._locked_state() as state:
+            state["blocked_until"] = max(state.get("blocked_until", 0), blocked_until)
+        logging.getLogger(__name__).warning(
+            "GitHub API rate limit reached, pausing requests until %s.",
+            datetime.fromtimestamp(blocked_until, timezone.utc).isoformat(),
+        )
+
+    @contextmanager
+    def _locked_state(self) -> Iterator[dict[str, float]]:
+        """Provide exclusive access to the bucket state, persisting any changes."""
+        with self._lock:
+            if not self.state_fp:
+                yield self._state
+                return
+            with _exclusively_locked(self.state_fp) as state_file:
+                try:
+                    state: dict[str, float] = json.loads(state_file.read() or "{}")
+                except json.JSONDecodeError:
+                    state = {}  # e.g. a process died mid-write, just start afresh
+                yield state
+                state_file.seek(0)
+                state_file.truncate()
+                json.dump(state, state_file)
+
+
+class InstallationTokenCache:
+    """Shares installation access tokens between processes through a local file.
+
+    Tokens are cached per API host, app & installation, and reused until shortly
+    before they expire. The file is only accessible by its owner, and its lock is held
+    while a new token is minted, such that concurrent processes (e.g. parallel `init`s
+    on one build machine) wait for a single token exchange instead of each minting
+    their own token.
+    """
+
+    def __init__(self, cache_fp: Path) -> None:
+        """Configure the cache.
+
+        :param cache_fp: file to share the tokens through, created if needed
+        """
+        self.cache_fp = cache_fp
+
+    def get_or_mint(
+        self,
+        github_api_base_url: str,
+        app_id: str,
+        app_installation_id: str,
+        mint_token: Callable[[], tuple[str, int]],
+    ) -> tuple[str, int]:
+        """Get the cached token of the installation, or mint & cache a new one.
+
+        :param github_api_base_url: API URL of the GitHub instance the token is for
+        :param app_id: ID of the GitHub App
+        :param app_installation_id: ID of the App's installation
+        :param mint_token: mints a new token, returning it and its expiration time
+        :return: the installation access token and its expiration time
+        :raises PermissionError: if the cache file is accessible to other users
+        """
+        key = f"{urlparse(github_api_base_url).netloc}/{app_id}/{app_installation_id}"
+        with _exclusively_locked(self.cache_fp) as cache_file:
+            file_stat = os.fstat(cache_file.fileno())
+            if file_stat.st_uid != os.getuid() or file_stat.st_mode & 0o077:
+                msg = f"Token cache {self.cache_fp} is accessible to others, aborting."
+                raise PermissionError(msg)
+            try:
+                cached_tokens: dict[str, dict[str, Any]] = json.loads(
+                    cache_file.read() or "{}",
+                )
+                cache = {
+                    cache_key: entry
+                    for cache_key, entry in cached_tokens.items()
+                    if entry["expires_at"] - _REAUTH_MARGIN_SECONDS > time.time()
+                }
+            except (json.JSONDecodeError, AttributeError, KeyError, TypeError):
+                cache = {}  # e.g. a process died mid-write, just start afresh
+            if key not in cache:
+                token, expires_at = mint_token()
+                cache[key] = {"token": token, "expires_at": expires_at}
+                cache_file.seek(0)
+                cache_file.truncate()
+                json.dump(cache, cache_file)
+        return str(cache[key]["token"]), int(cache[key]["expires_at"])
+
+
+def _backoff_delay(attempt: int, base_seconds: float, cap_seconds: float) -> float:
+    """Exponential backoff with full jitter, to keep retrying clients apart."""
+    return random.uniform(0, min(cap_seconds, base_seconds * 2**attempt))  # noqa: S311
+
+
+def _retry_after(response: Response) -> float:
+    """Get the delay GitHub asked us to wait before retrying, in seconds."""
+    retry_after = response.headers.get("Retry-After", "")
+    return float(retry_after) if retry_after.isdigit() else 0
+
+
+def _gen_github_timestamp() -> str:
+    """Generate a timestamp for the current moment in the GitHub-expected format."""
+    return (
+        datetime.now(timezone.utc)
+        .replace(microsecond=0)
+        .isoformat()
+        .replace("+00:00", "Z")
+    )
+
+
+def _infer_conclusion(annotations: Sequence[CheckAnnotation]) -> CheckRunConclusion:
+    annotation_levels = set(
+        annotations.annotation_levels()
+        if isinstance(annotations, AnnotationStore)
+        else (annotation.annotation_level for annotation in annotations),
+    )
+    if AnnotationLevel.FAILURE in annotation_levels:
+        return CheckRunConclusion.ACTION_REQUIRED
+    # both warning and notice should not block a pull request, but just inform
+    return CheckRunConclusion.SUCCESS
+
+
+def _annotation_batches(
+    encoded_annotations: list[bytes],
+    batch_size: int = 50,
+    max_batch_bytes: int | None = None,
+) -> tuple[list[list[bytes]], int]:
+    """Pack the annotations into as few batches as the API limits allow.
+
+    GitHub accepts <= 50 annotations per request, and rejects overly large request
+    bodies. Cutting the annotations in order, starting a new batch whenever either
+    limit is hit, keeps their order and is already optimal for evenly sized ones. If
+    it isn't (e.g. a few SARIF results with long `raw_details` among small ones), the
+    annotations are packed first-fit-decreasing instead, which needs fewer requests.
+
+    :param encoded_annotations: the JSON encoded annotations to be batched
+    :param batch_size: max. number of annotations per batch, optional
+    :param max_batch_bytes: max. encoded size of a batch's annotations, optional, if
+        not set only the number of annotations per batch is limited. Annotations that
+        exceed this size on their own each get a batch of their own.
+    :return: the batches of annotations, and the number of batches which cutting the
+        annotations in order would have needed
+    """
+    if max_batch_bytes is None:
+        batches = [
+            encoded_annotations[i : i + batch_size]
+            for i in range(0, len(encoded_annotations), batch_size)
+        ]
+        return batches, len(batches)
+
+    # each annotation also costs the comma separating it from the next one
+    sizes: list[int] = [len(annotation) + 1 for annotation in encoded_annotations]
+    in_order = _pack_in_order(sizes, batch_size, max_batch_bytes)
+    fewest_possible = max(
+        -(-len(sizes) // batch_size),
+        -(-sum(min(size, max_batch_bytes) for size in sizes) // max_batch_bytes),
+    )
+    packed = in_order
+    if len(in_order) > fewest_possible:
+        decreasing = _pack_first_fit_decreasing(sizes, batch_size, max_batch_bytes)
+        if len(decreasing) < len(in_order):
+            packed = decreasing
+    batches = [[encoded_annotations[idx] for idx in batch] for batch in packed]
+    return batches, len(in_order)
+
+
+def _pack_in_order(
+    sizes: list[int],
+    batch_size: int,
+    max_batch_bytes: int,
+) -> list[list[int]]:
+    """Cut the annotations in order, whenever a batch would exceed either limit."""
+    batches: list[list[int]] = []
+    batch: list[int] = []
+    batch_bytes = 0
+    for idx, size in enumerate(sizes):
+        if batch and (len(batch) == batch_size or batch_bytes + size > max_batch_bytes):
+            batches.append(batch)
+            batch, batch_bytes = [], 0
+        batch.append(idx)
+        batch_bytes += size
+    if batch:
+        batches.append(batch)
+    return batches
+
+
+def _pack_first_fit_decreasing(
+    sizes: list[int],
+    batch_size: int,
+    max_batch_bytes: int,
+) -> list[list[int]]:
+    """Pack the largest annotations first, each into the first batch it fits in."""
+    by_size = sorted(range(len(sizes)), key=sizes.__getitem__, reverse=True)
+    smallest = sizes[by_size[-1]]
+    batches: list[list[int]] = []
+    free_bytes: list[int] = []
+    # batches which can still take at least one more annotation, in creation order
+    open_batches: list[int] = []
+    for idx in by_size:
+        size = sizes[idx]
+        for pos, batch_idx in enumerate(open_batches):  # noqa: B007
+            if free_bytes[batch_idx] >= size:
+                break
+        else:
+            pos, batch_idx = len(open_batches), len(batches)
+            batches.append([])
+            free_bytes.append(max_batch_bytes)
+            open_batches.append(batch_idx)
+        batches[batch_idx].append(idx)
+        free_bytes[batch_idx] -= size
+        if len(batches[batch_idx]) == batch_size or free_bytes[batch_idx] < smallest:
+            del open_batches[pos]
+    # keep the annotations as close to their original order as possible
+    for batch in batches:
+        batch.sort()
+    batches.sort(key=lambda batch: batch[0])
+    return batches
+
+
+def _encode_annotation(annotation: CheckAnnotation) -> bytes:
+    """Encode an annotation to JSON, leaving out null values (which cause HTTP 422s)."""
+    return annotation.__pydantic_serializer__.to_json(  # type: ignore[no-any-return]
+        annotation,
+        exclude_unset=True,
+        exclude_none=True,
+    )
+
+
+class _CheckRunUpdateEncoder:
+    """Encodes the JSON bodies to PATCH a check run with, encoding everything once.
+
+    The annotations and the remainder of the output are each encoded to JSON bytes
+    upfront, the body for each batch of annotations is then just spliced together
+    from these fragments, instead of serializing the whole output again per batch.
+    """
+
+    encoded_annotations: list[bytes]
+    _name_fragment: bytes
+    _output_fragment: bytes
+
+    def __init__(self, check_name: str, output: CheckRunOutput) -> None:
+        """Encode the given output of the named check run.
+
+        :param check_name: the name of the check run being updated
+        :param output: the full output of the check run, including all annotations
+        """
+        self._name_fragment = b'{"name":' + json.dumps(check_name).encode()
+        output_json: bytes = output.__pydantic_serializer__.to_json(
+            output,
+            exclude={"annotations"},
+            exclude_unset=True,
+            exclude_none=True,
+        )
+        # drop the closing brace, such that the annotations can be appended later
+        self._output_fragment = output_json[:-1]
+        if isinstance(output.annotations, AnnotationStore):
+            self.encoded_annotations = list(output.annotations.encoded())
+        else:
+            self.encoded_annotations = [
+                _encode_annotation(annotation)
+                for annotation in output.annotations or []
+            ]
+
+    def body(
+        self,
+        annotations_batch: list[bytes] | None = None,
+        conclusion: CheckRunConclusion | None = None,
+    ) -> bytes:
+        """Build the body to PATCH the check run with, for a batch of annotations.
+
+        :param annotations_batch: the encoded annotations to post, optional
+        :param conclusion: the conclusion to complete the check run with, optional
+        :return: the JSON body, ready to be sent as is
+        """
+        parts: list[bytes] = [self._name_fragment]
+        # without a conclusion, this is an intermediate update and the run stays open
+        if conclusion:
+            parts.append(
+                f',"completed_at":"{_gen_github_timestamp()}",'
+                f'"conclusion":"{conclusion.value}"'.encode(),
+            )
+        parts += (b',"output":', self._output_fragment)
+        if annotations_batch is not None:
+            if len(self._output_fragment) > 1:
+                parts.append(b",")
+            parts += (b'"annotations":[', b",".join(annotations_batch), b"]")
+        parts.append(b"}}")
+        return b"".join(parts)
+
+    def batches(
+        self,
+        max_batch_bytes: int | None = None,
+    ) -> tuple[list[list[bytes]], int]:
+        """Pack the annotations into batches, such that each body stays within limits.
+
+        :param max_batch_bytes: max. size of each request body, optional
+        :return: the batches of annotations, and the number of batches which cutting
+            the annotations in order would have needed
+        """
+        if max_batch_bytes is None:
+            return _annotation_batches(self.encoded_annotations)
+        # the remainder of the body is sent along with every batch of annotations
+        envelope_bytes = len(self.body([], CheckRunConclusion.ACTION_REQUIRED))
+        return _annotation_batches(
+            self.encoded_annotations,
+            max_batch_bytes=max(max_batch_bytes - envelope_bytes, 1),
+        )
+
+
+def encode_check_run_updates(
+    check_name: str,
+    output: CheckRunOutput,
+    conclusion: CheckRunConclusion | None = None,
+    *,
+    max_batch_bytes: int | None = DEFAULT_MAX_BATCH_BYTES,
+) -> list[bytes]:
+    """Encode the updates which `GitHubChecks.finish_check_run` would send.
+
+    E.g. to upload them later or elsewhere via `GitHubChecks.upload_check_run_updates`.
+    The conclusion is inferred like `finish_check_run` does, if not given.
+
+    :param check_name: the name of the check whose run the updates are for
+    :param output: the results of the check run, for annotating a PR
+    :param conclusion: the overall success, to be fed back for PR approval, optional
+    :param max_batch_bytes: max. size of each request body, optional, defaults to
+        1 MiB, `None` only limits the number of annotations per request
+    :return: the JSON body of each update, with the one setting the conclusion last
+    """
+    if not conclusion:
+        if output.annotations:
+            conclusion = _infer_conclusion(output.annotations)
+        else:
+            conclusion = CheckRunConclusion.NEUTRAL
+    with timed_phase("encoding"):
+        encoder = _CheckRunUpdateEncoder(check_name, output)
+        if not encoder.encoded_annotations:
+            return [encoder.body(conclusion=conclusion)]
+        *batches, final_batch = encoder.batches(max_batch_bytes)[0]
+        return [encoder.body(batch) for batch in batches] + [
+            encoder.body(final_batch, conclusion),
+        ]
+
+
+class _UploadJournal(BaseModel):
+    """Progress journal of a check run's annotation upload, to resume it if it fails.
+
+    Records which batches of annotations GitHub already acknowledged, such that a
+    retried upload for the same run & annotations skips those instead of posting them
+    a second time, which GitHub would show as duplicate annotations.
+    """
+
+    run_id: str
+    fingerprint: str
+    batches: list[tuple[int, int]]  # [start, end) indices into the packed annotations
+    acknowledged: set[int] = Field(default_factory=set)
+    _journal_fp: Path | None = PrivateAttr(default=None)
+    _lock: threading.Lock = PrivateAttr(default_factory=threading.Lock)
+
+    @classmethod
+    def load_or_create(
+        cls,
+        journal_fp: Path | None,
+        run_id: str,
+        annotation_batches: list[list[bytes]],
+    ) -> "_UploadJournal":
+        """Resume the journal for this exact upload if one exists, else start afresh.
+
+        :param journal_fp: file to persist the journal in, optional, if not set the
+            journal only lives in memory and the upload can't be resumed
+        :param run_id: the ID of the check run that the annotations are uploaded to
+        :param annotation_batches: the encoded annotations to be uploaded, in batches
+        :return: the journal for this upload
+        """
+        fingerprint = hashlib.sha256()
+        batches: list[tuple[int, int]] = []
+        for batch in annotation_batches:
+            start = batches[-1][1] if batches else 0
+            batches.append((start, start + len(batch)))
+            for encoded_annotation in batch:
+                fingerprint.update(encoded_annotation)
+        journal = cls(
+            run_id=run_id,
+            fingerprint=fingerprint.hexdigest(),
+            batches=batches,
+        )
+
+        if journal_fp and journal_fp.exists():
+            try:
+                previous = cls.model_validate_json(journal_fp.read_text("utf-8"))
+            except ValueError:
+                previous = None  # e.g. truncated by a crash, just start afresh
+            if (
+                previous
+                and previous.run_id == journal.run_id
+                and previous.fingerprint == journal.fingerprint
+                and previous.batches == journal.batches
+            ):
+                journal.acknowledged = previous.acknowledged
+        journal._journal_fp = journal_fp
+        return journal
+
+    def acknowledge(self, batch_idx: int) -> None:
+        """Record that GitHub accepted the given batch (safe across threads)."""
+        with self._lock:
+            self.acknowledged.add(batch_idx)
+            if self._journal_fp:
+                # write & rename, so that a crash never leaves a corrupt journal behind
+                tmp_fp = self._journal_fp.with_name(self._journal_fp.name + ".tmp")
+                tmp_fp.write_text(self.model_dump_json(), encoding="utf-8")
+                tmp_fp.replace(self._journal_fp)
+
+    def discard(self) -> None:
+        """Delete the journal, once the upload completed."""
+        if self._journal_fp:
+            self._journal_fp.unlink(missing_ok=True)
+
+
+def _annotation_digest(encoded_annotation: bytes) -> str:
+    """Identify an encoded annotation, e.g. to recognize it as already posted."""
+    return hashlib.sha256(encoded_annotation).hexdigest()
+
+
+def _read_streamed_annotations(streamed_fp: Path) -> list[tuple[str, str]]:
+    """Read the digest & level of each annotation posted to a run ahead of its finish.
+
+    :param streamed_fp: the file `GitHubChecks.stream_annotations` recorded them in
+    :return: the digest & annotation level of each posted annotation, in posting order
+    """
+    if not streamed_fp.exists():
+        return []
+    with streamed_fp.open("r", encoding="utf-8") as streamed_file:
+        return [
+            (digest, level)
+            for digest, _, level in (
+                line.rstrip().partition(" ") for line in streamed_file
+            )
+            if digest
+        ]
+
+
+def _without_streamed_annotations(
+    encoded_annotations: list[bytes],
+    streamed_fp: Path,
+) -> list[bytes]:
+    """Drop the annotations which were already posted, once per time they were posted.
+
+    :param encoded_annotations: all encoded annotations of the check run's output
+    :param streamed_fp: the file `GitHubChecks.stream_annotations` recorded them in
+    :return: the encoded annotations yet to be posted, in their original order
+    """
+    streamed = Counter(digest for digest, _ in _read_streamed_annotations(streamed_fp))
+    remaining: list[bytes] = []
+    for encoded_annotation in encoded_annotations:
+        digest = _annotation_digest(encoded_annotation)
+        if streamed[digest] > 0:
+            streamed[digest] -= 1
+        else:
+            remaining.append(encoded_annotation)
+    return remaining
 
 
 class GitHubChecks:
@@ -111,13 +945,18 @@ class GitHubChecks:
     app_privkey_pem: Path
     gh_api_timeout: int
     current_run_id: str | None = None
+    check_runs: dict[str, str]
     _api_headers: dict[str, str]
     _curr_check_name: str
     _curr_annotation_levels: set[AnnotationLevel]
     _curr_annotations_ctr: int
     _plain_base_url: str
+    scheduler: RequestScheduler
+    token_cache: InstallationTokenCache | None = None
     _github_session: Session
     _logger: logging.Logger
+    _reauth_lock: threading.Lock = threading.Lock()
+    _pool_maxsize: int = DEFAULT_POOLSIZE
 
     def __init__(  # noqa: PLR0913
         self,
@@ -127,6 +966,9 @@ class GitHubChecks:
         app_privkey_pem: Path,
         gh_api_timeout: int = 10,
         logger: logging.Logger | None = None,
+        github_api_base_url: str | None = None,
+        scheduler: RequestScheduler | None = None,
+        token_cache: InstallationTokenCache | None = None,
     ) -> None:
         """Initialize the headers for usage with the Checks API.
 
@@ -135,8 +977,17 @@ class GitHubChecks:
         :param app_installation_id: ID of the App's installation to the repo
         :param app_privkey_pem: private key provided by GitHub for this app, PEM format
         :param gh_api_timeout: API request timeout in seconds, optional, defaults to 10
+        :param github_api_base_url: override for the API URL, optional, by default
+            derived from the repo base URL (e.g. https://api.github.com)
+        :param scheduler: paces & retries all API requests, optional, by default
+            requests are paced per process, see `RequestScheduler` for details
+        :param token_cache: cache to share installation access tokens through with
+            other processes, optional, by default each instance mints its own token
         """
         self._github_session = Session()
+        self.scheduler = scheduler or RequestScheduler()
+        self.token_cache = token_cache
+        self.check_runs = {}
         if logger:
             self._logger = logger
         else:
@@ -159,17 +1010,13 @@ class GitHubChecks:
                 repo_base_url,
             )
             sys.exit(-1)
-        self.github_api_base_url: str = f"{url_parts.scheme}://api.{url_parts.netloc}"
+        self.github_api_base_url: str = (
+            github_api_base_url or f"{url_parts.scheme}://api.{url_parts.netloc}"
+        )
 
         self.auth()
 
-        self.repo_base_url = (
-            f"{url_parts.scheme}://api.{url_parts.netloc}/repos{url_parts.path}"
-        )
-        self._api_headers: dict[str, str] = _get_jwt_headers(
-            self.app_install_access_token,
-            "application/vnd.github+json",
-        )
+        self.repo_base_url = f"{self.github_api_base_url}/repos{url_parts.path}"
         self.gh_api_timeout = gh_api_timeout
 
     def auth(self) -> None:
@@ -181,43 +1028,223 @@ class GitHubChecks:
         # conservative 570s TTL, to avoid occasional 401s due to clock drifts,
         # which are known to occur with GitHub when using the max JWT expiry of 600s.
 
-        app_jwt: str = _generate_app_jwt_from_pem(
-            self.app_privkey_pem,
-            self.app_id,
-            ttl_seconds=570,
-        )
-        self.app_install_access_token, token_expiry_time = _authenticate_as_github_app(
-            app_jwt,
-            self.app_installation_id,
-            self._github_session,
-            self._logger,
-            self.github_api_base_url,
+        def mint_token() -> tuple[str, int]:
+            app_jwt: str = _generate_app_jwt_from_pem(
+                self.app_privkey_pem,
+                self.app_id,
+                ttl_seconds=570,
+            )
+            return _authenticate_as_github_app(
+                app_jwt,
+                self.app_installation_id,
+                self._github_session,
+                self._logger,
+                self.github_api_base_url,
+                scheduler=self.scheduler,
+            )
+
+        token_expiry_time: int
+        if self.token_cache:
+            self.app_install_access_token, token_expiry_time = (
+                self.token_cache.get_or_mint(
+                    self.github_api_base_url,
+                    self.app_id,
+                    self.app_installation_id,
+                    mint_token,
+                )
+            )
+        else:
+            self.app_install_access_token, token_expiry_time = mint_token()
+        self.time_to_reauth = token_expiry_time - _REAUTH_MARGIN_SECONDS
+        self._api_headers = _get_jwt_headers(
+            self.app_install_access_token,
+            "application/vnd.github+json",
         )
-        # installation access tokens should last 1h, re-auth 30s earlier to be safe
-        self.time_to_reauth = token_expiry_time - 30
+
+    def _reauth_if_expiring(self) -> None:
+        """Re-authenticate if our token is about to expire (safe across threads)."""
+        if time.time() < self.time_to_reauth:
+            return
+        with self._reauth_lock:
+            # another thread may have refreshed the token while we were waiting
+            if time.time() >= self.time_to_reauth:
+                self.auth()
 
     def start_check_run(
         self,
         revision_sha: str,
         check_name: str,
+        *,
+        reuse_existing: bool = False,
     ) -> None:
         """Start a run of this check.
 
         :param revision_sha: the sha revision being evaluated by this check run
         :param check_name: the name to be used for this specific check
+        :param reuse_existing: whether to adopt an in-progress run of this check for
+            the revision instead, if there is one (e.g. left behind by a retried
+            build), optional, defaults to always starting a new check run
         :raises HTTPError: in case the GitHub API could not start the check run
         """
+        run_id: str | None = None
+        if reuse_existing:
+            run_id = self._in_progress_check_runs(revision_sha, [check_name]).get(
+                check_name,
+            )
+        if run_id is None:
+            run_id = self._create_check_run(revision_sha, check_name)
+        if run_id is None:
+            return
+        self.check_runs[check_name] = run_id
+        self._select_check_run(check_name)
+
+    def start_check_runs(
+        self,
+        revision_sha: str,
+        check_names: list[str],
+        *,
+        max_workers: int = 8,
+        reuse_existing: bool = False,
+    ) -> dict[str, str]:
+        """Start runs of several checks at once, concurrently over the shared session.
+
+        Each of the check runs can be finished later on, by passing its name to
+        `finish_check_run`. The run of the check listed last becomes the current one.
+
+        :param revision_sha: the sha revision being evaluated by these check runs
+        :param check_names: the names of the checks to start a run of each
+        :param max_workers: max. number of check runs started concurrently, optional
+        :param reuse_existing: whether to adopt in-progress runs of these checks for
+            the revision instead, where there are any, optional
+        :return: the IDs of the check runs which were started, by check name
+        """
+        max_workers = max(1, min(max_workers, len(check_names)))
+        self._ensure_pool_size(max_workers)
+        # the token must not expire while starting, so refresh it once upfront if needed
+        self._reauth_if_expiring()
+        adopted: dict[str, str] = (
+            self._in_progress_check_runs(revision_sha, check_names, max_workers)
+            if reuse_existing
+            else {}
+        )
+        with ThreadPoolExecutor(max_workers=max_workers) as executor:
+            new_check_names = [name for name in check_names if name not in adopted]
+            run_ids = executor.map(
+                lambda check_name: self._create_check_run(revision_sha, check_name),
+                new_check_names,
+            )
+            created = {
+                check_name: run_id
+                for check_name, run_id in zip(new_check_names, run_ids, strict=True)
+                if run_id is not None
+            }
+        started = {
+            check_name: run_id
+            for check_name in check_names
+            if (run_id := adopted.get(check_name) or created.get(check_name))
+        }
+        self.check_runs.update(started)
+        if started:
+            self._select_check_run(next(reversed(started)))
+        return started
+
+    def list_check_runs(
+        self,
+        revision_sha: str,
+        *,
+        check_name: str | None = None,
+        status: str | None = None,
+        max_workers: int = 4,
+    ) -> list[dict[str, Any]]:
+        """List the check runs for a revision, fetching all pages of results.
+
+        The first page tells the total number of check runs, the remaining pages are
+        then fetched concurrently.
+
+        :param revision_sha: the sha revision to list the check runs of
+        :param check_name: only list the runs of the check with this name, optional
+        :param status: only list runs in this status, e.g. `in_progress`, optional
+        :param max_workers: max. number of pages fetched concurrently, optional
+        :return: the check runs, as returned by the GitHub API
+        :raises HTTPError: in case the GitHub API could not list the check runs
+        """
+        params: dict[str, str | int] = {"filter": "latest", "per_page": 100}
+        if check_name:
+            params["check_name"] = check_name
+        if status:
+            params["status"] = status
+
+        def fetch_page(page: int) -> dict[str, Any]:
+            self._reauth_if_expiring()
+            response: Response = self.scheduler.send(
+                self._github_session,
+                "GET",
+                f"{self.repo_base_url}/commits/{revision_sha}/check-runs",
+                params={**params, "page": page},
+                headers=self._api_headers,
+                timeout=self.gh_api_timeout,
+            )
+            response.raise_for_status()
+            return cast("dict[str, Any]", response.json())
+
+        first_page = fetch_page(1)
+        check_runs: list[dict[str, Any]] = first_page.get("check_runs", [])
+        num_pages = -(-int(first_page.get("total_count", 0)) // 100)
+        if num_pages > 1:
+            with ThreadPoolExecutor(max_workers=max_workers) as executor:
+                for page in executor.map(fetch_page, range(2, num_pages + 1)):
+                    check_runs += page.get("check_runs", [])
+        return check_runs
+
+    def _in_progress_check_runs(
+        self,
+        revision_sha: str,
+        check_names: list[str],
+        max_workers: int = 4,
+    ) -> dict[str, str]:
+        """Find in-progress runs of the given checks by this app, by check name."""
+        check_runs = self.list_check_runs(
+            revision_sha,
+            # with a single check, let GitHub do the filtering
+            check_name=check_names[0] if len(check_names) == 1 else None,
+            status="in_progress",
+            max_workers=max_workers,
+        )
+        in_progress: dict[str, int] = {}
+        for check_run in check_runs:
+            check_name = check_run.get("name", "")
+            if (
+                check_name in check_names
+                # runs of the same name might also have been created by other apps
+                and str((check_run.get("app") or {}).get("id")) == str(self.app_id)
+            ):
+                # in case of several runs, adopt the latest
+                in_progress[check_name] = max(
+                    in_progress.get(check_name, 0),
+                    int(check_run["id"]),
+                )
+        for check_name, run_id in in_progress.items():
+            self._logger.info(
+                "Reusing in-progress check run %d of check %s.",
+                run_id,
+                check_name,
+            )
+        return {check_name: str(run_id) for check_name, run_id in in_progress.items()}
+
+    def _create_check_run(self, revision_sha: str, check_name: str) -> str | None:
+        """Create an in-progress check run, returning its ID (or None on failure)."""
         # Check if our token is about to expire, and re-auth if so
-        if time.time() >= self.time_to_reauth:
-            self.auth()
+        self._reauth_if_expiring()
 
         json_payload: dict[str, str] = {
             "name": check_name,
             "head_sha": revision_sha,
             "status": "in_progress",
-            "started_at": self._gen_github_timestamp(),
+            "started_at": _gen_github_timestamp(),
         }
-        response: Response = self._github_session.post(
+        response: Response = self.scheduler.send(
+            self._github_session,
+            "POST",
             f"{self.repo_base_url}/check-runs",
             json=json_payload,
             headers=self._api_headers,
@@ -237,27 +1264,146 @@ class GitHubChecks:
                 "that %s is the correct API endpoint.",
                 self.repo_base_url + "/check-runs",
             )
-            return
+            return None
+        return str(response.json().get("id"))
 
+    def _select_check_run(self, check_name: str) -> None:
+        """Make the started run of the given check the current one."""
         self._curr_check_name = check_name
-        self.current_run_id = str(response.json().get("id"))
+        self.current_run_id = self.check_runs[check_name]
         self._curr_annotation_levels = set()
         self._curr_annotations_ctr = 0
 
-    def finish_check_run(
+    def stream_annotations(
+        self,
+        annotations: list[CheckAnnotation],
+        streamed_fp: Path,
+        *,
+        max_batch_bytes: int | None = DEFAULT_MAX_BATCH_BYTES,
+        check_name: str | None = None,
+    ) -> None:
+        """Post annotations to the running check run, ahead of finishing it.
+
+        Meant for posting the findings of a check while it is still running. The run
+        stays in progress, with the number of issues found so far as its output. Each
+        posted annotation is recorded in `streamed_fp`, passing the same file to
+        `finish_check_run` then only uploads the annotations not yet posted.
+
+        :param annotations: the newly found annotations to post
+        :param streamed_fp: file to record the posted annotations in, shared by all
+            calls for the same check run
+        :param max_batch_bytes: max. size of each request body, optional, defaults to
+            1 MiB, `None` only limits the number of annotations per request
+        :param check_name: the check whose run to post to, optional, defaults to the
+            current check run, i.e. the one started last
+        :raises HTTPError: in case the GitHub API rejected any of the updates
+        """
+        if check_name is not None:
+            if check_name not in self.check_runs:
+                self._logger.critical(
+                    "[github-checks] Trying to post annotations, but no run of check %s"
+                    " was started.",
+                    check_name,
+                )
+                return
+            self._select_check_run(check_name)
+
+        if not self.current_run_id:
+            self._logger.critical(
+                "[github-checks] Trying to post annotations, but no check is running.",
+            )
+            return
+        if not annotations:
+            return
+
+        level_counts: Counter[str] = Counter(
+            level for _, level in _read_streamed_annotations(streamed_fp)
+        )
+        level_counts.update(annotation.annotation_level for annotation in annotations)
+        with timed_phase("encoding"):
+            encoder = _CheckRunUpdateEncoder(
+                self._curr_check_name,
+                CheckRunOutput(
+                    title=f"{self._curr_check_name} is running, found "
+                    f"{level_counts.total()} issues so far.",
+                    summary=", ".join(
+                        f"{level_counts[level]} {level.value}"
+                        for level in AnnotationLevel
+                        if level_counts[level]
+                    )
+                    + " annotations so far, more may follow until the check completes.",
+                    annotations=annotations,
+                ),
+            )
+        levels: dict[bytes, str] = dict(
+            zip(
+                encoder.encoded_annotations,
+                (annotation.annotation_level.value for annotation in annotations),
+                strict=True,
+            ),
+        )
+        with timed_phase("upload"):
+            for batch in encoder.batches(max_batch_bytes)[0]:
+                # without a conclusion, the run stays in progress
+                self._post_check_run_update(encoder.body(batch), len(batch))
+                with streamed_fp.open("a", encoding="utf-8") as streamed_file:
+                    streamed_file.writelines(
+                        f"{_annotation_digest(encoded)} {levels[encoded]}\n"
+                        for encoded in batch
+                    )
+
+    def finish_check_run(  # noqa: PLR0913
         self,
         conclusion: CheckRunConclusion | None = None,
         output: CheckRunOutput | None = None,
+        *,
+        max_workers: int = 1,
+        journal_fp: Path | None = None,
+        max_batch_bytes: int | None = DEFAULT_MAX_BATCH_BYTES,
+        check_name: str | None = None,
+        streamed_fp: Path | None = None,
     ) -> None:
-        """Finish the currently running check run.
+        """Finish the currently running check run, or the run of the given check.
 
         If no conclusion is specified, `action_required` is chosen in case of any
         `failure`-level annotations, and `success` otherwise.
 
+        Annotations are uploaded in batches, as the API accepts at most 50 per request.
+        The batches are packed such that each request body stays within
+        `max_batch_bytes`, using as few requests as possible.
+        With `max_workers` > 1, all but the final batch are uploaded concurrently over
+        the shared session, backing off whenever GitHub responds slowly or throttles
+        us. The final batch, which sets the conclusion, is always sent last.
+
+        If a `journal_fp` is given, the progress of the upload is recorded in it. If
+        the upload fails midway, finishing the same check run with the same output
+        again resumes the upload from the first batch GitHub did not yet acknowledge.
+
+        If a `streamed_fp` is given, any annotations already posted to the run via
+        `stream_annotations` are skipped, as GitHub keeps them on the run regardless.
+
         :param output: the results of this check run, for annotating a PR, optional
         :param conclusion: the overall success, to be fed back for PR approval, optional
+        :param max_workers: max. number of concurrent annotation uploads, optional
+        :param journal_fp: file to record the upload progress in, optional
+        :param max_batch_bytes: max. size of each request body, optional, defaults to
+            1 MiB, `None` only limits the number of annotations per request
+        :param check_name: the check whose run to finish, optional, defaults to the
+            current check run, i.e. the one started last
+        :param streamed_fp: file in which `stream_annotations` recorded the annotations
+            it already posted to the run, optional
         :raises HTTPError: in case the GitHub API could not start the check run
         """
+        if check_name is not None:
+            if check_name not in self.check_runs:
+                self._logger.critical(
+                    "[github-checks] Trying to finish check run, but no run of check %s"
+                    " was started.",
+                    check_name,
+                )
+                return
+            self._select_check_run(check_name)
+
         if not self.current_run_id:
             self._logger.critical(
                 "[github-checks] Trying to finish check run, but no check is running.",
@@ -274,75 +1420,317 @@ class GitHubChecks:
 
         if not conclusion:
             if output.annotations:
-                conclusion = self._infer_conclusion(output.annotations)
+                conclusion = _infer_conclusion(output.annotations)
             else:
                 conclusion = CheckRunConclusion.NEUTRAL
 
-        if not output.annotations:
-            self._post_check_run_update(output, conclusion)
-        else:
-            for annotations_chunk in self._annotation_batches(output.annotations):
-                output.annotations = annotations_chunk
-                self._post_check_run_update(output, conclusion)
+        with timed_phase("encoding"):
+            encoder = _CheckRunUpdateEncoder(self._curr_check_name, output)
+        if streamed_fp:
+            encoder.encoded_annotations = _without_streamed_annotations(
+                encoder.encoded_annotations,
+                streamed_fp,
+            )
+        with timed_phase("upload"):
+            if not encoder.encoded_annotations:
+                self._post_check_run_update(encoder.body(conclusion=conclusion))
+            else:
+                self._upload_annotations(
+                    encoder,
+                    conclusion,
+                    max_workers,
+                    journal_fp,
+                    max_batch_bytes,
+                )
 
+        if streamed_fp:
+            streamed_fp.unlink(missing_ok=True)
+        self.check_runs.pop(self._curr_check_name, None)
         self.current_run_id = None
 
-    def _post_check_run_update(
+    def _upload_annotations(
         self,
-        output: CheckRunOutput,
+        encoder: _CheckRunUpdateEncoder,
         conclusion: CheckRunConclusion,
+        max_workers: int,
+        journal_fp: Path | None,
+        max_batch_bytes: int | None,
     ) -> None:
-        # Check if our token is about to expire, and re-auth if so
-        if time.time() >= self.time_to_reauth:
-            self.auth()
-
-        json_payload: CheckRunUpdatePOSTBody = CheckRunUpdatePOSTBody(
-            name=self._curr_check_name,
-            completed_at=self._gen_github_timestamp(),
-            output=output,
-            conclusion=conclusion.value,
+        """Upload the output in batches of annotations, setting the conclusion last."""
+        annotation_batches, in_order_batches = encoder.batches(max_batch_bytes)
+        if len(annotation_batches) < in_order_batches:
+            self._logger.info(
+                "Packed %d annotations into %d batches, saving %d requests.",
+                len(encoder.encoded_annotations),
+                len(annotation_batches),
+                in_order_batches - len(annotation_batches),
+            )
+        journal = _UploadJournal.load_or_create(
+            journal_fp,
+            str(self.current_run_id),
+            annotation_batches,
+        )
+        if journal.acknowledged:
+            self._logger.info(
+                "Resuming upload of check run %s, skipping %d of %d batches which "
+                "were already uploaded.",
+                self.current_run_id,
+                len(journal.acknowledged),
+                len(annotation_batches),
+            )
+        pending_batches: list[tuple[int, bytes, int]] = [
+            (batch_idx, encoder.body(batch), len(batch))
+            for batch_idx, batch in enumerate(annotation_batches[:-1])
+            if batch_idx not in journal.acknowledged
+        ]
+        final_batch = annotation_batches[-1]
+        self._upload_pending_batches(
+            pending_batches,
+            (
+                len(annotation_batches) - 1,
+                # encoded only once it's sent, for an accurate `completed_at`
+                lambda: encoder.body(final_batch, conclusion),
+                len(final_batch),
+            ),
+            journal,
+            max_workers,
         )
 
-        # Get rid of any null values, as they cause HTTP Status 422 errors at the API
-        post_body_json = json_payload.model_dump_json(
-            exclude_unset=True,
-            exclude_none=True,
+    def upload_check_run_updates(
+        self,
+        check_name: str,
+        bodies: list[bytes],
+        *,
+        max_workers: int = 1,
+        journal_fp: Path | None = None,
+    ) -> None:
+        """Upload already encoded updates to the run of the given check, finishing it.
+
+        Meant for replaying the bodies exported by `encode_check_run_updates`, e.g. on
+        another machine than the one which formatted the check's output. All but the
+        final update are uploaded like the batches of `finish_check_run`, the final
+        update, which sets the conclusion, is always sent last. Unlike finishing, this
+        leaves the current check run alone, so the runs of different checks can be
+        updated concurrently, see `upload_check_runs_updates`.
+
+        :param check_name: the check whose run to update, started via this session
+        :param bodies: the encoded JSON bodies, with the concluding update last
+        :param max_workers: max. number of concurrent uploads, optional
+        :param journal_fp: file to record the upload progress in, optional, to resume
+            a failed replay of the same updates, see `finish_check_run`
+        :raises HTTPError: in case the GitHub API rejected any of the updates
+        """
+        if check_name not in self.check_runs:
+            self._logger.critical(
+                "[github-checks] Trying to replay updates, but no run of check %s was"
+                " started.",
+                check_name,
+            )
+            return
+        run_id = self.check_runs[check_name]
+        journal = _UploadJournal.load_or_create(
+            journal_fp,
+            run_id,
+            [[body] for body in bodies],
         )
-        post_body_dict = json.loads(post_body_json)
-        _delete_keys_from_nested_dict(post_body_dict)
+        # each annotation has exactly one level, and JSON escapes quotes in strings
+        pending_batches: list[tuple[int, bytes, int]] = [
+            (body_idx, body, body.count(b'"annotation_level":'))
+            for body_idx, body in enumerate(bodies[:-1])
+            if body_idx not in journal.acknowledged
+        ]
+        with timed_phase("upload"):
+            self._upload_pending_batches(
+                pending_batches,
+                (
+                    len(bodies) - 1,
+                    lambda: bodies[-1],
+                    bodies[-1].count(b'"annotation_level":'),
+                ),
+                journal,
+                max_workers,
+                run_id=run_id,
+            )
+        self.check_runs.pop(check_name, None)
+        if self.current_run_id == run_id:
+            self.current_run_id = None
 
-        response: Response = self._github_session.patch(
-            f"{self.repo_base_url}/check-runs/{self.current_run_id}",
-            json=post_body_dict,
-            headers=self._api_headers,
-            timeout=self.gh_api_timeout,
+    def upload_check_runs_updates(
+        self,
+        updates_per_check: dict[str, list[bytes]],
+        *,
+        max_workers: int = 1,
+        journal_fps: dict[str, Path] | None = None,
+    ) -> None:
+        """Upload the encoded updates of many check runs concurrently, finishing each.
+
+        Each check's updates are uploaded as by `upload_check_run_updates`, with the
+        runs of all checks in flight at the same time over the shared session, paced
+        by the same scheduler. A failing check run doesn't stop the others, the runs
+        which were finished are removed from `check_runs` as usual.
+
+        :param updates_per_check: the encoded JSON bodies of each check, each with its
+            concluding update last
+        :param max_workers: max. number of concurrent uploads per check run, optional
+        :param journal_fps: file to record each check's upload progress in, optional
+        :raises HTTPError: the first error of any check run, once all others are done
+        """
+        if len(updates_per_check) <= 1:
+            for check_name, bodies in updates_per_check.items():
+                self.upload_check_run_updates(
+                    check_name,
+                    bodies,
+                    max_workers=max_workers,
+                    journal_fp=(journal_fps or {}).get(check_name),
+                )
+            return
+
+        self._ensure_pool_size(len(updates_per_check) * max_workers)
+        with ThreadPoolExecutor(max_workers=len(updates_per_check)) as executor:
+            futures = [
+                executor.submit(
+                    self.upload_check_run_updates,
+                    check_name,
+                    bodies,
+                    max_workers=max_workers,
+                    journal_fp=(journal_fps or {}).get(check_name),
+                )
+                for check_name, bodies in updates_per_check.items()
+            ]
+        errors = [err for future in futures if (err := future.exception())]
+        if errors:
+            raise errors[0]
+
+    def _upload_pending_batches(
+        self,
+        pending_batches: list[tuple[int, bytes, int]],
+        final_batch: tuple[int, Callable[[], bytes], int],
+        journal: _UploadJournal,
+        max_workers: int,
+        *,
+        run_id: str | None = None,
+    ) -> None:
+        """Upload the batches not yet acknowledged, and the concluding batch last.
+
+        :param pending_batches: index, encoded body & number of annotations of each
+            batch to be uploaded before the final one
+        :param final_batch: index, a function encoding the body & number of
+            annotations of the final batch, which sets the conclusion, its body is
+            encoded right before it's sent
+        :param journal: journal to record the acknowledged batches in
+        :param max_workers: upper bound for the number of concurrent requests
+        :param run_id: the check run to update, optional, defaults to the current one
+        """
+        if max_workers > 1 and len(pending_batches) > 1:
+            self._upload_batches_concurrently(
+                pending_batches,
+                journal,
+                max_workers,
+                run_id=run_id,
+            )
+        else:
+            for batch_idx, body, num_annotations in pending_batches:
+                self._post_check_run_update(body, num_annotations, run_id=run_id)
+                journal.acknowledge(batch_idx)
+        # the conclusion is only set with the final batch, completing the run
+        final_idx, encode_final_body, final_annotations = final_batch
+        if final_idx not in journal.acknowledged:
+            self._post_check_run_update(
+                encode_final_body(),
+                final_annotations,
+                run_id=run_id,
+            )
+        journal.discard()
+
+    def _upload_batches_concurrently(
+        self,
+        pending_batches: list[tuple[int, bytes, int]],
+        journal: _UploadJournal,
+        max_workers: int,
+        *,
+        run_id: str | None = None,
+    ) -> None:
+        """Upload annotation batches through a bounded, adaptive pool of workers.
+
+        :param pending_batches: index, encoded body & number of annotations of each
+            batch to be uploaded
+        :param journal: journal to record the acknowledged batches in
+        :param max_workers: upper bound for the number of concurrent requests
+        :param run_id: the check run to update, optional, defaults to the current one
+        :raises HTTPError: in case the GitHub API rejected any of the batches
+        """
+        self._ensure_pool_size(max_workers)
+        # the token must not expire mid-upload, so refresh it once upfront if needed
+        self._reauth_if_expiring()
+
+        limiter = _AdaptiveConcurrencyLimiter(
+            max_workers,
+            slow_response_seconds=self.gh_api_timeout / 2,
         )
-        response.raise_for_status()
 
-    @staticmethod
-    def _annotation_batches(
-        annotations: list[CheckAnnotation],
-        batch_size: int = 50,
-    ) -> Iterable[list[CheckAnnotation]]:
-        """Chunk the annotations, as GitHub API accepts <= 50 annotations at once."""
-        for i in range(0, len(annotations), batch_size):
-            yield annotations[i : i + batch_size]
+        def upload_batch(batch_idx: int, body: bytes, num_annotations: int) -> None:
+            self._post_check_run_update(
+                body,
+                num_annotations,
+                run_id=run_id,
+                limiter=limiter,
+            )
+            journal.acknowledge(batch_idx)
 
-    def _infer_conclusion(
+        with ThreadPoolExecutor(max_workers=max_workers) as executor:
+            futures = [
+                executor.submit(upload_batch, *pending_batch)
+                for pending_batch in pending_batches
+            ]
+            try:
+                for future in futures:
+                    future.result()  # re-raises any errors from the workers
+            except Exception:
+                # don't spend the request budget on batches of a failed upload
+                executor.shutdown(cancel_futures=True)
+                raise
+        self._logger.info(
+            "Uploaded %d annotation batches, final concurrency was %d.",
+            len(pending_batches),
+            limiter.limit,
+        )
+
+    def _ensure_pool_size(self, max_workers: int) -> None:
+        """Make sure the session keeps a connection alive for each worker."""
+        # never shrink the pool, e.g. while concurrent check runs share it
+        if max_workers > self._pool_maxsize:
+            self._github_session.mount(
+                "https://",
+                HTTPAdapter(pool_connections=1, pool_maxsize=max_workers),
+            )
+            self._pool_maxsize = max_workers
+
+    def _post_check_run_update(
         self,
-        annotations: list[CheckAnnotation],
-    ) -> CheckRunConclusion:
-        annotation_levels = {annotation.annotation_level for annotation in annotations}
-        if AnnotationLevel.FAILURE in annotation_levels:
-            return CheckRunConclusion.ACTION_REQUIRED
-        # both warning and notice should not block a pull request, but just inform
-        return CheckRunConclusion.SUCCESS
-
-    def _gen_github_timestamp(self) -> str:
-        """Generate a timestamp for the current moment in the GitHub-expected format."""
-        return (
-            datetime.now(timezone.utc)
-            .replace(microsecond=0)
-            .isoformat()
-            .replace("+00:00", "Z")
+        body: bytes,
+        annotations: int = 0,
+        *,
+        run_id: str | None = None,
+        limiter: _AdaptiveConcurrencyLimiter | None = None,
+    ) -> None:
+        """PATCH a check run with an already encoded JSON body.
+
+        :param body: the encoded JSON body
+        :param annotations: the number of annotations in the body, for the hooks
+        :param run_id: the check run to update, optional, defaults to the current one
+        :param limiter: limiter of the upload the update is part of, optional
+        """
+        # Check if our token is about to expire, and re-auth if so
+        self._reauth_if_expiring()
+
+        response: Response = self.scheduler.send(
+            self._github_session,
+            "PATCH",
+            f"{self.repo_base_url}/check-runs/{run_id or self.current_run_id}",
+            limiter=limiter,
+            data=body,
+            headers={**self._api_headers, "Content-Type": "application/json"},
+            timeout=self.gh_api_timeout,
         )
+        response.raise_for_status()
+        hooks.batch_uploaded(annotations=annotations, bytes_sent=len(body))
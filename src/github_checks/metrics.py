@@ -0,0 +1,282 @@
+"""Hooks into the formatting & upload pipeline, and a collector of their metrics.
+
+The pipeline reports its events to all registered hooks, e.g. to see where the time
+of a check run goes, or to track regressions across many builds:
+
+```python
+collector = MetricsCollector()
+register_hooks(collector)
+gh_checks.finish_check_run(...)
+collector.write(Path("github_checks.prom"), "prometheus")
+```
+
+Without any registered hooks, reporting an event is just a loop over an empty list.
+"""
+
+import json
+import threading
+import time
+from collections import defaultdict
+from collections.abc import Iterator
+from contextlib import contextmanager
+from pathlib import Path
+from typing import Any, Literal
+
+
+class PipelineHooks:
+    """Receives the events of the formatting & upload pipeline, ignoring all of them.
+
+    Subclass this and override the events of interest, then `register_hooks` it. The
+    events may be reported from several threads at once, e.g. by concurrent uploads.
+    """
+
+    def request_started(self, *, method: str, url: str) -> None:
+        """Report that a request to the GitHub API is about to be sent.
+
+        :param method: the HTTP method of the request
+        :param url: the URL the request is sent to
+        """
+
+    def request_finished(
+        self,
+        *,
+        method: str,
+        url: str,
+        status_code: int | None,
+        seconds: float,
+        bytes_sent: int,
+    ) -> None:
+        """Report the outcome of a request to the GitHub API, incl. each retry.
+
+        :param method: the HTTP method of the request
+        :param url: the URL the request was sent to
+        :param status_code: the response's status code, `None` if none was received
+        :param seconds: the latency of the request
+        :param bytes_sent: the size of the request body
+        """
+
+    def request_retried(self, *, method: str, url: str, delay_seconds: float) -> None:
+        """Report that a failed or throttled request is retried after a delay.
+
+        :param method: the HTTP method of the request
+        :param url: the URL the request is sent to
+        :param delay_seconds: the delay until the retry
+        """
+
+    def batch_uploaded(self, *, annotations: int, bytes_sent: int) -> None:
+        """Report that GitHub accepted an update of a check run.
+
+        :param annotations: the number of annotations in the update
+        :param bytes_sent: the size of the update's body
+        """
+
+    def phase_finished(self, *, phase: str, seconds: float) -> None:
+        """Report the duration of a phase of the pipeline.
+
+        Phases are `jwt_signing`, `token_exchange`, `formatting` (reading, parsing &
+        validating a log), `filtering` (matching the ignored globs), `encoding` and
+        `upload` (of a check run's output).
+
+        :param phase: the name of the phase
+        :param seconds: the time spent in the phase
+        """
+
+
+class _RegisteredHooks(PipelineHooks):
+    """Passes each event on to all registered hooks."""
+
+    def __init__(self) -> None:
+        self.registered: list[PipelineHooks] = []
+
+    def request_started(self, *, method: str, url: str) -> None:
+        for hooks in self.registered:
+            hooks.request_started(method=method, url=url)
+
+    def request_finished(
+        self,
+        *,
+        method: str,
+        url: str,
+        status_code: int | None,
+        seconds: float,
+        bytes_sent: int,
+    ) -> None:
+        for hooks in self.registered:
+            hooks.request_finished(
+                method=method,
+                url=url,
+                status_code=status_code,
+                seconds=seconds,
+                bytes_sent=bytes_sent,
+            )
+
+    def request_retried(self, *, method: str, url: str, delay_seconds: float) -> None:
+        for hooks in self.registered:
+            hooks.request_retried(method=method, url=url, delay_seconds=delay_seconds)
+
+    def batch_uploaded(self, *, annotations: int, bytes_sent: int) -> None:
+        for hooks in self.registered:
+            hooks.batch_uploaded(annotations=annotations, bytes_sent=bytes_sent)
+
+    def phase_finished(self, *, phase: str, seconds: float) -> None:
+        for hooks in self.registered:
+            hooks.phase_finished(phase=phase, seconds=seconds)
+
+
+# the hooks all events of the pipeline are reported to
+hooks = _RegisteredHooks()
+
+
+def register_hooks(pipeline_hooks: PipelineHooks) -> None:
+    """Have all events of the pipeline reported to the given hooks."""
+    hooks.registered.append(pipeline_hooks)
+
+
+def unregister_hooks(pipeline_hooks: PipelineHooks) -> None:
+    """Stop reporting the events of the pipeline to the given hooks."""
+    hooks.registered.remove(pipeline_hooks)
+
+
+@contextmanager
+def timed_phase(phase: str) -> Iterator[None]:
+    """Report the duration of the enclosed phase of the pipeline to the hooks."""
+    if not hooks.registered:
+        yield
+        return
+    start_time = time.perf_counter()
+    try:
+        yield
+    finally:
+        hooks.phase_finished(phase=phase, seconds=time.perf_counter() - start_time)
+
+
+def _percentile(sorted_values: list[float], percentile: float) -> float:
+    """Nearest-rank percentile of the already sorted values, 0 if there are none."""
+    if not sorted_values:
+        return 0.0
+    rank = max(round(percentile / 100 * len(sorted_values)) - 1, 0)
+    return sorted_values[min(rank, len(sorted_values) - 1)]
+
+
+class MetricsCollector(PipelineHooks):
+    """Collects the pipeline's metrics, to write them as JSON or Prometheus textfile."""
+
+    def __init__(self) -> None:
+        """Start collecting from scratch."""
+        self._lock = threading.Lock()
+        self.reset()
+
+    def reset(self) -> None:
+        """Discard everything collected so far, e.g. once it was written."""
+        with self._lock:
+            self._request_seconds: list[float] = []
+            self._requests_failed = 0
+            self._retries = 0
+            self._bytes_sent = 0
+            self._batches = 0
+            self._annotations = 0
+            self._phase_seconds: defaultdict[str, float] = defaultdict(float)
+
+    def request_finished(
+        self,
+        *,
+        method: str,  # noqa: ARG002
+        url: str,  # noqa: ARG002
+        status_code: int | None,
+        seconds: float,
+        bytes_sent: int,
+    ) -> None:
+        """Collect the latency & size of a request."""
+        with self._lock:
+            self._request_seconds.append(seconds)
+            self._bytes_sent += bytes_sent
+            if status_code is None or status_code >= 400:  # noqa: PLR2004
+                self._requests_failed += 1
+
+    def request_retried(
+        self,
+        *,
+        method: str,  # noqa: ARG002
+        url: str,  # noqa: ARG002
+        delay_seconds: float,  # noqa: ARG002
+    ) -> None:
+        """Count a retry."""
+        with self._lock:
+            self._retries += 1
+
+    def batch_uploaded(self, *, annotations: int, bytes_sent: int) -> None:  # noqa: ARG002
+        """Count an accepted check run update & its annotations."""
+        with self._lock:
+            self._batches += 1
+            self._annotations += annotations
+
+    def phase_finished(self, *, phase: str, seconds: float) -> None:
+        """Add up the time spent per phase."""
+        with self._lock:
+            self._phase_seconds[phase] += seconds
+
+    def snapshot(self) -> dict[str, Any]:
+        """Summarize everything collected so far.
+
+        :return: the request latency percentiles in seconds, the number of requests,
+            failures, retries, batches & annotations, the bytes sent, the annotations
+            uploaded per second of upload and the time spent per phase
+        """
+        with self._lock:
+            latencies = sorted(self._request_seconds)
+            upload_seconds = self._phase_seconds.get("upload", 0.0)
+            return {
+                "requests": len(latencies),
+                "requests_failed": self._requests_failed,
+                "retries": self._retries,
+                "request_seconds_p50": _percentile(latencies, 50),
+                "request_seconds_p95": _percentile(latencies, 95),
+                "bytes_sent": self._bytes_sent,
+                "batches": self._batches,
+                "annotations": self._annotations,
+                "annotations_per_second": (
+                    self._annotations / upload_seconds if upload_seconds else 0.0
+                ),
+                "phase_seconds": dict(self._phase_seconds),
+            }
+
+    def write(
+        self,
+        metrics_fp: Path,
+        metrics_format: Literal["json", "prometheus"] = "json",
+        labels: dict[str, str] | None = None,
+    ) -> None:
+        """Write the metrics collected so far.
+
+        As JSON, one line is appended per call, such that the metrics of consecutive
+        commands of a build accumulate in the same file. The Prometheus textfile is
+        replaced atomically instead, e.g. for node_exporter's textfile collector.
+
+        :param metrics_fp: the file to write to
+        :param metrics_format: `json` or `prometheus`, optional, defaults to `json`
+        :param labels: labels to add to the metrics, e.g. the CLI command, optional
+        """
+        snapshot = self.snapshot()
+        if metrics_format == "json":
+            with metrics_fp.open("a", encoding="utf-8") as metrics_file:
+                metrics_file.write(json.dumps({**(labels or {}), **snapshot}) + "\n")
+            return
+
+        label_str = ",".join(f'{k}="{v}"' for k, v in sorted((labels or {}).items()))
+        lines: list[str] = []
+        for name, value in snapshot.items():
+            if name == "phase_seconds":
+                continue
+            metric = f"github_checks_{name}"
+            lines += (
+                f"# TYPE {metric} gauge",
+                f"{metric}{{{label_str}}} {value}",
+            )
+        lines.append("# TYPE github_checks_phase_seconds gauge")
+        for phase, seconds in sorted(snapshot["phase_seconds"].items()):
+            phase_labels = ",".join(filter(None, (label_str, f'phase="{phase}"')))
+            lines.append(f"github_checks_phase_seconds{{{phase_labels}}} {seconds}")
+        # write & rename, such that the textfile collector never reads a partial file
+        tmp_fp = metrics_fp.with_name(metrics_fp.name + ".tmp")
+        tmp_fp.write_text("\n".join(lines) + "\n", encoding="utf-8")
+        tmp_fp.replace(metrics_fp)
@@ -1,25 +1,17 @@
 """Model representation of GitHub checks specific dictionary/json structures."""
 
+import json
+from array import array
+from collections.abc import Iterable, Iterator, Sequence
 from enum import StrEnum, auto
-from typing import Any
+from typing import Any, overload
 
-from pydantic import BaseModel
+from pydantic import BaseModel, GetCoreSchemaHandler
+from pydantic_core import core_schema
 
-
-class CheckRunConclusion(StrEnum):
-    """The valid conclusion states of a check run.
-
-    See https://docs.github.com/en/rest/checks/runs#update-a-check-run for details.
-    """
-
-    ACTION_REQUIRED = auto()
-    SUCCESS = auto()
-    FAILURE = auto()
-    NEUTRAL = auto()
-    SKIPPED = auto()
-    STALE = auto()
-    TIMED_OUT = auto()
-    CANCELLED = auto()
+from github_checks.constants import (  # re-exported, as one of the models
+    CheckRunConclusion as CheckRunConclusion,  # noqa: PLC0414
+)
 
 
 class AnnotationLevel(StrEnum):
@@ -77,6 +69,235 @@ class CheckAnnotation(BaseModel):
         return super().model_dump(exclude_none=True, exclude_unset=True)
 
 
+# the value of an unset line or column in an `AnnotationStore`
+_UNSET = -(2**31)
+_ANNOTATION_LEVELS = tuple(AnnotationLevel)
+_POSITION_FIELDS = ("start_line", "end_line", "start_column", "end_column")
+
+
+class AnnotationStore(Sequence[CheckAnnotation]):
+    """A compact, append-only sequence of annotations, e.g. for 100k+ findings.
+
+    Instead of a `CheckAnnotation` each, the annotations are kept as rows of columns:
+    lines & columns in an array, and each distinct string only once, as paths, titles &
+    rule descriptions mostly repeat across findings. `CheckAnnotation`s are only
+    materialized on access, and `encoded` serializes the rows directly. Lines and
+    columns must fit into 32 bit.
+    """
+
+    __slots__ = (
+        "_levels",
+        "_messages",
+        "_paths",
+        "_positions",
+        "_raw_details",
+        "_strings",
+        "_titles",
+    )
+
+    def __init__(self, annotations: Iterable[CheckAnnotation] = ()) -> None:
+        """Store the given annotations, if any.
+
+        :param annotations: the annotations to store, e.g. filtered from another store
+        """
+        self._strings: dict[str, str] = {}  # each distinct string, to deduplicate
+        self._paths: list[str] = []
+        self._messages: list[str] = []
+        self._titles: list[str | None] = []
+        self._raw_details: list[str | None] = []
+        self._levels = bytearray()  # the index into `AnnotationLevel` of each
+        # the start line, end line, start column & end column of each in turn
+        self._positions = array("i")
+        self.extend(annotations)
+
+    def add(  # noqa: PLR0913
+        self,
+        path: str,
+        message: str,
+        annotation_level: AnnotationLevel,
+        *,
+        start_line: int | None = None,
+        end_line: int | None = None,
+        start_column: int | None = None,
+        end_column: int | None = None,
+        title: str | None = None,
+        raw_details: str | None = None,
+    ) -> None:
+        """Add an annotation from its fields, as trusted values without validation.
+
+        The fields are those of `CheckAnnotation`, where those which are `None` are
+        left out, just like unset fields of a `CheckAnnotation`.
+        """
+        self._paths.append(self._dedupe(path))
+        self._messages.append(self._dedupe(message))
+        self._titles.append(self._dedupe_optional(title))
+        self._raw_details.append(self._dedupe_optional(raw_details))
+        self._levels.append(_ANNOTATION_LEVELS.index(annotation_level))
+        self._positions.extend(
+            _UNSET if position is None else position
+            for position in (start_line, end_line, start_column, end_column)
+        )
+
+    def append(self, annotation: CheckAnnotation) -> None:
+        """Add an annotation, keeping only the fields set on it."""
+        fields_set = annotation.model_fields_set
+        self.add(
+            annotation.path,
+            annotation.message,
+            annotation.annotation_level,
+            start_line=annotation.start_line if "start_line" in fields_set else None,
+            end_line=annotation.end_line if "end_line" in fields_set else None,
+            start_column=annotation.start_column,
+            end_column=annotation.end_column,
+            title=annotation.title,
+            raw_details=annotation.raw_details,
+        )
+
+    def extend(self, annotations: Iterable[CheckAnnotation]) -> None:
+        """Add the given annotations, copying the rows of another store directly."""
+        if not isinstance(annotations, AnnotationStore):
+            for annotation in annotations:
+                self.append(annotation)
+            return
+        self._paths += map(self._dedupe, annotations._paths)  # noqa: SLF001
+        self._messages += map(self._dedupe, annotations._messages)  # noqa: SLF001
+        self._titles += map(self._dedupe_optional, annotations._titles)  # noqa: SLF001
+        self._raw_details += map(
+            self._dedupe_optional,
+            annotations._raw_details,  # noqa: SLF001
+        )
+        self._levels += annotations._levels  # noqa: SLF001
+        self._positions += annotations._positions  # noqa: SLF001
+
+    def annotation_levels(self) -> Iterator[AnnotationLevel]:
+        """Get the level of each annotation, without materializing the annotations."""
+        return (_ANNOTATION_LEVELS[level_idx] for level_idx in self._levels)
+
+    def encoded(self) -> Iterator[bytes]:
+        """Encode each annotation to JSON, leaving out unset & null fields.
+
+        The result is identical to encoding the `CheckAnnotation`s, but repeated
+        strings are encoded only once, and no annotation is materialized.
+        """
+        encoded_strings: dict[str, bytes] = {}
+
+        def encode(string: str) -> bytes:
+            if string not in encoded_strings:
+                encoded_strings[string] = _encode_json_string(string)
+            return encoded_strings[string]
+
+        level_fragments = [
+            b'"annotation_level":' + _encode_json_string(level.value)
+            for level in _ANNOTATION_LEVELS
+        ]
+        position_fragments = [f'"{field}":'.encode() for field in _POSITION_FIELDS]
+        for idx in range(len(self)):
+            parts = [
+                b'{"path":' + encode(self._paths[idx]),
+                # messages mostly differ, so they're not worth remembering
+                b'"message":' + _encode_json_string(self._messages[idx]),
+                level_fragments[self._levels[idx]],
+            ]
+            parts += (
+                position_fragment + str(position).encode()
+                for position_fragment, position in zip(
+                    position_fragments,
+                    self._positions[4 * idx : 4 * idx + 4],
+                    strict=True,
+                )
+                if position != _UNSET
+            )
+            if (title := self._titles[idx]) is not None:
+                parts.append(b'"title":' + encode(title))
+            if (raw_details := self._raw_details[idx]) is not None:
+                parts.append(b'"raw_details":' + encode(raw_details))
+            yield b",".join(parts) + b"}"
+
+    def __len__(self) -> int:  # noqa: D105
+        return len(self._levels)
+
+    @overload
+    def __getitem__(self, idx: int) -> CheckAnnotation: ...
+
+    @overload
+    def __getitem__(self, idx: slice) -> list[CheckAnnotation]: ...
+
+    def __getitem__(
+        self,
+        idx: int | slice,
+    ) -> CheckAnnotation | list[CheckAnnotation]:
+        """Materialize the annotation(s) at the given index or slice."""
+        if isinstance(idx, slice):
+            return [self._annotation(i) for i in range(len(self))[idx]]
+        return self._annotation(range(len(self))[idx])
+
+    def __iter__(self) -> Iterator[CheckAnnotation]:
+        """Materialize the annotations one by one."""
+        for idx in range(len(self)):
+            yield self._annotation(idx)
+
+    def __eq__(self, other: object) -> bool:
+        """Compare the annotations with those of another sequence, e.g. a list."""
+        if not isinstance(other, Sequence) or isinstance(other, str | bytes):
+            return NotImplemented
+        return len(self) == len(other) and all(
+            annotation == other_annotation
+            for annotation, other_annotation in zip(self, other, strict=True)
+        )
+
+    __hash__ = None  # type: ignore[assignment]  # as it's mutable, like a list
+
+    def __repr__(self) -> str:  # noqa: D105
+        return f"{type(self).__name__}({list(self)!r})"
+
+    @classmethod
+    def __get_pydantic_core_schema__(
+        cls,
+        source_type: Any,  # noqa: ANN401
+        handler: GetCoreSchemaHandler,
+    ) -> core_schema.CoreSchema:
+        """Accept stores as is, serializing them like a list of their annotations."""
+        return core_schema.is_instance_schema(
+            cls,
+            serialization=core_schema.plain_serializer_function_ser_schema(
+                list,
+                return_schema=handler.generate_schema(list[CheckAnnotation]),
+            ),
+        )
+
+    def _dedupe(self, string: str) -> str:
+        return self._strings.setdefault(string, string)
+
+    def _dedupe_optional(self, string: str | None) -> str | None:
+        return None if string is None else self._strings.setdefault(string, string)
+
+    def _annotation(self, idx: int) -> CheckAnnotation:
+        fields: dict[str, Any] = {
+            field: position
+            for field, position in zip(
+                _POSITION_FIELDS,
+                self._positions[4 * idx : 4 * idx + 4],
+                strict=True,
+            )
+            if position != _UNSET
+        }
+        if (title := self._titles[idx]) is not None:
+            fields["title"] = title
+        if (raw_details := self._raw_details[idx]) is not None:
+            fields["raw_details"] = raw_details
+        return CheckAnnotation(
+            path=self._paths[idx],
+            message=self._messages[idx],
+            annotation_level=_ANNOTATION_LEVELS[self._levels[idx]],
+            **fields,
+        )
+
+
+def _encode_json_string(string: str) -> bytes:
+    """Encode a string to JSON like pydantic does, i.e. with non-ASCII kept as is."""
+    return json.dumps(string, ensure_ascii=False).encode()
+
+
 class CheckRunOutput(BaseModel):
     """The json format expected for the output of a Checks run.
 
@@ -86,7 +307,7 @@ class CheckRunOutput(BaseModel):
     title: str | None
     summary: str
     text: str | None = None
-    annotations: list[CheckAnnotation] | None = None
+    annotations: list[CheckAnnotation] | AnnotationStore | None = None
     images: list[ChecksImage] | None = None
 
 
@@ -0,0 +1,139 @@
+"""Follow a growing log while its check is still running, posting findings early.
+
+Used by the `watch` command, which hands each batch of new lines of the log to the
+running check run, instead of all findings only being posted once the check finished.
+Only depends on the standard library, such that watching through a `serve` daemon
+stays cheap, with the daemon parsing & posting the lines.
+"""
+
+import logging
+import os
+import signal
+import time
+from collections.abc import Callable
+from pathlib import Path
+from types import FrameType
+
+LOGGER = logging.getLogger(__name__)
+
+# GitHub accepts at most 50 annotations per request, no point in waiting for more
+_FLUSH_LINE_COUNT = 50
+
+
+def _writer_exited(writer_pid: int | None) -> bool:
+    """Check whether the process writing the log exited, if we know which one it is."""
+    if writer_pid is None:
+        return False
+    try:
+        os.kill(writer_pid, 0)
+    except ProcessLookupError:
+        return True
+    except PermissionError:
+        return False  # exists, but belongs to another user
+    return False
+
+
+class _LineBatcher:
+    """Splits the chunks read from the log into lines, passing them on in batches."""
+
+    def __init__(
+        self,
+        post_lines: Callable[[list[str]], None],
+        flush_interval: float,
+    ) -> None:
+        self._post_lines = post_lines
+        self._flush_interval = flush_interval
+        self._pending: list[str] = []
+        self._partial_line = ""
+        self._last_flush = time.monotonic()
+        self.lines_passed = 0
+
+    def add(self, chunk: str) -> None:
+        """Add newly read text, of which only complete lines are passed on."""
+        *complete_lines, self._partial_line = (self._partial_line + chunk).split("\n")
+        self._pending += complete_lines
+
+    def flush_if_due(self) -> None:
+        """Pass on the pending lines, if there's a full batch or it's been a while."""
+        if len(self._pending) >= _FLUSH_LINE_COUNT or (
+            self._pending
+            and time.monotonic() - self._last_flush >= self._flush_interval
+        ):
+            self.flush()
+
+    def flush(self, *, final: bool = False) -> None:
+        """Pass on the pending lines, incl. an unterminated last line if final."""
+        if final and self._partial_line:
+            self._pending.append(self._partial_line)
+            self._partial_line = ""
+        if self._pending:
+            self._post_lines(self._pending)
+            self.lines_passed += len(self._pending)
+            self._pending = []
+        self._last_flush = time.monotonic()
+
+
+def watch_log(  # noqa: PLR0913
+    log_fp: Path,
+    post_lines: Callable[[list[str]], None],
+    *,
+    flush_interval: float = 10,
+    poll_interval: float = 0.5,
+    writer_pid: int | None = None,
+    should_stop: Callable[[], bool] | None = None,
+) -> int:
+    """Follow the log as it grows, passing its new complete lines on in batches.
+
+    New lines are passed on once a full batch of annotations worth of lines arrived,
+    or once `flush_interval` seconds passed since the last batch, which rate limits
+    the updates of the check run. Watching stops once the writer process exits, or on
+    SIGTERM/SIGINT, after passing on all remaining lines (incl. an unterminated last
+    line). The log doesn't need to exist yet when watching starts.
+
+    :param log_fp: the log to follow, e.g. mypy's output as it runs
+    :param post_lines: called with each batch of new lines, without line endings
+    :param flush_interval: min. seconds between two partial batches, optional
+    :param poll_interval: seconds to wait for the log to grow, optional
+    :param writer_pid: process writing the log, stop once it exited, optional
+    :param should_stop: called once per poll, stop once it returns `True`, optional
+    :return: the number of lines passed on
+    """
+    stop_requested = False
+
+    def request_stop(_signum: int, _frame: FrameType | None) -> None:
+        nonlocal stop_requested
+        stop_requested = True
+
+    def stopped() -> bool:
+        return (
+            stop_requested
+            or _writer_exited(writer_pid)
+            or (should_stop is not None and should_stop())
+        )
+
+    previous_handlers = {
+        signum: signal.signal(signum, request_stop)
+        for signum in (signal.SIGTERM, signal.SIGINT)
+    }
+    batcher = _LineBatcher(post_lines, flush_interval)
+    try:
+        while not log_fp.exists():
+            if stopped():
+                return 0
+            time.sleep(poll_interval)
+
+        with log_fp.open("r", encoding="utf-8") as log_file:
+            while True:
+                # check before reading, such that the final read catches everything
+                stopping = stopped()
+                chunk = log_file.read()
+                batcher.add(chunk)
+                if stopping:
+                    batcher.flush(final=True)
+                    return batcher.lines_passed
+                batcher.flush_if_due()
+                if not chunk:
+                    time.sleep(poll_interval)
+    finally:
+        for signum, handler in previous_handlers.items():
+            signal.signal(signum, handler)
@@ -0,0 +1,98 @@
+# type: ignore  # noqa: PGH003
+# ruff: noqa: D103, INP001, T201
+"""Compare the peak RSS of holding & encoding annotations as models or in a store.
+
+Run with `python tests/benchmarks/bench_annotation_store.py [num_findings ...]`. Each
+variant runs in a fresh process, which builds the annotations of SARIF-like findings
+(700 files, 80 rules with a long description each, a distinct message per finding)
+and encodes them like `finish_check_run` does. The RSS of a process only importing
+the package is subtracted.
+"""
+
+import resource
+import subprocess
+import sys
+import time
+
+from github_checks.github_api import _CheckRunUpdateEncoder
+from github_checks.models import (
+    AnnotationLevel,
+    AnnotationStore,
+    CheckAnnotation,
+    CheckRunOutput,
+)
+
+RULE_DESCRIPTION = "Background for this rule per the tool's documentation: " * 10
+
+
+def _finding_fields(i: int) -> dict:
+    rule = f"E{i % 80:03d}"
+    return {
+        # built per finding, like the formatters do, rather than shared
+        "path": "/".join(("src", f"pkg_{i % 40}", f"module_{i % 700}.py")),
+        "message": f"Line {i % 900 + 1} is too long ({80 + i % 50} > 79)",
+        "annotation_level": AnnotationLevel.WARNING,
+        "start_line": i % 900 + 1,
+        "end_line": i % 900 + 1,
+        "start_column": 80,
+        "end_column": 80 + i % 50,
+        "title": f"[{rule}] line-too-long",
+        "raw_details": RULE_DESCRIPTION,
+    }
+
+
+def build_models(num_findings: int) -> list[CheckAnnotation]:
+    return [CheckAnnotation(**_finding_fields(i)) for i in range(num_findings)]
+
+
+def build_store(num_findings: int) -> AnnotationStore:
+    store = AnnotationStore()
+    for i in range(num_findings):
+        store.add(**_finding_fields(i))
+    return store
+
+
+def _child(variant: str, num_findings: int) -> None:
+    """Build & encode the annotations, then print the process' peak RSS in KiB."""
+    if variant != "baseline":
+        annotations = (build_models if variant == "models" else build_store)(
+            num_findings,
+        )
+        output = CheckRunOutput(title="t", summary="s", annotations=annotations)
+        _CheckRunUpdateEncoder("check", output).batches()
+    print(resource.getrusage(resource.RUSAGE_SELF).ru_maxrss)
+
+
+def _peak_rss_mib(variant: str, num_findings: int) -> tuple[float, float]:
+    start = time.perf_counter()
+    child = subprocess.run(  # noqa: S603
+        [sys.executable, __file__, "--child", variant, str(num_findings)],
+        capture_output=True,
+        check=True,
+        text=True,
+    )
+    return int(child.stdout) / 1024, time.perf_counter() - start
+
+
+def main(num_findings: list[int]) -> None:
+    baseline_mib = _peak_rss_mib("baseline", 0)[0]
+    print(f"baseline RSS of the imports: {baseline_mib:.1f} MiB")
+    print(f"{'findings':>9} {'variant':>8} {'peak MiB':>9} {'seconds':>8}")
+    for num in num_findings:
+        results = {
+            variant: _peak_rss_mib(variant, num) for variant in ("models", "store")
+        }
+        for variant, (peak_mib, seconds) in results.items():
+            peak_mib -= baseline_mib  # noqa: PLW2901
+            print(f"{num:>9} {variant:>8} {peak_mib:>9.1f} {seconds:>8.2f}")
+        saving = 1 - (results["store"][0] - baseline_mib) / (
+            results["models"][0] - baseline_mib
+        )
+        print(f"{'':>9} {'saving':>8} {saving:>9.0%}")
+
+
+if __name__ == "__main__":
+    if sys.argv[1:2] == ["--child"]:
+        _child(sys.argv[2], int(sys.argv[3]))
+    else:
+        main([int(arg) for arg in sys.argv[1:]] or [10_000, 100_000, 1_000_000])
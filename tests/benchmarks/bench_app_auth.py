@@ -0,0 +1,95 @@
+# type: ignore  # noqa: PGH003
+# ruff: noqa: D103, INP001, T201
+"""Compare app JWT generation & installation token minting, with & without reuse.
+
+Run with `python tests/benchmarks/bench_app_auth.py [num_installations]`. Token
+exchanges go to an in-process fake GitHub API, so the numbers are dominated by the
+client's key loading, signing & request overhead.
+"""
+
+import logging
+import sys
+import tempfile
+import time
+from collections.abc import Callable
+from pathlib import Path
+
+import jwt
+from requests import Session
+
+from github_checks.fake_github import running_fake_github, write_app_private_key
+from github_checks.github_api import (
+    RequestScheduler,
+    _authenticate_as_github_app,
+    _generate_app_jwt_from_pem,
+    mint_installation_tokens,
+)
+
+
+def uncached_app_jwt(pem_fp: Path) -> str:
+    """Read & parse the PEM, then sign a new JWT, as done before on every `auth()`."""
+    with pem_fp.open("rb") as pem_file:
+        priv_key = pem_file.read()
+    return str(
+        jwt.JWT().encode(
+            {"iat": int(time.time()), "exp": int(time.time()) + 570, "iss": "1"},
+            jwt.jwk_from_pem(priv_key),
+            alg="RS256",
+        ),
+    )
+
+
+def _per_second(fn: Callable[[], object], repetitions: int) -> float:
+    start = time.perf_counter()
+    for _ in range(repetitions):
+        fn()
+    return repetitions / (time.perf_counter() - start)
+
+
+def main(num_installations: int) -> None:
+    logging.disable(logging.INFO)
+    scheduler = RequestScheduler()  # paced only once GitHub pushes back
+    with tempfile.TemporaryDirectory() as key_dir, running_fake_github() as fake:
+        pem_fp = write_app_private_key(Path(key_dir) / "app.pem")
+        uncached = _per_second(lambda: uncached_app_jwt(pem_fp), 200)
+        cached = _per_second(
+            lambda: _generate_app_jwt_from_pem(pem_fp, "1", ttl_seconds=570),
+            200,
+        )
+        print("app JWTs per second")
+        print(f"  parse & sign each time: {uncached:10.0f}")
+        print(f"  reused until expiry   : {cached:10.0f}  ({cached / uncached:.0f}x)")
+
+        installation_ids = [str(i) for i in range(num_installations)]
+        session = Session()
+        logger = logging.getLogger(__name__)
+        start = time.perf_counter()
+        for installation_id in installation_ids:
+            _authenticate_as_github_app(
+                uncached_app_jwt(pem_fp),
+                installation_id,
+                session,
+                logger,
+                fake.base_url,
+                scheduler=scheduler,
+            )
+        sequential_s = time.perf_counter() - start
+        start = time.perf_counter()
+        mint_installation_tokens(
+            "1",
+            pem_fp,
+            installation_ids,
+            fake.base_url,
+            scheduler=scheduler,
+        )
+        bulk_s = time.perf_counter() - start
+        print(f"installation tokens for {num_installations} installations")
+        print(f"  one by one, signing each: {num_installations / sequential_s:8.0f}/s")
+        print(
+            f"  mint_installation_tokens: {num_installations / bulk_s:8.0f}/s  "
+            f"({sequential_s / bulk_s:.1f}x)",
+        )
+
+
+if __name__ == "__main__":
+    main(int(sys.argv[1]) if len(sys.argv) > 1 else 200)
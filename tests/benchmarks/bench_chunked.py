@@ -0,0 +1,78 @@
+# type: ignore  # noqa: PGH003
+# ruff: noqa: D103, INP001, T201
+"""Compare formatting a large output in a single pass with formatting it in chunks.
+
+Run with `python tests/benchmarks/bench_chunked.py [num_findings ...]`. Formats a
+mypy log (split at line offsets) and a ruff log (split into chunks of items) once in
+this process, and once in chunks in a pool of as many processes as there are CPUs,
+which only pays off given a few of them. Both produce the same output.
+"""
+
+import json
+import os
+import sys
+import tempfile
+import time
+from collections.abc import Callable
+from pathlib import Path
+
+from bench_ruff_formatter import REPO_BASE, _write_ruff_log
+
+from github_checks.formatters import chunked
+from github_checks.formatters.mypy import format_mypy_check_run_output
+from github_checks.formatters.ruff import format_ruff_check_run_output
+
+
+def _write_mypy_log(log_fp: Path, num_findings: int) -> None:
+    with log_fp.open("w", encoding="utf-8") as log_file:
+        log_file.writelines(
+            json.dumps(
+                {
+                    "file": f"{REPO_BASE}/src/pkg_{i % 40}/module_{i % 700}.py",
+                    "line": i % 900 + 1,
+                    "column": 4,
+                    "message": f"Incompatible types in assignment ({i})",
+                    "hint": None,
+                    "code": f"code-{i % 30}",
+                    "severity": "error",
+                },
+            )
+            + "\n"
+            for i in range(num_findings)
+        )
+
+
+def _seconds(fn: Callable[[], object]) -> float:
+    start = time.perf_counter()
+    fn()
+    return time.perf_counter() - start
+
+
+def main(num_findings: list[int]) -> None:
+    print(f"{os.cpu_count()} CPUs")
+    print(
+        f"{'findings':>9} {'format':>5} {'log MiB':>8} {'single':>8} {'chunked':>8} "
+        f"{'speedup':>8}",
+    )
+    formats = [
+        ("mypy", _write_mypy_log, format_mypy_check_run_output),
+        ("ruff", _write_ruff_log, format_ruff_check_run_output),
+    ]
+    with tempfile.TemporaryDirectory() as log_dir:
+        log_fp = Path(log_dir) / "output.json"
+        for num in num_findings:
+            for name, write_log, format_output in formats:
+                write_log(log_fp, num)
+                log_mib = log_fp.stat().st_size / 2**20
+                chunked.PARALLEL_MIN_BYTES = sys.maxsize
+                single = _seconds(lambda: format_output(log_fp, REPO_BASE))  # noqa: B023
+                chunked.PARALLEL_MIN_BYTES = 0
+                in_chunks = _seconds(lambda: format_output(log_fp, REPO_BASE))  # noqa: B023
+                print(
+                    f"{num:>9} {name:>5} {log_mib:>8.1f} {single:>8.2f} "
+                    f"{in_chunks:>8.2f} {single / in_chunks:>7.1f}x",
+                )
+
+
+if __name__ == "__main__":
+    main([int(arg) for arg in sys.argv[1:]] or [100_000, 500_000])
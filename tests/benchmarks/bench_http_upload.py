@@ -0,0 +1,134 @@
+# type: ignore  # noqa: PGH003
+# ruff: noqa: D103, INP001, T201, S603
+"""Drive `GitHubChecks` against the fake GitHub API, measuring whole check runs.
+
+Run with `python tests/benchmarks/bench_http_upload.py [--latency-seconds 0.05]
+[--workers 1 8] [num_annotations ...]`, e.g. to compare batching or concurrency
+changes offline. The fake runs in a separate process, such that the reported CPU
+time is the client's alone.
+"""
+
+import argparse
+import json
+import subprocess
+import sys
+import tempfile
+import time
+import urllib.request
+from pathlib import Path
+
+from github_checks.fake_github import write_app_private_key
+from github_checks.github_api import GitHubChecks
+from github_checks.models import (
+    AnnotationLevel,
+    CheckAnnotation,
+    CheckRunConclusion,
+    CheckRunOutput,
+)
+
+
+def _output(num_annotations: int) -> CheckRunOutput:
+    return CheckRunOutput(
+        title="bench",
+        summary="benchmark run",
+        annotations=[
+            CheckAnnotation(
+                path=f"src/module_{i % 300}.py",
+                start_line=i % 1000 + 1,
+                end_line=i % 1000 + 1,
+                annotation_level=AnnotationLevel.WARNING,
+                message=f"E{i % 50:03d} something is off here",
+                title=f"E{i % 50:03d}",
+            )
+            for i in range(num_annotations)
+        ],
+    )
+
+
+def _fake_stats(base_url: str) -> dict[str, int]:
+    with urllib.request.urlopen(f"{base_url}/_fake/stats") as response:  # noqa: S310
+        return json.load(response)
+
+
+def run(
+    base_url: str,
+    pem_fp: Path,
+    num_annotations: int,
+    max_workers: int,
+) -> dict[str, float]:
+    gh_checks = GitHubChecks(
+        repo_base_url="https://github.com/jdoe/myproject",
+        app_id="1",
+        app_installation_id="2",
+        app_privkey_pem=pem_fp,
+        github_api_base_url=base_url,
+    )
+    output = _output(num_annotations)
+    stats_before = _fake_stats(base_url)
+    wall_start, cpu_start = time.perf_counter(), time.process_time()
+    gh_checks.start_check_run("abc123", "bench")
+    gh_checks.finish_check_run(
+        CheckRunConclusion.SUCCESS,
+        output,
+        max_workers=max_workers,
+    )
+    wall_s = time.perf_counter() - wall_start
+    cpu_s = time.process_time() - cpu_start
+    stats_after = _fake_stats(base_url)
+    return {
+        "requests": stats_after["requests"] - stats_before["requests"],
+        "bytes": stats_after["bytes_received"] - stats_before["bytes_received"],
+        "wall_s": wall_s,
+        "cpu_s": cpu_s,
+    }
+
+
+def main() -> None:
+    argparser = argparse.ArgumentParser()
+    argparser.add_argument(
+        "num_annotations",
+        type=int,
+        nargs="*",
+        default=[1_000, 10_000, 100_000],
+    )
+    argparser.add_argument("--latency-seconds", type=float, default=0.02)
+    argparser.add_argument("--workers", type=int, nargs="+", default=[1, 8])
+    args = argparser.parse_args()
+
+    fake = subprocess.Popen(
+        [
+            sys.executable,
+            "-m",
+            "github_checks.fake_github",
+            "--latency-seconds",
+            str(args.latency_seconds),
+        ],
+        stdout=subprocess.PIPE,
+        text=True,
+    )
+    try:
+        base_url = fake.stdout.readline().strip()
+        with tempfile.TemporaryDirectory() as key_dir:
+            pem_fp = write_app_private_key(Path(key_dir) / "app.pem")
+            print(f"fake GitHub at {base_url}, {args.latency_seconds}s latency")
+            print(
+                f"{'annotations':>11} {'workers':>7} {'requests':>8} {'MiB sent':>8} "
+                f"{'wall s':>8} {'cpu s':>7} {'annot./s':>9}",
+            )
+            for num_annotations in args.num_annotations:
+                for max_workers in args.workers:
+                    result = run(base_url, pem_fp, num_annotations, max_workers)
+                    print(
+                        f"{num_annotations:>11} {max_workers:>7} "
+                        f"{result['requests']:>8} "
+                        f"{result['bytes'] / 2**20:>8.2f} "
+                        f"{result['wall_s']:>8.2f} {result['cpu_s']:>7.2f} "
+                        f"{num_annotations / result['wall_s']:>9.0f}",
+                    )
+    finally:
+        fake.terminate()
+        fake.wait()
+
+
+if __name__ == "__main__":
+    main()
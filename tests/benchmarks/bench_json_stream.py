@@ -0,0 +1,74 @@
+# type: ignore  # noqa: PGH003
+# ruff: noqa: D103, INP001, T201
+"""Compare loading a whole ruff log with streaming its findings one at a time.
+
+Run with `python tests/benchmarks/bench_json_stream.py [num_findings ...]`. Each
+variant validates every finding, but keeps none of them, so the peak memory shows
+what reading the log itself costs. Peak memory is measured via `tracemalloc`, which
+slows all variants down alike.
+"""
+
+import json
+import sys
+import tempfile
+import time
+import tracemalloc
+from collections.abc import Callable
+from pathlib import Path
+
+from bench_ruff_formatter import _write_ruff_log
+
+from github_checks.formatters import json_stream
+from github_checks.formatters.ruff import _RuffJSONError
+
+
+def load_whole_log(log_fp: Path) -> None:
+    with log_fp.open("r", encoding="utf-8") as json_file:
+        for ruff_err_json in json.load(json_file):
+            _RuffJSONError.model_validate(ruff_err_json)
+
+
+def stream_log(log_fp: Path) -> None:
+    with log_fp.open("rb") as json_file:
+        for ruff_err_json in json_stream.iter_json_items(json_file):
+            _RuffJSONError.model_validate(ruff_err_json)
+
+
+def _measure(fn: Callable[[], object]) -> tuple[float, float]:
+    """Wall time in seconds, and peak traced memory in MiB, of a separate run each."""
+    start = time.perf_counter()
+    fn()
+    seconds = time.perf_counter() - start
+    tracemalloc.start()
+    fn()
+    peak_bytes = tracemalloc.get_traced_memory()[1]
+    tracemalloc.stop()
+    return seconds, peak_bytes / 2**20
+
+
+def main(num_findings: list[int]) -> None:
+    ijson = json_stream.ijson
+    print(
+        f"{'findings':>9} {'log MiB':>8} {'variant':>16} "
+        f"{'seconds':>8} {'peak MiB':>9}",
+    )
+    with tempfile.TemporaryDirectory() as log_dir:
+        log_fp = Path(log_dir) / "ruff.json"
+        for num in num_findings:
+            _write_ruff_log(log_fp, num)
+            log_mib = log_fp.stat().st_size / 2**20
+            results = {"json.load": _measure(lambda: load_whole_log(log_fp))}
+            json_stream.ijson = None
+            results["stream, built-in"] = _measure(lambda: stream_log(log_fp))
+            json_stream.ijson = ijson
+            if ijson is not None:
+                results["stream, ijson"] = _measure(lambda: stream_log(log_fp))
+            for variant, (seconds, peak_mib) in results.items():
+                print(
+                    f"{num:>9} {log_mib:>8.1f} {variant:>16} {seconds:>8.2f} "
+                    f"{peak_mib:>9.1f}",
+                )
+
+
+if __name__ == "__main__":
+    main([int(arg) for arg in sys.argv[1:]] or [10_000, 100_000])
@@ -0,0 +1,99 @@
+# type: ignore  # noqa: PGH003
+# ruff: noqa: D103, INP001, T201, S101
+"""Compare encoding check run update bodies per batch vs. once upfront.
+
+Run with `python tests/benchmarks/bench_payload_serialization.py [num_annotations]`.
+"""
+
+import json
+import sys
+import time
+from collections.abc import Callable
+from typing import Any
+
+from github_checks.github_api import _annotation_batches, _CheckRunUpdateEncoder
+from github_checks.models import (
+    AnnotationLevel,
+    CheckAnnotation,
+    CheckRunConclusion,
+    CheckRunOutput,
+    CheckRunUpdatePOSTBody,
+)
+
+
+def _delete_keys_from_nested_dict(dictionary: dict[str, Any]) -> None:
+    for key in list(dictionary.keys()):
+        if dictionary[key] is None:
+            del dictionary[key]
+        elif type(dictionary[key]) is dict:
+            _delete_keys_from_nested_dict(dictionary[key])
+
+
+def legacy_bodies(output: CheckRunOutput) -> list[bytes]:
+    """Model -> JSON -> dict -> prune -> JSON again, once per batch."""
+    bodies: list[bytes] = []
+    annotations = output.annotations
+    for i in range(0, len(annotations), 50):
+        batch_output = output.model_copy(
+            update={"annotations": annotations[i : i + 50]},
+        )
+        conclusion = CheckRunConclusion.SUCCESS if i + 50 >= len(annotations) else None
+        payload = CheckRunUpdatePOSTBody(
+            name="bench",
+            output=batch_output,
+            conclusion=conclusion.value if conclusion else None,
+        )
+        body = json.loads(
+            payload.model_dump_json(exclude_unset=True, exclude_none=True),
+        )
+        _delete_keys_from_nested_dict(body)
+        bodies.append(json.dumps(body).encode())  # as done by requests' `json=`
+    return bodies
+
+
+def encoder_bodies(output: CheckRunOutput) -> list[bytes]:
+    encoder = _CheckRunUpdateEncoder("bench", output)
+    *batches, final_batch = _annotation_batches(encoder.encoded_annotations)
+    return [encoder.body(batch) for batch in batches] + [
+        encoder.body(final_batch, CheckRunConclusion.SUCCESS),
+    ]
+
+
+def _time(fn: Callable[[CheckRunOutput], list[bytes]], output: CheckRunOutput) -> float:
+    start = time.perf_counter()
+    fn(output)
+    return time.perf_counter() - start
+
+
+def main(num_annotations: int) -> None:
+    output = CheckRunOutput(
+        title="bench",
+        summary="benchmark run",
+        annotations=[
+            CheckAnnotation(
+                path=f"src/module_{i % 300}.py",
+                start_line=i % 1000 + 1,
+                end_line=i % 1000 + 1,
+                annotation_level=AnnotationLevel.WARNING,
+                message=f"E{i % 50:03d} something is off here",
+                title=f"E{i % 50:03d}",
+                raw_details="https://docs.example.com/rules" if i % 2 else None,
+            )
+            for i in range(num_annotations)
+        ],
+    )
+    legacy = [json.loads(body) for body in legacy_bodies(output)]
+    encoded = [json.loads(body) for body in encoder_bodies(output)]
+    legacy[-1].pop("completed_at", None)
+    encoded[-1].pop("completed_at", None)
+    assert legacy == encoded, "encoded bodies differ from the legacy serialization"
+
+    legacy_s = min(_time(legacy_bodies, output) for _ in range(3))
+    encoder_s = min(_time(encoder_bodies, output) for _ in range(3))
+    print(f"{num_annotations} annotations, {len(encoded)} request bodies")
+    print(f"  legacy : {legacy_s * 1000:8.1f} ms")
+    print(f"  encoder: {encoder_s * 1000:8.1f} ms  ({legacy_s / encoder_s:.1f}x)")
+
+
+if __name__ == "__main__":
+    main(int(sys.argv[1]) if len(sys.argv) > 1 else 20_000)
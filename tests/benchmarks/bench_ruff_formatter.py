@@ -0,0 +1,115 @@
+# type: ignore  # noqa: PGH003
+# ruff: noqa: D103, INP001, T201
+"""Compare the single-pass ruff formatter with loading & validating the log twice.
+
+Run with `python tests/benchmarks/bench_ruff_formatter.py [num_findings ...]`. Both
+variants produce the same annotations & rule set, the legacy one as the formatter
+did before: one `json.load` & validation pass for the rules, and another for the
+annotations. Peak memory is measured via `tracemalloc`, which slows both down alike.
+"""
+
+import json
+import sys
+import tempfile
+import time
+import tracemalloc
+from collections.abc import Callable
+from pathlib import Path
+
+from github_checks.formatters.paths import get_path_normalizer
+from github_checks.formatters.ruff import (
+    _add_ruff_error,
+    _RuffJSONError,
+    format_ruff_check_run_output,
+)
+from github_checks.models import AnnotationLevel, AnnotationStore
+
+REPO_BASE = Path("/repo")
+
+
+def _write_ruff_log(log_fp: Path, num_findings: int) -> None:
+    findings = [
+        {
+            "cell": None,
+            "code": f"E{i % 80:03d}",
+            "location": {"row": i % 900 + 1, "column": 5},
+            "end_location": {"row": i % 900 + 1, "column": 17},
+            "filename": f"{REPO_BASE}/src/pkg_{i % 40}/module_{i % 700}.py",
+            "fix": {
+                "applicability": "safe",
+                "edits": [
+                    {
+                        "content": "",
+                        "location": {"row": i % 900 + 1, "column": 5},
+                        "end_location": {"row": i % 900 + 1, "column": 17},
+                    },
+                ],
+                "message": "Remove unused import",
+            }
+            if i % 3 == 0
+            else None,
+            "message": f"`module_{i}` imported but unused",
+            "noqa_row": i % 900 + 1,
+            "url": f"https://docs.astral.sh/ruff/rules/E{i % 80:03d}",
+        }
+        for i in range(num_findings)
+    ]
+    log_fp.write_text(json.dumps(findings), encoding="utf-8")
+
+
+def legacy_format(log_fp: Path) -> tuple[AnnotationStore, set[str]]:
+    """Load & validate the whole log once for the rules, and again for annotations."""
+    with log_fp.open("r", encoding="utf-8") as json_file:
+        json_content = json.load(json_file)
+    issue_codes: set[str] = set()
+    for error_dict in json_content:
+        issue_codes.add(_RuffJSONError.model_validate(error_dict).code)
+
+    # the first load stayed alive while the annotations' generator loaded another
+    with log_fp.open("r", encoding="utf-8") as json_file:
+        json_content_again = json.load(json_file)
+    annotations = AnnotationStore()
+    for error_dict in json_content_again:
+        _add_ruff_error(
+            annotations,
+            _RuffJSONError.model_validate(error_dict),
+            get_path_normalizer(REPO_BASE),
+            AnnotationLevel.WARNING,
+        )
+    del json_content
+    return annotations, issue_codes
+
+
+def _measure(fn: Callable[[], object]) -> tuple[float, float]:
+    """Wall time in seconds, and peak traced memory in MiB, of a separate run each."""
+    start = time.perf_counter()
+    fn()
+    seconds = time.perf_counter() - start
+    tracemalloc.start()
+    fn()
+    peak_bytes = tracemalloc.get_traced_memory()[1]
+    tracemalloc.stop()
+    return seconds, peak_bytes / 2**20
+
+
+def main(num_findings: list[int]) -> None:
+    print(f"{'findings':>9} {'variant':>12} {'seconds':>8} {'peak MiB':>9}")
+    with tempfile.TemporaryDirectory() as log_dir:
+        log_fp = Path(log_dir) / "ruff.json"
+        for num in num_findings:
+            _write_ruff_log(log_fp, num)
+            legacy = _measure(lambda: legacy_format(log_fp))
+            single = _measure(lambda: format_ruff_check_run_output(log_fp, REPO_BASE))
+            for variant, (seconds, peak_mib) in (
+                ("two passes", legacy),
+                ("single pass", single),
+            ):
+                print(f"{num:>9} {variant:>12} {seconds:>8.2f} {peak_mib:>9.1f}")
+            print(
+                f"{'':>9} {'saving':>12} {1 - single[0] / legacy[0]:>8.0%} "
+                f"{1 - single[1] / legacy[1]:>9.0%}",
+            )
+
+
+if __name__ == "__main__":
+    main([int(arg) for arg in sys.argv[1:]] or [10_000, 100_000])
@@ -0,0 +1,148 @@
+# type: ignore  # noqa: PGH003
+# ruff: noqa: D103, INP001, T201
+"""Compare validating findings one by one with validating them in batches.
+
+Run with `python tests/benchmarks/bench_validation.py [num_findings]`. Prints the
+time per finding of each formatter's record model, validated via `model_validate`
+per finding as the formatters did before (with ruff's filename validated as a
+`Path`), and in batches as they do now. For the formatters' annotations, the
+validating constructor is compared with `model_construct`, which skips validation.
+"""
+
+import json
+import sys
+import time
+from collections.abc import Callable
+from pathlib import Path
+from typing import Any
+
+from github_checks.formatters.mypy import _MyPyJSONError
+from github_checks.formatters.pyright import PyrightDiagnostic
+from github_checks.formatters.ruff import _RuffJSONError
+from github_checks.formatters.utils import (
+    validate_in_batches,
+    validate_json_lines_in_batches,
+)
+from github_checks.models import AnnotationLevel, CheckAnnotation
+
+
+class _LegacyRuffJSONError(_RuffJSONError):
+    filename: Path
+
+
+def _ruff_finding(i: int) -> dict[str, Any]:
+    return {
+        "cell": None,
+        "code": f"E{i % 80:03d}",
+        "location": {"row": i % 900 + 1, "column": 5},
+        "end_location": {"row": i % 900 + 1, "column": 17},
+        "filename": f"/repo/src/module_{i % 700}.py",
+        "fix": None,
+        "message": f"`module_{i}` imported but unused",
+        "noqa_row": i % 900 + 1,
+        "url": f"https://docs.astral.sh/ruff/rules/E{i % 80:03d}",
+    }
+
+
+def _mypy_finding(i: int) -> dict[str, Any]:
+    return {
+        "file": f"src/module_{i % 700}.py",
+        "line": i % 900 + 1,
+        "column": 4,
+        "message": "Incompatible types in assignment",
+        "hint": None,
+        "code": "assignment",
+        "severity": "error",
+    }
+
+
+def _pyright_finding(i: int) -> dict[str, Any]:
+    return {
+        "file": f"/repo/src/module_{i % 700}.py",
+        "severity": "error",
+        "message": "Argument of type is not assignable",
+        "range": {
+            "start": {"line": i % 900, "character": 4},
+            "end": {"line": i % 900, "character": 12},
+        },
+        "rule": "reportArgumentType",
+    }
+
+
+def _us_per_finding(fn: Callable[[], object], num_findings: int) -> float:
+    """Time the best of a few runs, in microseconds per finding."""
+    best = float("inf")
+    for _ in range(3):
+        start = time.perf_counter()
+        fn()
+        best = min(best, time.perf_counter() - start)
+    return best / num_findings * 1e6
+
+
+def _compare(name: str, baseline: float, variant: float) -> None:
+    saving = 1 - variant / baseline
+    print(f"{name:<26} {baseline:>10.2f} {variant:>10.2f} {saving:>7.0%}")
+
+
+def main(num_findings: int) -> None:
+    print(f"{num_findings} findings, microseconds per finding")
+    print(f"{'':<26} {'one by one':>10} {'batched':>10} {'saving':>7}")
+    records = [
+        ("ruff", _LegacyRuffJSONError, _RuffJSONError, _ruff_finding),
+        ("pyright", PyrightDiagnostic, PyrightDiagnostic, _pyright_finding),
+    ]
+    for name, legacy_model, model, make_finding in records:
+        items = [make_finding(i) for i in range(num_findings)]
+        _compare(
+            name,
+            _us_per_finding(
+                lambda: [legacy_model.model_validate(item) for item in items],  # noqa: B023
+                num_findings,
+            ),
+            _us_per_finding(
+                lambda: list(validate_in_batches(model, items)),  # noqa: B023
+                num_findings,
+            ),
+        )
+
+    lines = [json.dumps(_mypy_finding(i)) + "\n" for i in range(num_findings)]
+    _compare(
+        "mypy (JSON lines)",
+        _us_per_finding(
+            lambda: [_MyPyJSONError.model_validate_json(line) for line in lines],
+            num_findings,
+        ),
+        _us_per_finding(
+            lambda: list(validate_json_lines_in_batches(_MyPyJSONError, lines)),
+            num_findings,
+        ),
+    )
+
+    fields = {
+        "path": "src/module.py",
+        "message": "`module` imported but unused",
+        "annotation_level": AnnotationLevel.WARNING,
+        "start_line": 1,
+        "end_line": 1,
+        "start_column": 5,
+        "end_column": 17,
+        "title": "[F401] unused-import",
+    }
+    print(f"{'':<26} {'validated':>10} {'construct':>10} {'saving':>7}")
+    _compare(
+        "CheckAnnotation",
+        _us_per_finding(
+            lambda: [CheckAnnotation(**fields) for _ in range(num_findings)],
+            num_findings,
+        ),
+        _us_per_finding(
+            lambda: [
+                CheckAnnotation.model_construct(**fields) for _ in range(num_findings)
+            ],
+            num_findings,
+        ),
+    )
+
+
+if __name__ == "__main__":
+    main(int(sys.argv[1]) if len(sys.argv) > 1 else 100_000)
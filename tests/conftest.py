@@ -0,0 +1,48 @@
+# type: ignore  # noqa: PGH003
+# ruff: noqa: D103, D100, INP001
+from collections.abc import Callable, Iterator
+from pathlib import Path
+
+import pytest
+
+from github_checks.fake_github import (
+    FakeGitHubServer,
+    running_fake_github,
+    write_app_private_key,
+)
+from github_checks.models import AnnotationLevel, CheckAnnotation, CheckRunOutput
+
+
+@pytest.fixture(scope="session")
+def app_privkey_pem(tmp_path_factory: pytest.TempPathFactory) -> Path:
+    return write_app_private_key(tmp_path_factory.mktemp("keys") / "app.pem")
+
+
+@pytest.fixture(scope="session")
+def output_with_annotations() -> Callable[..., CheckRunOutput]:
+    def make_output(
+        num_annotations: int,
+        annotation_level: AnnotationLevel = AnnotationLevel.WARNING,
+    ) -> CheckRunOutput:
+        return CheckRunOutput(
+            title="title",
+            summary="summary",
+            annotations=[
+                CheckAnnotation(
+                    path=f"file{i}.py",
+                    start_line=i + 1,
+                    end_line=i + 1,
+                    annotation_level=annotation_level,
+                    message=f"{annotation_level.capitalize()} message",
+                )
+                for i in range(num_annotations)
+            ],
+        )
+
+    return make_output
+
+
+@pytest.fixture
+def fake_github() -> Iterator[FakeGitHubServer]:
+    with running_fake_github() as server:
+        yield server
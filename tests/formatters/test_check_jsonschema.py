@@ -4,7 +4,13 @@ import json
 import tempfile
 from pathlib import Path
 
-from github_checks.formatters.check_jsonschema import format_jsonschema_check_run_output
+import pytest
+
+from github_checks.formatters import check_jsonschema, chunked
+from github_checks.formatters.check_jsonschema import (
+    format_jsonschema_check_run_output,
+    get_err_loc,
+)
 from github_checks.models import AnnotationLevel, CheckRunConclusion, CheckRunOutput
 
 # ruff: noqa: S101, D103, SIM115, INP001
@@ -67,3 +73,162 @@ def test_format_check_jsonschema_check_run_output_with_issues() -> None:
         (a.start_line, a.end_line, a.start_column, a.end_column)
         for a in output.annotations
     } == {(1, 1, 1, 1), (4, 4, 4, 19), (6, 6, 4, 18)}
+
+
+NESTED_INSTANCE = """{
+  "name": "top",
+  "owner": {"name": "nested", "tags": ["a", "b"]},
+  "items": [
+    {"name": "first"},
+    {
+      "name": "second",
+      "sizes": [1, 2.5e3, {"name": "deep \\"quoted\\" name"}]
+    }
+  ]
+}
+"""
+
+NESTED_INSTANCE_YAML = """name: top
+owner:
+  name: nested
+  tags: [a, b]
+items:
+  - name: first
+  - "name": second
+    sizes:
+      - 1
+      - 2.5e3
+      - name: deep
+"""
+
+
+@pytest.mark.parametrize(
+    ("suffix", "instance", "expected_locations"),
+    [
+        (
+            ".json",
+            NESTED_INSTANCE,
+            [
+                (0, 0, 0),
+                (1, 3, 16),
+                (2, 13, 50),
+                (2, 44, 50),
+                (4, 6, 22),
+                (6, 7, 23),
+                (7, 19, 59),
+                (7, 28, 59),
+            ],
+        ),
+        (
+            ".yaml",
+            NESTED_INSTANCE_YAML,
+            [
+                (0, 0, 0),
+                (0, 0, 9),
+                (2, 2, 14),
+                (3, 12, 14),
+                (5, 4, 15),
+                (6, 5, 18),  # just after the opening quote of the key
+                (9, 8, 13),
+                (10, 8, 18),
+            ],
+        ),
+    ],
+)
+def test_get_err_loc_by_json_path(
+    tmp_path: Path,
+    suffix: str,
+    instance: str,
+    expected_locations: list[tuple[int, int, int]],
+) -> None:
+    if suffix == ".yaml" and check_jsonschema.yaml is None:
+        pytest.skip("PyYAML is not installed")
+    instance_fp = tmp_path / f"instance{suffix}"
+    instance_fp.write_text(instance, encoding="utf-8")
+    paths = [
+        "$",
+        "$.name",
+        "$.owner.name",
+        "$.owner.tags[1]",
+        "@.items[0].name",
+        "$.items[1].name",
+        "$.items[1].sizes[1]",
+        "$.items[1].sizes[2].name",
+    ]
+
+    assert [get_err_loc(instance_fp, path) for path in paths] == expected_locations
+
+
+def test_get_err_loc_of_unparsable_file(tmp_path: Path) -> None:
+    instance_fp = tmp_path / "instance.json"
+    instance_fp.write_text('{\n  "owner": {\n    "name": "nested",\n', encoding="utf-8")
+
+    # falls back to looking for the path's keys in the text
+    assert get_err_loc(instance_fp, "$.owner.name") == (2, 5, 21)
+
+
+def test_get_err_loc_after_file_changed(tmp_path: Path) -> None:
+    instance_fp = tmp_path / "instance.json"
+    instance_fp.write_text('{"name": "top"}', encoding="utf-8")
+    assert get_err_loc(instance_fp, "$.name") == (0, 2, 15)
+
+    instance_fp.write_text('{\n  "other": 1,\n  "name": "top"\n}', encoding="utf-8")
+    assert get_err_loc(instance_fp, "$.name") == (2, 3, 15)
+
+
+def test_format_check_jsonschema_locates_files_in_parallel(
+    tmp_path: Path,
+    monkeypatch: pytest.MonkeyPatch,
+) -> None:
+    monkeypatch.setattr(check_jsonschema, "PARALLEL_MIN_BYTES", 0)
+    monkeypatch.setattr(chunked.os, "cpu_count", lambda: 2)
+    errors = []
+    for i in range(3):
+        instance_fp = tmp_path / f"instance_{i}.json"
+        instance_fp.write_text(NESTED_INSTANCE, encoding="utf-8")
+        errors.extend(
+            {
+                "filename": str(instance_fp),
+                "path": path,
+                "message": "Invalid",
+                "has_sub_errors": False,
+            }
+            for path in ("$.items[1].name", "$.owner.tags[1]")
+        )
+    output_fp = tmp_path / "check_jsonschema.json"
+    output_fp.write_text(json.dumps({"status": "fail", "errors": errors}))
+
+    output, _ = format_jsonschema_check_run_output(output_fp, tmp_path)
+
+    assert [(a.path, a.start_line, a.start_column) for a in output.annotations] == [
+        (Path(error["filename"]).name, line, column)
+        for error, (line, column) in zip(errors, [(7, 8), (3, 45)] * 3, strict=True)
+    ]
+
+
+def test_format_check_jsonschema_outside_of_repo(tmp_path: Path) -> None:
+    instance_fp = tmp_path / "elsewhere" / "instance.json"
+    instance_fp.parent.mkdir()
+    instance_fp.write_text(NESTED_INSTANCE, encoding="utf-8")
+    output_fp = tmp_path / "check_jsonschema.json"
+    output_fp.write_text(
+        json.dumps(
+            {
+                "status": "fail",
+                "errors": [
+                    {
+                        "filename": str(instance_fp),
+                        "path": "$.name",
+                        "message": "Invalid",
+                        "has_sub_errors": False,
+                    },
+                ],
+            },
+        ),
+    )
+
+    output, _ = format_jsonschema_check_run_output(output_fp, tmp_path / "repo")
+
+    assert [(a.path, a.start_line) for a in output.annotations] == [
+        (str(instance_fp), 2),
+    ]
@@ -0,0 +1,159 @@
+"""Tests for formatting large tool outputs in chunks, in a pool of processes."""
+
+import json
+from pathlib import Path
+
+import pytest
+
+from github_checks.formatters import chunked
+from github_checks.formatters.chunked import (
+    item_chunks,
+    line_chunks,
+    map_chunks,
+    mark_pool_worker,
+    parallel_workers,
+    read_lines,
+)
+from github_checks.formatters.mypy import format_mypy_check_run_output
+from github_checks.formatters.pyright import format_pyright_check_run_output
+from github_checks.formatters.ruff import format_ruff_check_run_output
+
+# ruff: noqa: S101, D103, INP001
+
+NUM_FINDINGS = 57
+
+
+def _write_mypy_log(log_fp: Path, repo_base: Path) -> None:
+    log_fp.write_text(
+        "".join(
+            json.dumps(
+                {
+                    "file": str(repo_base / f"module_{i % 7}.py"),
+                    "line": i + 1,
+                    "column": 4,
+                    "message": f"Issue ü {i}",
+                    "hint": None,
+                    "code": f"code-{i % 5}",
+                    "severity": "note" if i % 3 else "error",
+                },
+            )
+            + "\n"
+            for i in range(NUM_FINDINGS)
+        ),
+        encoding="utf-8",
+    )
+
+
+def _write_ruff_log(log_fp: Path, repo_base: Path) -> None:
+    ruff_output = [
+        {
+            "cell": None,
+            "code": f"E{i % 11:03d}",
+            "location": {"row": i + 1, "column": 1},
+            "end_location": {"row": i + 1, "column": 9},
+            "filename": str(repo_base / f"module_{i % 7}.py"),
+            "fix": None,
+            "message": f"Issue ü {i}",
+            "noqa_row": i + 1,
+            "url": f"https://docs.astral.sh/ruff/rules/E{i % 11:03d}/",
+        }
+        for i in range(NUM_FINDINGS)
+    ]
+    log_fp.write_text(json.dumps(ruff_output, indent=2), encoding="utf-8")
+
+
+def _write_pyright_log(log_fp: Path, repo_base: Path) -> None:
+    pyright_output = {
+        "version": "1.1.407",
+        "generalDiagnostics": [
+            {
+                "file": str(repo_base / f"module_{i % 7}.py"),
+                "severity": "warning" if i % 3 else "error",
+                "message": f"Issue ü {i}",
+                "range": {
+                    "start": {"line": i, "character": 5},
+                    "end": {"line": i, "character": 19},
+                },
+                **({"rule": f"reportRule{i % 4}"} if i % 6 else {}),
+            }
+            for i in range(NUM_FINDINGS)
+        ],
+        "summary": {
+            "filesAnalyzed": 7,
+            "errorCount": 19,
+            "warningCount": 38,
+            "informationCount": 0,
+            "timeInSec": 0.379,
+        },
+    }
+    log_fp.write_text(json.dumps(pyright_output), encoding="utf-8")
+
+
+def test_line_chunks(tmp_path: Path) -> None:
+    log_fp = tmp_path / "mypy.json"
+    lines = [f"line {i}" + "x" * (i % 5) for i in range(20)]
+    log_fp.write_text("\n".join(lines) + "\n", encoding="utf-8")
+
+    ranges = list(line_chunks(log_fp, chunk_bytes=17))
+
+    assert len(ranges) > 1
+    assert [start for start, _ in ranges[1:]] == [end for _, end in ranges[:-1]]
+    assert ranges[-1][1] == log_fp.stat().st_size
+    chunk_lines = [read_lines(log_fp, *line_range) for line_range in ranges]
+    # each range ends with a line break, such that the last line read is empty
+    assert all(chunk[-1] == "" for chunk in chunk_lines)
+    assert [line for chunk in chunk_lines for line in chunk[:-1]] == lines
+
+
+def test_item_chunks() -> None:
+    assert list(item_chunks(range(7), chunk_size=3)) == [[0, 1, 2], [3, 4, 5], [6]]
+    assert list(item_chunks([], chunk_size=3)) == []
+
+
+def test_map_chunks_keeps_order() -> None:
+    chunks = [[i] * (i % 4) for i in range(30)]
+    assert list(map_chunks(sum, chunks, max_workers=2)) == [sum(c) for c in chunks]
+
+
+@pytest.mark.parametrize(
+    ("write_log", "format_output"),
+    [
+        (_write_mypy_log, format_mypy_check_run_output),
+        (_write_ruff_log, format_ruff_check_run_output),
+        (_write_pyright_log, format_pyright_check_run_output),
+    ],
+)
+def test_parallel_chunks_match_single_pass(
+    tmp_path: Path,
+    monkeypatch: pytest.MonkeyPatch,
+    write_log,  # noqa: ANN001
+    format_output,  # noqa: ANN001
+) -> None:
+    log_fp = tmp_path / "output.json"
+    write_log(log_fp, tmp_path)
+    single_pass = format_output(log_fp, tmp_path, ["module_3.py"])
+
+    monkeypatch.setattr(chunked, "PARALLEL_MIN_BYTES", 0)
+    monkeypatch.setattr(chunked, "BYTES_PER_CHUNK", 500)
+    monkeypatch.setattr(chunked, "ITEMS_PER_CHUNK", 5)
+    monkeypatch.setattr(chunked.os, "cpu_count", lambda: 2)
+    in_chunks = format_output(log_fp, tmp_path, ["module_3.py"])
+
+    assert len(single_pass[0].annotations) == NUM_FINDINGS
+    assert in_chunks == single_pass
+
+
+def test_parallel_workers_not_in_a_pool_worker(
+    tmp_path: Path,
+    monkeypatch: pytest.MonkeyPatch,
+) -> None:
+    log_fp = tmp_path / "output.json"
+    log_fp.write_text("[]")
+    monkeypatch.setattr(chunked, "PARALLEL_MIN_BYTES", 0)
+    monkeypatch.setattr(chunked.os, "cpu_count", lambda: 2)
+    monkeypatch.setattr(chunked, "_in_pool_worker", False)
+    assert parallel_workers(log_fp) == 2  # noqa: PLR2004
+
+    mark_pool_worker()
+
+    assert parallel_workers(log_fp) == 0
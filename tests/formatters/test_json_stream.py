@@ -0,0 +1,100 @@
+"""Tests for the incremental JSON reader used by the formatters."""
+
+import io
+import json
+
+import pytest
+
+from github_checks.formatters import json_stream
+from github_checks.formatters.json_stream import (
+    ANY_ITEM,
+    JSONValue,
+    iter_json_items,
+    iter_json_values,
+)
+
+# ruff: noqa: S101, D103, INP001
+
+SARIF_LIKE = {
+    "version": "2.1.0",
+    "runs": [
+        {
+            "tool": {"driver": {"name": "ruff", "rules": [{"id": "E501"}]}},
+            "results": [
+                {"ruleId": "E501", "message": {"text": "Line too long (ü)"}},
+                {"ruleId": "E501", "locations": [], "level": 1.5},
+            ],
+        },
+        {"tool": {"driver": {"name": "mypy"}}, "results": []},
+        {
+            "results": [{"ruleId": "misc", "nested": [[1, 2], {"a": None}]}],
+            "tool": {"driver": {"name": "pyright"}},
+        },
+    ],
+}
+TOOL_PATH = ("runs", ANY_ITEM, "tool")
+RESULTS_PATH = ("runs", ANY_ITEM, "results", ANY_ITEM)
+
+
+@pytest.fixture(params=["builtin", "ijson"])
+def backend(request: pytest.FixtureRequest, monkeypatch: pytest.MonkeyPatch) -> str:
+    """Run the test with each backend, splitting the document into tiny chunks."""
+    if request.param == "builtin":
+        monkeypatch.setattr(json_stream, "ijson", None)
+    elif json_stream.ijson is None:
+        pytest.skip("ijson is not installed")
+    monkeypatch.setattr(json_stream, "_CHUNK_SIZE", 7)
+    return request.param
+
+
+def _stream(document: str) -> io.BytesIO:
+    return io.BytesIO(document.encode("utf-8"))
+
+
+@pytest.mark.usefixtures("backend")
+def test_iter_json_values_of_nested_arrays() -> None:
+    json_values = list(
+        iter_json_values(_stream(json.dumps(SARIF_LIKE)), TOOL_PATH, RESULTS_PATH),
+    )
+
+    runs = SARIF_LIKE["runs"]
+    assert json_values == [
+        JSONValue(TOOL_PATH, (0,), runs[0]["tool"]),
+        JSONValue(RESULTS_PATH, (0, 0), runs[0]["results"][0]),
+        JSONValue(RESULTS_PATH, (0, 1), runs[0]["results"][1]),
+        JSONValue(TOOL_PATH, (1,), runs[1]["tool"]),
+        JSONValue(RESULTS_PATH, (2, 0), runs[2]["results"][0]),
+        JSONValue(TOOL_PATH, (2,), runs[2]["tool"]),
+    ]
+
+
+@pytest.mark.usefixtures("backend")
+def test_iter_json_items_of_top_level_array() -> None:
+    items = [{"code": "D100", "row": 12345678901}, "text", 0.5, None, [True]]
+
+    assert list(iter_json_items(_stream(json.dumps(items, indent=4)))) == items
+
+
+@pytest.mark.usefixtures("backend")
+def test_iter_json_items_of_key() -> None:
+    document = '{"status": "fail", "errors": [{"path": "$.a"}, {"path": "$.b"}]}'
+
+    assert list(iter_json_items(_stream(document), "errors")) == [
+        {"path": "$.a"},
+        {"path": "$.b"},
+    ]
+
+
+@pytest.mark.usefixtures("backend")
+@pytest.mark.parametrize(
+    "document",
+    ["", "  \n", "[]", "{}", '{"errors": null}', '{"errors": {}}', '[{"errors": []}]'],
+)
+def test_iter_json_items_without_matches(document: str) -> None:
+    assert list(iter_json_items(_stream(document), "errors")) == []
+
+
+@pytest.mark.usefixtures("backend")
+def test_iter_json_items_of_invalid_document() -> None:
+    with pytest.raises(ValueError):  # noqa: PT011
+        list(iter_json_items(_stream('[{"code": "D100"}, {"code": ')))
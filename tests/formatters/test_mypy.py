@@ -4,7 +4,10 @@ import json
 import tempfile
 from pathlib import Path
 
-from github_checks.formatters.mypy import format_mypy_check_run_output
+from github_checks.formatters.mypy import (
+    format_mypy_check_run_output,
+    parse_mypy_json_line,
+)
 from github_checks.models import AnnotationLevel, CheckRunConclusion, CheckRunOutput
 
 # ruff: noqa: S101, D103, SIM115, INP001
@@ -75,3 +78,37 @@ def test_format_mypy_check_run_output_no_issues() -> None:
     assert "Mypy found no issues" in output.title
     assert output.summary == "Nice work!"
     assert output.annotations == []
+
+
+def test_parse_mypy_json_line_matches_formatter() -> None:
+    sample_output_fp = Path(tempfile.NamedTemporaryFile(delete=False).name)
+    sample_mypy_output(Path(__file__).parent, sample_output_fp)
+    output, _ = format_mypy_check_run_output(sample_output_fp, Path(__file__).parent)
+    lines = sample_output_fp.read_text(encoding="utf-8").splitlines()
+    assert [
+        parse_mypy_json_line(line, Path(__file__).parent) for line in lines
+    ] == output.annotations
+    assert parse_mypy_json_line("\n") is None
+
+
+def test_format_mypy_check_run_output_outside_of_repo(tmp_path: Path) -> None:
+    log_fp = tmp_path / "mypy.json"
+    log_fp.write_text(
+        json.dumps(
+            {
+                "file": "/usr/lib/python3/foo.py",
+                "line": 3,
+                "column": 0,
+                "message": "Missing return statement",
+                "hint": None,
+                "code": "return",
+                "severity": "error",
+            },
+        )
+        + "\n",
+    )
+
+    output, _ = format_mypy_check_run_output(log_fp, tmp_path / "repo")
+
+    assert output.title == "Mypy found 1 distinct issues."
+    assert [a.path for a in output.annotations] == ["/usr/lib/python3/foo.py"]
@@ -0,0 +1,94 @@
+"""Tests for the normalization of the files of findings to repository paths."""
+
+from pathlib import Path
+
+import pytest
+
+from github_checks.formatters.paths import PathNormalizer, join_uri
+
+# ruff: noqa: S101, D103, INP001
+
+
+@pytest.fixture
+def repo_base(tmp_path: Path) -> Path:
+    (tmp_path / "checkout" / "src").mkdir(parents=True)
+    # a symlink to the checkout, like tools may be run via
+    (tmp_path / "link").symlink_to(tmp_path / "checkout")
+    return tmp_path / "checkout"
+
+
+@pytest.mark.parametrize(
+    ("path", "expected"),
+    [
+        ("{base}/src/module.py", "src/module.py"),
+        ("{base}/src/../src/./module.py", "src/module.py"),
+        ("{link}/src/module.py", "src/module.py"),
+        ("src/module.py", "src/module.py"),
+        ("./src/module 1%.py", "src/module 1%.py"),
+    ],
+)
+def test_relative_path(repo_base: Path, path: str, expected: str) -> None:
+    normalizer = PathNormalizer(repo_base)
+    link = repo_base.parent / "link"
+
+    assert normalizer.relative_path(path.format(base=repo_base, link=link)) == expected
+
+
+@pytest.mark.parametrize(
+    ("uri", "base_uri", "expected"),
+    [
+        ("file://{base}/src/module%201.py", None, "src/module 1.py"),
+        ("file://localhost{link}/src/module.py", None, "src/module.py"),
+        ("src/module%201.py", None, "src/module 1.py"),
+        ("module.py", "file://{base}/src", "src/module.py"),
+        ("module.py", "file://{base}/src/", "src/module.py"),
+        ("file://{base}/module.py", "file:///elsewhere/", "module.py"),
+    ],
+)
+def test_relative_uri(
+    repo_base: Path,
+    uri: str,
+    base_uri: str | None,
+    expected: str,
+) -> None:
+    normalizer = PathNormalizer(repo_base)
+    fields = {"base": repo_base, "link": repo_base.parent / "link"}
+
+    assert (
+        normalizer.relative_uri(
+            uri.format(**fields),
+            base_uri.format(**fields) if base_uri else None,
+        )
+        == expected
+    )
+
+
+@pytest.mark.parametrize(
+    ("path", "expected"),
+    [
+        ("/elsewhere/./module.py", "/elsewhere/module.py"),
+        ("../module.py", "../module.py"),
+    ],
+)
+def test_relative_path_outside_of_repo(
+    repo_base: Path,
+    path: str,
+    expected: str,
+) -> None:
+    # kept as reported, rather than failing the whole log
+    assert PathNormalizer(repo_base).relative_path(path) == expected
+    assert PathNormalizer(repo_base).relative_uri(path) == expected
+
+
+def test_relative_path_is_cached(repo_base: Path) -> None:
+    normalizer = PathNormalizer(repo_base)
+    path = f"{repo_base}/src/module.py"
+
+    assert normalizer.relative_path(path) is normalizer.relative_path(path)
+    assert normalizer.relative_uri("src/module.py") == "src/module.py"
+
+
+def test_join_uri() -> None:
+    assert join_uri("file:///repo", "src/a.py") == "file:///repo/src/a.py"
+    assert join_uri("file:///repo/", "file:///other/a.py") == "file:///other/a.py"
+    assert join_uri("", "src/a.py") == "src/a.py"
@@ -105,3 +105,16 @@ def test_format_ruff_check_run_output_no_issues() -> None:
     assert "no issues" in output.title.lower()
     assert output.summary == "Nice work!"
     assert output.annotations == []
+
+
+def test_format_ruff_check_run_output_lists_each_rule_once() -> None:
+    sample_output_fp = Path(tempfile.NamedTemporaryFile(delete=False).name)
+
+    with sample_output_fp.open("w", encoding="utf-8") as f:
+        json.dump([RUFF_OUTPUT[1], *RUFF_OUTPUT, RUFF_OUTPUT[1]], f)
+
+    output, _ = format_ruff_check_run_output(sample_output_fp, REPO_ROOT)
+    assert output.title == "Ruff found issues with 2 rules."
+    assert output.summary.count("LOG015") == 2  # code & link  # noqa: PLR2004
+    assert output.summary.index("LOG015") < output.summary.index("D100")
+    assert len(output.annotations) == 4  # noqa: PLR2004
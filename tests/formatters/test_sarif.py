@@ -1,9 +1,13 @@
 """Tests for the SARIF formatter in github_checks."""
 
+import copy
 import json
 import tempfile
 from pathlib import Path
 
+import pytest
+
+from github_checks.formatters import chunked
 from github_checks.formatters.sarif import format_sarif_check_run_output
 from github_checks.models import AnnotationLevel, CheckRunConclusion, CheckRunOutput
 
@@ -126,7 +130,7 @@ def test_format_sarif_check_run_output_with_issues() -> None:
 
 
 def test_format_ruff_check_run_output_no_issues() -> None:
-    text = SARIF_OUT.copy()
+    text = copy.deepcopy(SARIF_OUT)
     text["runs"][0]["results"] = []  # type: ignore[index]
     text["runs"][0]["tool"]["driver"]["rules"] = []  # type: ignore[index]
     with Path(tempfile.NamedTemporaryFile(delete=False).name) as tempfile_fp:
@@ -139,3 +143,119 @@ def test_format_ruff_check_run_output_no_issues() -> None:
     assert "no issues" in output.title.lower()
     assert output.summary == "Nice work!"
     assert output.annotations == []
+
+
+@pytest.mark.parametrize("parallel", [False, True])
+def test_format_sarif_check_run_output_of_all_runs(
+    monkeypatch: pytest.MonkeyPatch,
+    *,
+    parallel: bool,
+) -> None:
+    if parallel:
+        monkeypatch.setattr(chunked, "PARALLEL_MIN_BYTES", 0)
+        monkeypatch.setattr(chunked, "ITEMS_PER_CHUNK", 1)
+        monkeypatch.setattr(chunked.os, "cpu_count", lambda: 2)
+    sarif_log = copy.deepcopy(SARIF_OUT)
+    second_run = copy.deepcopy(SARIF_OUT["runs"][0])
+    second_run["tool"]["driver"]["rules"].insert(0, {"id": "E501"})
+    for result in second_run["results"]:
+        # refer to the rule by its index only
+        del result["ruleId"]
+        result["ruleIndex"] = 1
+    sarif_log["runs"].append(second_run)
+    sample_output_fp = Path(tempfile.NamedTemporaryFile(delete=False).name)
+    sample_output_fp.write_text(json.dumps(sarif_log), encoding="utf-8")
+
+    output, _ = format_sarif_check_run_output(sample_output_fp, REPO_ROOT)
+    assert output.title == "ruff found issues with 2 rules."
+    assert output.summary.count("root-logger-call") == 2  # the rule's link & name  # noqa: PLR2004
+    assert len(output.annotations) == 4  # noqa: PLR2004
+    assert [annotation.title for annotation in output.annotations] == [
+        "[LOG015]: root-logger-call",
+    ] * 2 + ["root-logger-call"] * 2
+    assert all(
+        annotation.raw_details.startswith("Background for this rule")
+        for annotation in output.annotations
+    )
+
+
+@pytest.mark.parametrize("parallel", [False, True])
+def test_format_sarif_check_run_output_with_uri_base_ids(
+    monkeypatch: pytest.MonkeyPatch,
+    *,
+    parallel: bool,
+) -> None:
+    if parallel:
+        monkeypatch.setattr(chunked, "PARALLEL_MIN_BYTES", 0)
+        monkeypatch.setattr(chunked, "ITEMS_PER_CHUNK", 1)
+        monkeypatch.setattr(chunked.os, "cpu_count", lambda: 2)
+    sarif_log = copy.deepcopy(SARIF_OUT)
+    run = sarif_log["runs"][0]
+    run["originalUriBaseIds"] = {
+        "REPOROOT": {"uri": REPO_ROOT.as_uri() + "/"},
+        "SRCROOT": {"uri": "src", "uriBaseId": "REPOROOT"},
+    }
+    # written before the results, as SARIF producers usually do
+    sarif_log["runs"][0] = {"originalUriBaseIds": run.pop("originalUriBaseIds"), **run}
+    first_location, second_location = (
+        result["locations"][0]["physicalLocation"]["artifactLocation"]
+        for result in run["results"]
+    )
+    first_location.update(uri="github_checks/github%5Fapi.py", uriBaseId="SRCROOT")
+    second_location.update(uri="./src/github_checks/../github_checks/github_api.py")
+    sample_output_fp = Path(tempfile.NamedTemporaryFile(delete=False).name)
+    sample_output_fp.write_text(json.dumps(sarif_log), encoding="utf-8")
+
+    output, _ = format_sarif_check_run_output(sample_output_fp, REPO_ROOT)
+    assert [annotation.path for annotation in output.annotations] == [
+        "src/github_checks/github_api.py",
+    ] * 2
+
+
+@pytest.mark.parametrize("parallel", [False, True])
+def test_format_sarif_check_run_output_with_tool_after_results(
+    monkeypatch: pytest.MonkeyPatch,
+    tmp_path: Path,
+    *,
+    parallel: bool,
+) -> None:
+    if parallel:
+        monkeypatch.setattr(chunked, "PARALLEL_MIN_BYTES", 0)
+        monkeypatch.setattr(chunked.os, "cpu_count", lambda: 2)
+    monkeypatch.setattr(chunked, "ITEMS_PER_CHUNK", 3)
+    run = copy.deepcopy(SARIF_OUT["runs"][0])
+    run["results"] = [copy.deepcopy(run["results"][i % 2]) for i in range(7)]
+    for line, result in enumerate(run["results"], start=1):
+        result["locations"][0]["physicalLocation"]["region"]["startLine"] = line
+    sarif_log = {
+        **SARIF_OUT,
+        # results of the first run are read before its tool, a tool-less run is skipped
+        "runs": [
+            {"results": run["results"], "tool": run["tool"]},
+            {"results": run["results"]},
+        ],
+    }
+    sample_output_fp = tmp_path / "sarif.json"
+    sample_output_fp.write_text(json.dumps(sarif_log), encoding="utf-8")
+
+    output, _ = format_sarif_check_run_output(sample_output_fp, REPO_ROOT)
+    assert [annotation.start_line for annotation in output.annotations] == list(
+        range(1, 8),
+    )
+
+
+def test_format_sarif_check_run_output_outside_of_repo(tmp_path: Path) -> None:
+    sarif_log = copy.deepcopy(SARIF_OUT)
+    for result in sarif_log["runs"][0]["results"]:
+        artifact_location = result["locations"][0]["physicalLocation"][
+            "artifactLocation"
+        ]
+        artifact_location["uri"] = "file:///usr/lib/python3/foo.py"
+    sample_output_fp = tmp_path / "sarif.json"
+    sample_output_fp.write_text(json.dumps(sarif_log), encoding="utf-8")
+
+    output, _ = format_sarif_check_run_output(sample_output_fp, tmp_path / "repo")
+
+    assert [annotation.path for annotation in output.annotations] == [
+        "/usr/lib/python3/foo.py",
+    ] * 2
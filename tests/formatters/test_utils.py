@@ -5,9 +5,22 @@ from pathlib import Path
 from unittest.mock import MagicMock, patch
 
 import pytest
-
-from github_checks.formatters.utils import filter_for_checksignore, get_conclusion
-from github_checks.models import AnnotationLevel, CheckAnnotation, CheckRunConclusion
+from pydantic import BaseModel, ValidationError
+
+from github_checks.formatters.utils import (
+    MAX_OUTPUT_CHARS,
+    filter_for_checksignore,
+    get_conclusion,
+    merge_check_run_outputs,
+    validate_in_batches,
+    validate_json_lines_in_batches,
+)
+from github_checks.models import (
+    AnnotationLevel,
+    CheckAnnotation,
+    CheckRunConclusion,
+    CheckRunOutput,
+)
 
 
 @pytest.fixture
@@ -91,3 +104,129 @@ def test_filter_for_checksignore_with_ignore_globs_full(
     )
     mock_chdir.assert_called_once_with(local_repo_base)
     assert result == [annotations[1]]  # only file2.py remains
+
+
+class _Finding(BaseModel):
+    code: str
+    row: int
+
+
+@pytest.mark.parametrize("batch_size", [1, 2, 3, 1000])
+def test_validate_in_batches(batch_size: int) -> None:
+    items = ({"code": f"E{row}", "row": row} for row in range(5))
+
+    findings = list(validate_in_batches(_Finding, items, batch_size=batch_size))
+
+    assert findings == [_Finding(code=f"E{row}", row=row) for row in range(5)]
+
+
+def test_validate_in_batches_invalid_finding() -> None:
+    items = [{"code": "E1", "row": 1}, {"code": "E2"}]
+
+    with pytest.raises(ValidationError):
+        list(validate_in_batches(_Finding, items))
+
+
+@pytest.mark.parametrize("batch_size", [1, 2, 1000])
+def test_validate_json_lines_in_batches(batch_size: int) -> None:
+    lines = ['{"code": "E1", "row": 1}\n', "\n", '{"code": "E2", "row": 2}\n', "  "]
+
+    findings = list(
+        validate_json_lines_in_batches(_Finding, lines, batch_size=batch_size),
+    )
+
+    assert findings == [_Finding(code="E1", row=1), _Finding(code="E2", row=2)]
+
+
+def test_merge_check_run_outputs(annotations: list[CheckAnnotation]) -> None:
+    output, conclusion = merge_check_run_outputs(
+        [
+            (
+                "ruff.json",
+                CheckRunOutput(title="ruff", summary="Issues", annotations=annotations),
+                CheckRunConclusion.ACTION_REQUIRED,
+            ),
+            (
+                "raw.log",
+                CheckRunOutput(title="raw", summary="Crashed", text="Traceback"),
+                CheckRunConclusion.FAILURE,
+            ),
+            (
+                "mypy.json",
+                CheckRunOutput(title="mypy", summary="Nice work!", annotations=[]),
+                CheckRunConclusion.SUCCESS,
+            ),
+        ],
+    )
+
+    assert conclusion == CheckRunConclusion.FAILURE
+    assert output.title == "2 of 3 logs found issues"
+    assert output.summary == (
+        "### ruff.json\n\n**ruff**\n\nIssues\n\n"
+        "### raw.log\n\n**raw**\n\nCrashed\n\n"
+        "### mypy.json\n\n**mypy**\n\nNice work!"
+    )
+    assert output.text == "### raw.log\n\nTraceback"
+    assert output.annotations == annotations
+
+
+def test_merge_check_run_outputs_without_issues() -> None:
+    output, conclusion = merge_check_run_outputs(
+        [
+            (log, CheckRunOutput(title=log, summary="Nice work!"), log_conclusion)
+            for log, log_conclusion in (
+                ("ruff.json", CheckRunConclusion.SUCCESS),
+                ("mypy.json", CheckRunConclusion.NEUTRAL),
+            )
+        ],
+    )
+
+    assert conclusion == CheckRunConclusion.NEUTRAL
+    assert output.title == "No issues found in 2 logs"
+    assert output.annotations == []
+    assert output.text is None
+
+
+def test_merge_check_run_outputs_truncates_to_githubs_limit() -> None:
+    output, _ = merge_check_run_outputs(
+        [
+            (
+                f"ruff-{i}.json",
+                CheckRunOutput(title="ruff", summary="x" * 10_000, text="y" * 20_000),
+                CheckRunConclusion.ACTION_REQUIRED,
+            )
+            for i in range(20)
+        ],
+    )
+
+    assert len(output.summary) <= MAX_OUTPUT_CHARS
+    assert output.summary.count("### ruff-") == 6  # noqa: PLR2004
+    assert output.summary.endswith(
+        "_14 more sections were left out, as GitHub limits this to 65535 characters._",
+    )
+    assert len(output.text) <= MAX_OUTPUT_CHARS
+    assert output.text.count("### ruff-") == 3  # noqa: PLR2004
+    assert output.text.startswith("### ruff-0.json\n\n")
+    assert output.text.endswith(
+        "_17 more sections were left out, as GitHub limits this to 65535 characters._",
+    )
+
+
+def test_merge_check_run_outputs_shortens_a_single_oversized_section() -> None:
+    output, _ = merge_check_run_outputs(
+        [
+            (
+                log,
+                CheckRunOutput(title=log, summary="x" * 100_000),
+                CheckRunConclusion.ACTION_REQUIRED,
+            )
+            for log in ("huge.json", "small.json")
+        ],
+    )
+
+    assert len(output.summary) == MAX_OUTPUT_CHARS
+    assert output.summary.startswith("### huge.json\n\n**huge.json**\n\nxxx")
+    assert output.summary.endswith(
+        "…\n\n_1 more sections were left out, as GitHub limits this to 65535 "
+        "characters._",
+    )
@@ -0,0 +1,119 @@
+# type: ignore  # noqa: PGH003
+# ruff: noqa: S101, D103, D100, INP001, ANN001, PLR2004
+import asyncio
+from pathlib import Path
+
+import pytest
+
+pytest.importorskip("aiohttp")
+
+from aiohttp import ClientResponseError
+
+from github_checks.async_github_api import AsyncGitHubChecks
+from github_checks.models import AnnotationLevel, CheckRunConclusion
+
+
+def test_async_check_runs_concurrently(
+    fake_github,
+    app_privkey_pem: Path,
+    output_with_annotations,
+) -> None:
+    async def run_checks() -> list[str]:
+        async with AsyncGitHubChecks(
+            repo_base_url="https://github.com/jdoe/myproject",
+            app_id="1",
+            app_installation_id="2",
+            app_privkey_pem=app_privkey_pem,
+            github_api_base_url=fake_github.base_url,
+        ) as gh_checks:
+            run_ids = await asyncio.gather(
+                *(gh_checks.start_check_run("abc123", f"check-{i}") for i in range(3)),
+            )
+            await asyncio.gather(
+                *(
+                    gh_checks.finish_check_run(
+                        run_id,
+                        output=output_with_annotations(120, AnnotationLevel.FAILURE),
+                    )
+                    for run_id in run_ids
+                ),
+            )
+            return run_ids
+
+    run_ids = asyncio.run(run_checks())
+
+    requests = fake_github.requests
+    assert requests[0][:2] == ("POST", "/app/installations/2/access_tokens")
+    assert sum(method == "POST" for method, _, _ in requests) == 4
+    for run_id in run_ids:
+        patches = [
+            body
+            for method, path, body in requests
+            if method == "PATCH"
+            and path == f"/repos/jdoe/myproject/check-runs/{run_id}"
+        ]
+        assert len(patches) == 3
+        assert all("conclusion" not in body for body in patches[:-1])
+        assert patches[-1]["conclusion"] == CheckRunConclusion.ACTION_REQUIRED.value
+        assert sum(len(body["output"]["annotations"]) for body in patches) == 120
+
+
+def _async_gh_checks(
+    fake_github,
+    app_privkey_pem: Path,
+    max_retries: int = 5,
+) -> AsyncGitHubChecks:
+    return AsyncGitHubChecks(
+        repo_base_url="https://github.com/jdoe/myproject",
+        app_id="1",
+        app_installation_id="2",
+        app_privkey_pem=app_privkey_pem,
+        github_api_base_url=fake_github.base_url,
+        max_retries=max_retries,
+        backoff_base_seconds=0,
+    )
+
+
+def test_async_check_run_recovers_from_injected_failures(
+    fake_github,
+    app_privkey_pem: Path,
+    output_with_annotations,
+) -> None:
+    async def run_check() -> None:
+        async with _async_gh_checks(fake_github, app_privkey_pem) as gh_checks:
+            fake_github.inject_failures(503, method="POST")
+            run_id = await gh_checks.start_check_run("abc123", "ruff-checks")
+            fake_github.inject_failures(502, count=2, method="PATCH")
+            fake_github.inject_failures(500, method="PATCH")
+            fake_github.inject_failures(429, method="PATCH", retry_after=0)
+            await gh_checks.finish_check_run(
+                run_id,
+                output=output_with_annotations(120, AnnotationLevel.FAILURE),
+            )
+
+    asyncio.run(run_check())
+
+    stats = fake_github.stats()
+    assert stats["post_requests"] == 3  # incl. the token & the rejected attempt
+    assert stats["patch_requests"] == 7
+    assert fake_github.check_runs[0]["conclusion"] == "action_required"
+
+
+def test_async_check_run_gives_up_after_max_retries(
+    fake_github,
+    app_privkey_pem: Path,
+) -> None:
+    async def run_check() -> None:
+        async with _async_gh_checks(
+            fake_github,
+            app_privkey_pem,
+            max_retries=1,
+        ) as gh_checks:
+            run_id = await gh_checks.start_check_run("abc123", "ruff-checks")
+            fake_github.inject_failures(502, count=2, method="PATCH")
+            await gh_checks.finish_check_run(run_id)
+
+    with pytest.raises(ClientResponseError) as exc_info:
+        asyncio.run(run_check())
+    assert exc_info.value.status == 502
+    assert fake_github.stats()["patch_requests"] == 2
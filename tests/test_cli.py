@@ -1,10 +1,29 @@
 # type: ignore  # noqa: PGH003
 # ruff: noqa: S101, D103, D100, INP001, ANN001
+import json
+import pickle
+import subprocess
+import sys
+from pathlib import Path
+
 import pytest
 
+from github_checks import cli
 from github_checks.cli import (
+    DEFAULT_MAX_BATCH_BYTES,
+    LOG_OUTPUT_FORMATTERS,
+    ValidationLog,
     compute_ignored_globs,
+    export_payloads_from_log,
+    format_log,
+    load_log_output_formatter,
+    replay_payloads,
+    resolve_validation_logs,
+    spool_payloads_from_log,
+    spooled_payloads_filepath,
 )
+from github_checks.github_api import GitHubChecks, RequestScheduler
+from github_checks.models import CheckRunConclusion
 
 
 @pytest.mark.parametrize(
@@ -30,3 +49,275 @@ def test_compute_ignored_globs(
         ignore_except_included=ignore_except_included,
     )
     assert result == expected
+
+
+def test_cli_imports_no_library_upfront() -> None:
+    # to keep its startup cheap for clients of a `serve` daemon
+    imported = subprocess.run(
+        [
+            sys.executable,
+            "-c",
+            "import sys, github_checks.cli; print(*sorted(sys.modules), sep='\\n')",
+        ],
+        capture_output=True,
+        check=True,
+        text=True,
+    ).stdout.splitlines()
+    assert "github_checks.models" not in imported
+    assert "github_checks.github_api" not in imported
+
+
+@pytest.mark.parametrize("log_format", LOG_OUTPUT_FORMATTERS)
+def test_load_log_output_formatter(log_format: str) -> None:
+    assert callable(load_log_output_formatter(log_format))
+
+
+def _write_mypy_log(log_fp: Path, num_errors: int) -> Path:
+    log_fp.write_text(
+        "".join(
+            json.dumps(
+                {
+                    "file": str(log_fp.parent / f"module{i}.py"),
+                    "line": i + 1,
+                    "column": 0,
+                    "message": "Missing return statement",
+                    "hint": None,
+                    "code": "return",
+                    "severity": "error",
+                },
+            )
+            + "\n"
+            for i in range(num_errors)
+        ),
+    )
+    return log_fp
+
+
+def _fake_gh_checks(fake_github, app_privkey_pem: Path) -> GitHubChecks:
+    return GitHubChecks(
+        repo_base_url="https://github.com/jdoe/myproject",
+        app_id="1",
+        app_installation_id="2",
+        app_privkey_pem=app_privkey_pem,
+        github_api_base_url=fake_github.base_url,
+        scheduler=RequestScheduler(requests_per_minute=60_000, burst=1000),
+    )
+
+
+def test_exported_payloads_are_replayed_unchanged(
+    fake_github,
+    app_privkey_pem: Path,
+    tmp_path: Path,
+) -> None:
+    mypy_log_fp = _write_mypy_log(tmp_path / "mypy.json", 120)
+    payloads_fp = tmp_path / "payloads.ndjson"
+    export_payloads_from_log(
+        payloads_fp,
+        "mypy-checks",
+        mypy_log_fp,
+        "mypy-json",
+        tmp_path,
+        ignored_globs=None,
+        mute_ignored_annotations=False,
+        conclusion=None,
+        max_batch_bytes=DEFAULT_MAX_BATCH_BYTES,
+    )
+    exported = payloads_fp.read_bytes().splitlines()
+    assert len(exported) == 3  # noqa: PLR2004
+    assert not fake_github.requests  # exporting needs no network at all
+
+    gh_checks = _fake_gh_checks(fake_github, app_privkey_pem)
+    gh_checks.start_check_run("abc123", "mypy-checks")
+    replay_payloads(
+        gh_checks,
+        [payloads_fp],
+        max_workers=2,
+        session_fp=tmp_path / "session.pkl",
+    )
+    patches = [body for method, _, body in fake_github.requests if method == "PATCH"]
+    assert sorted(patches, key=json.dumps) == sorted(
+        (json.loads(body) for body in exported),
+        key=json.dumps,
+    )
+    assert patches[-1]["conclusion"] == "action_required"
+    assert fake_github.check_runs[0]["status"] == "completed"
+
+
+def test_replay_uploads_the_last_export_of_a_check(
+    fake_github,
+    app_privkey_pem: Path,
+    tmp_path: Path,
+) -> None:
+    payloads_fp = tmp_path / "payloads.ndjson"
+    for num_errors in (120, 3):
+        export_payloads_from_log(
+            payloads_fp,
+            "mypy-checks",
+            _write_mypy_log(tmp_path / "mypy.json", num_errors),
+            "mypy-json",
+            tmp_path,
+            ignored_globs=None,
+            mute_ignored_annotations=False,
+            conclusion=None,
+            max_batch_bytes=DEFAULT_MAX_BATCH_BYTES,
+        )
+
+    gh_checks = _fake_gh_checks(fake_github, app_privkey_pem)
+    gh_checks.start_check_run("abc123", "mypy-checks")
+    replay_payloads(
+        gh_checks,
+        [payloads_fp],
+        max_workers=2,
+        session_fp=tmp_path / "session.pkl",
+    )
+    patches = [body for method, _, body in fake_github.requests if method == "PATCH"]
+    assert len(patches) == 1
+    assert len(patches[0]["output"]["annotations"]) == 3  # noqa: PLR2004
+    assert patches[0]["conclusion"] == "action_required"
+
+
+def test_spooled_check_runs_are_flushed_together(
+    fake_github,
+    app_privkey_pem: Path,
+    tmp_path: Path,
+) -> None:
+    spool_dir = tmp_path / "spool"
+    for check_name, num_errors in (("mypy-1", 120), ("mypy-2", 30), ("mypy-3", 1)):
+        spool_payloads_from_log(
+            spool_dir,
+            check_name,
+            _write_mypy_log(tmp_path / f"{check_name}.json", num_errors),
+            "mypy-json",
+            tmp_path,
+            ignored_globs=None,
+            mute_ignored_annotations=False,
+            conclusion="failure",
+            max_batch_bytes=DEFAULT_MAX_BATCH_BYTES,
+        )
+    assert sorted(fp.name for fp in spool_dir.iterdir()) == [
+        "mypy-1.ndjson",
+        "mypy-2.ndjson",
+        "mypy-3.ndjson",
+    ]
+
+    gh_checks = _fake_gh_checks(fake_github, app_privkey_pem)
+    gh_checks.start_check_runs("abc123", ["mypy-1", "mypy-2"])
+    replay_payloads(
+        gh_checks,
+        sorted(spool_dir.glob("*.ndjson")),
+        max_workers=2,
+        session_fp=tmp_path / "session.pkl",
+        remove_uploaded=True,
+    )
+    assert all(run["conclusion"] == "failure" for run in fake_github.check_runs)
+    assert fake_github.stats()["annotations_received"] == 120 + 30
+    assert not gh_checks.check_runs
+    # the run of mypy-3 was never started, so its updates are kept for a retry
+    assert list(spool_dir.iterdir()) == [spooled_payloads_filepath(spool_dir, "mypy-3")]
+
+
+def test_finish_check_run_defaults_to_the_check_started_last(
+    fake_github,
+    app_privkey_pem: Path,
+    tmp_path: Path,
+    monkeypatch: pytest.MonkeyPatch,
+) -> None:
+    pickle_fp = tmp_path / "session.pkl"
+    with pickle_fp.open("wb") as pickle_file:
+        pickle.dump(_fake_gh_checks(fake_github, app_privkey_pem), pickle_file)
+
+    def run_cli(*cli_args: str) -> None:
+        monkeypatch.setattr(
+            sys,
+            "argv",
+            ["github-checks", "--pickle-filepath", str(pickle_fp), *cli_args],
+        )
+        cli.main()
+
+    run_cli("start-check-run", "--revision", "abc123", "--check-name", "a", "b")
+    run_cli(
+        "finish-check-run",
+        str(_write_mypy_log(tmp_path / "mypy.json", 3)),
+        "--log-format",
+        "mypy-json",
+        "--local-repo-path",
+        str(tmp_path),
+    )
+    conclusions = {run["name"]: run.get("conclusion") for run in fake_github.check_runs}
+    assert conclusions == {"a": None, "b": "action_required"}
+
+
+def test_resolve_validation_logs(tmp_path: Path) -> None:
+    for package in ("b", "a"):
+        (tmp_path / package).mkdir()
+        (tmp_path / package / "mypy.json").touch()
+        (tmp_path / package / "raw.log").touch()
+
+    assert resolve_validation_logs(
+        [
+            f"{tmp_path}/*/mypy.json",
+            f"raw:{tmp_path}/**/*.log",
+            f"{tmp_path}/a/mypy.json",  # matched above already
+            "missing.json",
+        ],
+        "mypy-json",
+    ) == [
+        ValidationLog(tmp_path / "a" / "mypy.json", "mypy-json"),
+        ValidationLog(tmp_path / "b" / "mypy.json", "mypy-json"),
+        ValidationLog(tmp_path / "a" / "raw.log", "raw"),
+        ValidationLog(tmp_path / "b" / "raw.log", "raw"),
+        ValidationLog(Path("missing.json"), "mypy-json"),
+    ]
+
+
+@pytest.mark.parametrize(
+    ("log_specs", "log_format", "match"),
+    [
+        (["mypy.json"], None, "No format given for mypy.json"),
+        (["unknown:mypy.json"], None, "No format given for unknown:mypy.json"),
+        (["mypy-json:*.nothing"], None, r"No logs match \*\.nothing"),
+    ],
+)
+def test_resolve_validation_logs_errors(log_specs, log_format, match) -> None:
+    with pytest.raises(ValueError, match=match):
+        resolve_validation_logs(log_specs, log_format)
+
+
+@pytest.mark.parametrize("parallel", [False, True])
+def test_format_log_merges_several_logs(
+    tmp_path: Path,
+    monkeypatch: pytest.MonkeyPatch,
+    *,
+    parallel: bool,
+) -> None:
+    monkeypatch.setattr(cli.os, "cpu_count", lambda: 2 if parallel else 1)
+    raw_log_fp = tmp_path / "raw.log"
+    raw_log_fp.write_text("")
+    validation_logs = [
+        ValidationLog(_write_mypy_log(tmp_path / "mypy-1.json", 3), "mypy-json"),
+        ValidationLog(raw_log_fp, "raw"),
+        ValidationLog(_write_mypy_log(tmp_path / "mypy-2.json", 2), "mypy-json"),
+    ]
+
+    output, conclusion = format_log(
+        validation_logs,
+        None,
+        tmp_path,
+        ignored_globs=None,
+        mute_ignored_annotations=False,
+        conclusion=None,
+    )
+
+    assert conclusion == CheckRunConclusion.ACTION_REQUIRED
+    assert output.title == "2 of 3 logs found issues"
+    assert [annotation.path for annotation in output.annotations] == [
+        "module0.py",
+        "module1.py",
+        "module2.py",
+        "module0.py",
+        "module1.py",
+    ]
+    sections = output.summary.split("### ")[1:]
+    assert [section.splitlines()[0] for section in sections] == [
+        str(validation_log.path) for validation_log in validation_logs
+    ]
@@ -0,0 +1,187 @@
+# type: ignore  # noqa: PGH003
+# ruff: noqa: S101, D103, D100, INP001, ANN001
+import json
+import subprocess
+import sys
+import threading
+from collections.abc import Iterator
+from pathlib import Path
+
+import pytest
+
+from github_checks.cli import request_daemon
+from github_checks.daemon import ChecksDaemon
+from github_checks.github_api import GitHubChecks
+
+
+@pytest.fixture
+def daemon(tmp_path: Path) -> Iterator[ChecksDaemon]:
+    checks_daemon = ChecksDaemon(tmp_path / "daemon.sock", idle_timeout=10)
+    thread = threading.Thread(target=checks_daemon.serve_until_cleanup, daemon=True)
+    thread.start()
+    yield checks_daemon
+    if thread.is_alive():
+        request_daemon(tmp_path / "daemon.sock", "cleanup")
+    thread.join()
+    checks_daemon.server_close()
+
+
+def test_daemon_executes_commands_with_one_session(
+    daemon: ChecksDaemon,
+    fake_github,
+    app_privkey_pem: Path,
+    tmp_path: Path,
+) -> None:
+    daemon.gh_checks = GitHubChecks(
+        repo_base_url="https://github.com/jdoe/myproject",
+        app_id="1",
+        app_installation_id="2",
+        app_privkey_pem=app_privkey_pem,
+        github_api_base_url=fake_github.base_url,
+    )
+    socket_fp = tmp_path / "daemon.sock"
+    raw_log_fp = tmp_path / "raw_output.txt"
+    raw_log_fp.write_text("I just don't like this code")
+
+    for check_name in ("raw-1", "raw-2"):
+        request_daemon(
+            socket_fp,
+            "start-check-run",
+            revision_sha="abc123",
+            check_names=[check_name],
+        )
+        request_daemon(
+            socket_fp,
+            "finish-check-run",
+            validation_log=str(raw_log_fp),
+            log_format="raw",
+            local_repo_path=str(tmp_path),
+            ignored_globs=None,
+            mute_ignored_annotations=False,
+            conclusion="neutral",
+            max_workers=1,
+            journal_fp=str(tmp_path / "session.journal.json"),
+            max_batch_bytes=1024 * 1024,
+        )
+    request_daemon(socket_fp, "cleanup")
+
+    requests = fake_github.requests
+    # authenticated once, then reused for both check runs
+    methods = [method for method, _, _ in requests]
+    assert methods == ["POST", "POST", "PATCH", "POST", "PATCH"]
+    assert all(
+        body["conclusion"] == "neutral" for m, _, body in requests if m == "PATCH"
+    )
+
+
+@pytest.mark.usefixtures("daemon")
+def test_daemon_reports_errors_to_client(tmp_path: Path) -> None:
+    with pytest.raises(RuntimeError, match="run `init` first"):
+        request_daemon(
+            tmp_path / "daemon.sock",
+            "start-check-run",
+            revision_sha="abc123",
+            check_names=["raw"],
+        )
+    with pytest.raises(RuntimeError, match="Unknown command"):
+        request_daemon(tmp_path / "daemon.sock", "clone-repo")
+
+
+def test_detached_daemon_releases_the_callers_output(tmp_path: Path) -> None:
+    socket_fp = tmp_path / "daemon.sock"
+    # reading the output until EOF must not wait for the daemon to exit
+    serving = subprocess.run(  # noqa: S603
+        [
+            sys.executable,
+            "-m",
+            "github_checks.cli",
+            "--daemon-socket",
+            str(socket_fp),
+            "serve",
+            "--detach",
+            "--idle-timeout",
+            "60",
+        ],
+        capture_output=True,
+        check=True,
+        timeout=30,
+    )
+    try:
+        assert serving.stdout == b""
+    finally:
+        request_daemon(socket_fp, "cleanup")
+
+
+@pytest.mark.usefixtures("daemon")
+def test_daemon_refuses_to_share_socket(tmp_path: Path) -> None:
+    with pytest.raises(OSError, match="already listening"):
+        ChecksDaemon(tmp_path / "daemon.sock")
+
+
+def test_daemon_posts_watched_lines_ahead_of_finish(
+    daemon: ChecksDaemon,
+    fake_github,
+    app_privkey_pem: Path,
+    tmp_path: Path,
+) -> None:
+    daemon.gh_checks = GitHubChecks(
+        repo_base_url="https://github.com/jdoe/myproject",
+        app_id="1",
+        app_installation_id="2",
+        app_privkey_pem=app_privkey_pem,
+        github_api_base_url=fake_github.base_url,
+    )
+    socket_fp = tmp_path / "daemon.sock"
+    mypy_log_fp = tmp_path / "mypy.json"
+    lines = [
+        json.dumps(
+            {
+                "file": f"src/module{i}.py",
+                "line": i + 1,
+                "column": 0,
+                "message": "Missing return statement",
+                "hint": None,
+                "code": "return",
+                "severity": "error",
+            },
+        )
+        for i in range(3)
+    ]
+    mypy_log_fp.write_text("\n".join(lines) + "\n")
+    request_daemon(
+        socket_fp,
+        "start-check-run",
+        revision_sha="abc123",
+        check_names=["mypy"],
+    )
+    watch_params = {
+        "log_format": "mypy-json",
+        "local_repo_path": str(tmp_path),
+        "ignored_globs": None,
+        "mute_ignored_annotations": False,
+        "streamed_fp": str(tmp_path / "session.journal.streamed"),
+        "max_batch_bytes": 1024 * 1024,
+    }
+    request_daemon(socket_fp, "watch", lines=lines[:2], **watch_params)
+    request_daemon(
+        socket_fp,
+        "finish-check-run",
+        validation_log=str(mypy_log_fp),
+        log_format="mypy-json",
+        local_repo_path=str(tmp_path),
+        ignored_globs=None,
+        mute_ignored_annotations=False,
+        conclusion=None,
+        max_workers=1,
+        journal_fp=str(tmp_path / "session.journal.json"),
+        max_batch_bytes=1024 * 1024,
+        streamed_fp=watch_params["streamed_fp"],
+    )
+
+    (_, _, streamed), (_, _, finished) = fake_github.requests[-2:]
+    assert "conclusion" not in streamed
+    assert streamed["output"]["title"] == "mypy is running, found 2 issues so far."
+    assert finished["conclusion"] == "action_required"
+    assert [a["path"] for a in finished["output"]["annotations"]] == [
+        "src/module2.py",
+    ]
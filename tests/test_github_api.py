@@ -0,0 +1,631 @@
+# type: ignore  # noqa: PGH003
+# ruff: noqa: S101, D103, D100, INP001, ANN002, ANN003, SLF001
+import json
+import os
+import shutil
+import time
+from collections.abc import Callable
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+from unittest.mock import MagicMock, patch
+
+import jwt
+import pytest
+from requests import HTTPError, Response, Session
+
+from github_checks.github_api import (
+    GitHubChecks,
+    InstallationTokenCache,
+    RequestScheduler,
+    _AdaptiveConcurrencyLimiter,
+    _annotation_batches,
+    _CheckRunUpdateEncoder,
+    _generate_app_jwt_from_pem,
+    encode_check_run_updates,
+    mint_installation_tokens,
+)
+from github_checks.models import (
+    CheckRunConclusion,
+    CheckRunOutput,
+    CheckRunUpdatePOSTBody,
+)
+
+
+def _response(status_code: int = 200, headers: dict | None = None) -> Response:
+    response = Response()
+    response.status_code = status_code
+    response.headers.update(headers or {})
+    response._content = b"{}"
+    return response
+
+
+def _fake_auth(gh_checks: GitHubChecks) -> None:
+    gh_checks.app_install_access_token = "fake-token"  # noqa: S105
+    gh_checks.time_to_reauth = float("inf")
+    gh_checks._api_headers = {"Authorization": "Bearer fake-token"}
+
+
+@pytest.fixture
+def gh_checks() -> GitHubChecks:
+    with patch.object(GitHubChecks, "auth", autospec=True, side_effect=_fake_auth):
+        checks = GitHubChecks(
+            repo_base_url="https://github.com/jdoe/myproject",
+            app_id="1",
+            app_installation_id="2",
+            app_privkey_pem=Path("/fake/key.pem"),
+            scheduler=RequestScheduler(backoff_base_seconds=0),
+        )
+    checks._github_session = MagicMock()
+    checks._github_session.request.return_value = _response()
+    checks.current_run_id = "42"
+    checks._curr_check_name = "ruff-checks"
+    return checks
+
+
+@pytest.mark.parametrize("max_workers", [1, 4])
+def test_finish_check_run_sets_conclusion_on_final_batch_only(
+    gh_checks: GitHubChecks,
+    max_workers: int,
+    output_with_annotations: Callable[..., CheckRunOutput],
+) -> None:
+    gh_checks.finish_check_run(
+        CheckRunConclusion.ACTION_REQUIRED,
+        output_with_annotations(120),
+        max_workers=max_workers,
+    )
+    calls = gh_checks._github_session.request.call_args_list
+    assert len(calls) == 3  # noqa: PLR2004
+    bodies = [json.loads(call.kwargs["data"]) for call in calls]
+    assert all("conclusion" not in body for body in bodies[:-1])
+    assert bodies[-1]["conclusion"] == "action_required"
+    assert len(bodies[-1]["output"]["annotations"]) == 20  # noqa: PLR2004
+    assert sum(len(body["output"]["annotations"]) for body in bodies) == 120  # noqa: PLR2004
+    assert gh_checks.current_run_id is None
+
+
+def test_finish_check_run_timestamps_completion_once_batches_are_uploaded(
+    gh_checks: GitHubChecks,
+    output_with_annotations: Callable[..., CheckRunOutput],
+) -> None:
+    requests_before_timestamp = []
+
+    def gen_timestamp() -> str:
+        requests_before_timestamp.append(gh_checks._github_session.request.call_count)
+        return "2024-01-01T00:00:00Z"
+
+    with patch("github_checks.github_api._gen_github_timestamp", gen_timestamp):
+        gh_checks.finish_check_run(
+            CheckRunConclusion.SUCCESS,
+            output_with_annotations(120),
+            max_workers=2,
+        )
+    # the final body is only encoded after the other two batches were uploaded
+    assert requests_before_timestamp[-1] == 2  # noqa: PLR2004
+
+
+def test_finish_check_run_retries_rate_limited_batches(
+    gh_checks: GitHubChecks,
+    output_with_annotations: Callable[..., CheckRunOutput],
+) -> None:
+    responses = iter([_response(429, {"Retry-After": "0"})])
+
+    def request_side_effect(*_, **__) -> Response:
+        return next(responses, _response())
+
+    gh_checks._github_session.request.side_effect = request_side_effect
+    gh_checks.finish_check_run(
+        CheckRunConclusion.SUCCESS,
+        output_with_annotations(150),
+        max_workers=2,
+    )
+    # one throttled attempt, three batches accepted
+    assert gh_checks._github_session.request.call_count == 4  # noqa: PLR2004
+
+
+def test_finish_check_run_resumes_from_journal(
+    gh_checks: GitHubChecks,
+    tmp_path: Path,
+    output_with_annotations: Callable[..., CheckRunOutput],
+) -> None:
+    journal_fp = tmp_path / "session.journal.json"
+    responses = iter([_response(), _response(), _response(422)])
+
+    def request_side_effect(*_, **__) -> Response:
+        return next(responses)
+
+    gh_checks._github_session.request.side_effect = request_side_effect
+    with pytest.raises(HTTPError):
+        gh_checks.finish_check_run(
+            CheckRunConclusion.SUCCESS,
+            output_with_annotations(220),
+            journal_fp=journal_fp,
+        )
+    assert journal_fp.exists()
+
+    # the retry only uploads the 3 remaining batches, instead of all 5
+    gh_checks._github_session.request.reset_mock(side_effect=True)
+    gh_checks.current_run_id = "42"
+    gh_checks.finish_check_run(
+        CheckRunConclusion.SUCCESS,
+        output_with_annotations(220),
+        journal_fp=journal_fp,
+    )
+    calls = gh_checks._github_session.request.call_args_list
+    assert len(calls) == 3  # noqa: PLR2004
+    first_body, final_body = (json.loads(calls[i].kwargs["data"]) for i in (0, -1))
+    assert first_body["output"]["annotations"][0]["path"] == "file100.py"
+    assert final_body["conclusion"] == "success"
+    assert not journal_fp.exists()
+
+
+@pytest.mark.parametrize("conclusion", [None, CheckRunConclusion.FAILURE])
+def test_check_run_update_encoder_matches_model_serialization(
+    conclusion: CheckRunConclusion | None,
+    output_with_annotations: Callable[..., CheckRunOutput],
+) -> None:
+    output = output_with_annotations(3)
+    output.annotations[0].raw_details = "details"
+    output.annotations[1].start_column = 4
+    encoder = _CheckRunUpdateEncoder("ruff-checks", output)
+    body = json.loads(encoder.body(encoder.encoded_annotations, conclusion))
+
+    expected = CheckRunUpdatePOSTBody(
+        name="ruff-checks",
+        output=output,
+        conclusion=conclusion.value if conclusion else None,
+    ).model_dump(exclude_unset=True, exclude_none=True)
+    assert ("completed_at" in body) == (conclusion is not None)
+    body.pop("completed_at", None)
+    assert body == expected
+
+
+def test_annotation_batches_keep_order_of_evenly_sized_annotations() -> None:
+    annotations = [b'{"path":"file%d.py"}' % i for i in range(120)]
+    batches, in_order_batches = _annotation_batches(annotations, max_batch_bytes=4096)
+    assert [len(batch) for batch in batches] == [50, 50, 20]
+    assert in_order_batches == 3  # noqa: PLR2004
+    assert [annotation for batch in batches for annotation in batch] == annotations
+
+
+def test_annotation_batches_pack_by_size() -> None:
+    # long SARIF details alternating with short ones, too large to be cut in order
+    annotations = [
+        b'{"raw_details":"%s"}' % (b"x" * (450 if i % 2 else 100)) for i in range(20)
+    ]
+    batches, in_order_batches = _annotation_batches(annotations, max_batch_bytes=1000)
+    assert all(sum(len(a) + 1 for a in batch) <= 1000 for batch in batches)  # noqa: PLR2004
+    assert len(batches) < in_order_batches
+    assert sorted(a for batch in batches for a in batch) == sorted(annotations)
+
+
+def test_annotation_batches_isolate_oversized_annotations() -> None:
+    annotations = [b"x" * 50, b"y" * 5000, b"z" * 50]
+    batches, _ = _annotation_batches(annotations, max_batch_bytes=1000)
+    assert batches == [[b"x" * 50, b"z" * 50], [b"y" * 5000]]
+
+
+def test_adaptive_concurrency_limiter_backs_off() -> None:
+    limiter = _AdaptiveConcurrencyLimiter(8, slow_response_seconds=1.0)
+    limiter.acquire()
+    limiter.release(0.1, throttled=True)
+    assert limiter.limit == 4  # noqa: PLR2004
+    limiter.acquire()
+    limiter.release(5.0, throttled=False)
+    assert limiter.limit == 2  # noqa: PLR2004
+    limiter.acquire()
+    limiter.release(0.1, throttled=False)
+    assert limiter.limit == 3  # noqa: PLR2004
+
+
+def test_request_scheduler_retries_server_errors() -> None:
+    session = MagicMock()
+    session.request.side_effect = [_response(502), _response(503), _response(201)]
+    scheduler = RequestScheduler(backoff_base_seconds=0)
+    response = scheduler.send(session, "POST", "https://api.github.com/x")
+    assert response.status_code == 201  # noqa: PLR2004
+    assert session.request.call_count == 3  # noqa: PLR2004
+
+
+def test_request_scheduler_gives_up_after_max_retries() -> None:
+    session = MagicMock()
+    session.request.return_value = _response(500)
+    scheduler = RequestScheduler(max_retries=2, backoff_base_seconds=0)
+    response = scheduler.send(session, "POST", "https://api.github.com/x")
+    assert response.status_code == 500  # noqa: PLR2004
+    assert session.request.call_count == 3  # noqa: PLR2004
+
+
+def test_request_scheduler_does_not_retry_client_errors() -> None:
+    session = MagicMock()
+    session.request.return_value = _response(403)
+    scheduler = RequestScheduler(backoff_base_seconds=0)
+    response = scheduler.send(session, "POST", "https://api.github.com/x")
+    assert response.status_code == 403  # noqa: PLR2004
+    assert session.request.call_count == 1
+
+
+def test_request_scheduler_shares_budget_through_state_file(tmp_path: Path) -> None:
+    state_fp = tmp_path / "ratelimit.json"
+    session = MagicMock()
+    session.request.return_value = _response()
+    first_process = RequestScheduler(state_fp, requests_per_minute=80, burst=2)
+    second_process = RequestScheduler(state_fp, requests_per_minute=80, burst=2)
+    first_process.send(session, "GET", "https://api.github.com/x")
+    second_process.send(session, "GET", "https://api.github.com/x")
+    # both requests were drawn from the same bucket, which is now empty
+    assert first_process._take_token() > 0
+
+
+def test_request_scheduler_only_paces_when_asked_to(tmp_path: Path) -> None:
+    session = MagicMock()
+    session.request.return_value = _response()
+    scheduler = RequestScheduler(tmp_path / "ratelimit.json")
+    for _ in range(100):
+        scheduler.send(session, "PATCH", "https://api.github.com/x")
+    assert scheduler._take_token() == 0
+
+
+def test_request_scheduler_pauses_on_exhausted_rate_limit(tmp_path: Path) -> None:
+    state_fp = tmp_path / "ratelimit.json"
+    session = MagicMock()
+    session.request.return_value = _response(
+        200,
+        {"X-RateLimit-Remaining": "0", "X-RateLimit-Reset": "9999999999"},
+    )
+    RequestScheduler(state_fp).send(session, "GET", "https://api.github.com/x")
+    assert RequestScheduler(state_fp)._take_token() > 0
+
+
+def test_installation_token_cache_shares_tokens(tmp_path: Path) -> None:
+    cache = InstallationTokenCache(tmp_path / "tokens.json")
+    minted = []
+
+    def mint_token() -> tuple[str, int]:
+        minted.append(f"token-{len(minted)}")
+        return minted[-1], int(time.time()) + 3600
+
+    first = cache.get_or_mint("https://api.github.com", "1", "2", mint_token)
+    second = InstallationTokenCache(tmp_path / "tokens.json").get_or_mint(
+        "https://api.github.com",
+        "1",
+        "2",
+        mint_token,
+    )
+    assert first == second
+    assert minted == ["token-0"]
+    # each API host & installation gets a token of its own
+    cache.get_or_mint("https://ghe.example.com/api/v3", "1", "2", mint_token)
+    cache.get_or_mint("https://api.github.com", "1", "3", mint_token)
+    assert len(minted) == 3  # noqa: PLR2004
+    assert (tmp_path / "tokens.json").stat().st_mode & 0o777 == 0o600  # noqa: PLR2004
+
+
+def test_installation_token_cache_renews_expiring_tokens(tmp_path: Path) -> None:
+    cache = InstallationTokenCache(tmp_path / "tokens.json")
+    expiring = cache.get_or_mint(
+        "https://api.github.com",
+        "1",
+        "2",
+        lambda: ("old-token", int(time.time()) + 10),
+    )
+    renewed = cache.get_or_mint(
+        "https://api.github.com",
+        "1",
+        "2",
+        lambda: ("new-token", int(time.time()) + 3600),
+    )
+    assert (expiring[0], renewed[0]) == ("old-token", "new-token")
+
+
+def test_installation_token_cache_mints_once_for_concurrent_callers(
+    tmp_path: Path,
+) -> None:
+    cache = InstallationTokenCache(tmp_path / "tokens.json")
+    mint_count = 0
+
+    def slow_mint_token() -> tuple[str, int]:
+        nonlocal mint_count
+        mint_count += 1
+        time.sleep(0.2)
+        return "token", int(time.time()) + 3600
+
+    with ThreadPoolExecutor(max_workers=4) as executor:
+        tokens = list(
+            executor.map(
+                lambda _: cache.get_or_mint(
+                    "https://api.github.com",
+                    "1",
+                    "2",
+                    slow_mint_token,
+                ),
+                range(4),
+            ),
+        )
+    assert tokens == [tokens[0]] * 4
+    assert mint_count == 1
+
+
+def test_installation_token_cache_rejects_shared_file(tmp_path: Path) -> None:
+    cache_fp = tmp_path / "tokens.json"
+    cache_fp.touch(mode=0o644)
+    cache_fp.chmod(0o644)
+    with pytest.raises(PermissionError):
+        InstallationTokenCache(cache_fp).get_or_mint(
+            "https://api.github.com",
+            "1",
+            "2",
+            lambda: ("token", int(time.time()) + 3600),
+        )
+
+
+def test_start_check_runs_concurrently_and_finish_by_name(
+    fake_github,  # noqa: ANN001
+    app_privkey_pem: Path,
+) -> None:
+    gh_checks = GitHubChecks(
+        repo_base_url="https://github.com/jdoe/myproject",
+        app_id="1",
+        app_installation_id="2",
+        app_privkey_pem=app_privkey_pem,
+        github_api_base_url=fake_github.base_url,
+    )
+    check_names = [f"check-{i}" for i in range(12)]
+    started = gh_checks.start_check_runs("abc123", check_names, max_workers=4)
+    assert list(started) == check_names
+    assert len(set(started.values())) == 12  # noqa: PLR2004
+    assert gh_checks.current_run_id == started["check-11"]
+
+    gh_checks.finish_check_run(CheckRunConclusion.SUCCESS, check_name="check-3")
+    _, path, body = fake_github.requests[-1]
+    assert path == f"/repos/jdoe/myproject/check-runs/{started['check-3']}"
+    assert body["name"] == "check-3"
+    assert "check-3" not in gh_checks.check_runs
+    assert len(gh_checks.check_runs) == 11  # noqa: PLR2004
+
+
+def test_start_check_runs_reuses_in_progress_runs(
+    fake_github,  # noqa: ANN001
+    app_privkey_pem: Path,
+) -> None:
+    gh_checks = GitHubChecks(
+        repo_base_url="https://github.com/jdoe/myproject",
+        app_id="1",
+        app_installation_id="2",
+        app_privkey_pem=app_privkey_pem,
+        github_api_base_url=fake_github.base_url,
+        scheduler=RequestScheduler(requests_per_minute=60_000, burst=1000),
+    )
+    # a previous attempt of the build, which left 250 runs in progress (3 pages)
+    previous = gh_checks.start_check_runs(
+        "abc123",
+        [f"check-{i}" for i in range(250)],
+    )
+    gh_checks.finish_check_run(CheckRunConclusion.FAILURE, check_name="check-0")
+
+    retried = gh_checks.start_check_runs(
+        "abc123",
+        ["check-0", "check-1", "check-249", "new-check"],
+        reuse_existing=True,
+    )
+    assert retried["check-1"] == previous["check-1"]
+    assert retried["check-249"] == previous["check-249"]
+    # completed runs aren't reused, nor can a run for a new check be
+    assert retried["check-0"] != previous["check-0"]
+    assert "new-check" in retried
+    methods = [method for method, _, _ in fake_github.requests[-5:]]
+    assert sorted(methods) == ["GET", "GET", "GET", "POST", "POST"]
+
+    gh_checks.start_check_run("abc123", "check-2", reuse_existing=True)
+    assert gh_checks.current_run_id == previous["check-2"]
+
+
+def test_finish_check_run_skips_streamed_annotations(
+    gh_checks: GitHubChecks,
+    tmp_path: Path,
+    output_with_annotations: Callable[..., CheckRunOutput],
+) -> None:
+    streamed_fp = tmp_path / "session.journal.streamed"
+    annotations = output_with_annotations(100).annotations
+    gh_checks.stream_annotations(annotations[:30], streamed_fp)
+    gh_checks.stream_annotations(annotations[30:70], streamed_fp)
+    calls = gh_checks._github_session.request.call_args_list
+    bodies = [json.loads(call.kwargs["data"]) for call in calls]
+    assert all("conclusion" not in body for body in bodies)
+    assert (
+        bodies[-1]["output"]["title"]
+        == "ruff-checks is running, found 70 issues so far."
+    )
+    assert sum(len(body["output"]["annotations"]) for body in bodies) == 70  # noqa: PLR2004
+
+    # only the 30 annotations which weren't streamed yet are uploaded on finish
+    gh_checks._github_session.request.reset_mock()
+    gh_checks.finish_check_run(
+        CheckRunConclusion.SUCCESS,
+        output_with_annotations(100),
+        streamed_fp=streamed_fp,
+    )
+    (call,) = gh_checks._github_session.request.call_args_list
+    final_body = json.loads(call.kwargs["data"])
+    assert final_body["conclusion"] == "success"
+    assert final_body["output"]["title"] == "title"
+    paths = [annotation["path"] for annotation in final_body["output"]["annotations"]]
+    assert paths == [f"file{i}.py" for i in range(70, 100)]
+    assert not streamed_fp.exists()
+
+
+def test_finish_check_run_recovers_from_injected_failures(
+    fake_github,  # noqa: ANN001
+    app_privkey_pem: Path,
+    output_with_annotations: Callable[..., CheckRunOutput],
+) -> None:
+    gh_checks = GitHubChecks(
+        repo_base_url="https://github.com/jdoe/myproject",
+        app_id="1",
+        app_installation_id="2",
+        app_privkey_pem=app_privkey_pem,
+        github_api_base_url=fake_github.base_url,
+        scheduler=RequestScheduler(
+            requests_per_minute=60_000,
+            burst=1000,
+            backoff_base_seconds=0,
+        ),
+    )
+    gh_checks.start_check_run("abc123", "ruff-checks")
+    fake_github.inject_failures(502, count=2, method="PATCH")
+    fake_github.inject_failures(429, method="PATCH", retry_after=0)
+    gh_checks.finish_check_run(
+        CheckRunConclusion.SUCCESS,
+        output_with_annotations(120),
+        max_workers=2,
+    )
+    stats = fake_github.stats()
+    assert stats["patch_requests"] == 6  # noqa: PLR2004
+    assert stats["annotations_received"] == 120 + 3 * 50  # incl. rejected attempts
+    assert fake_github.check_runs[0]["conclusion"] == "success"
+
+    # client errors aren't retried
+    gh_checks.start_check_run("abc123", "mypy-checks")
+    fake_github.inject_failures(422, method="PATCH")
+    with pytest.raises(HTTPError):
+        gh_checks.finish_check_run(CheckRunConclusion.SUCCESS)
+
+
+def test_finish_check_run_stops_uploading_on_rejected_batch(
+    fake_github,  # noqa: ANN001
+    app_privkey_pem: Path,
+    output_with_annotations: Callable[..., CheckRunOutput],
+) -> None:
+    gh_checks = GitHubChecks(
+        repo_base_url="https://github.com/jdoe/myproject",
+        app_id="1",
+        app_installation_id="2",
+        app_privkey_pem=app_privkey_pem,
+        github_api_base_url=fake_github.base_url,
+    )
+    gh_checks.start_check_run("abc123", "ruff-checks")
+    fake_github.latency_seconds = 0.02
+    fake_github.inject_failures(422, method="PATCH")
+    with pytest.raises(HTTPError):
+        gh_checks.finish_check_run(
+            CheckRunConclusion.SUCCESS,
+            output_with_annotations(1000),
+            max_workers=2,
+        )
+    # only the batches already in flight were sent, not all of the 20
+    assert fake_github.stats()["patch_requests"] <= 4  # noqa: PLR2004
+
+
+def test_concurrent_check_runs_back_off_independently(
+    fake_github,  # noqa: ANN001
+    app_privkey_pem: Path,
+    output_with_annotations: Callable[..., CheckRunOutput],
+) -> None:
+    gh_checks = GitHubChecks(
+        repo_base_url="https://github.com/jdoe/myproject",
+        app_id="1",
+        app_installation_id="2",
+        app_privkey_pem=app_privkey_pem,
+        github_api_base_url=fake_github.base_url,
+        scheduler=RequestScheduler(
+            requests_per_minute=60_000,
+            burst=1000,
+            backoff_base_seconds=0,
+        ),
+    )
+    updates = {
+        check_name: encode_check_run_updates(
+            check_name,
+            output_with_annotations(300),
+            CheckRunConclusion.SUCCESS,
+        )
+        for check_name in ("ruff-checks", "mypy-checks")
+    }
+    limiters_per_run: dict[str, set] = {}
+    throttled_limiters = []
+    send = RequestScheduler.send
+    release = _AdaptiveConcurrencyLimiter.release
+
+    def recording_send(
+        self: RequestScheduler,
+        session: Session,
+        method: str,
+        url: str,
+        **kwargs,
+    ) -> Response:
+        limiters_per_run.setdefault(url.rsplit("/", 1)[-1], set()).add(
+            kwargs.get("limiter"),
+        )
+        return send(self, session, method, url, **kwargs)
+
+    def recording_release(
+        self: _AdaptiveConcurrencyLimiter,
+        latency_seconds: float,
+        *,
+        throttled: bool,
+    ) -> None:
+        if throttled:
+            throttled_limiters.append(self)
+        release(self, latency_seconds, throttled=throttled)
+
+    fake_github.latency_seconds = 0.01
+    with (
+        patch.object(RequestScheduler, "send", recording_send),
+        patch.object(_AdaptiveConcurrencyLimiter, "release", recording_release),
+    ):
+        gh_checks.start_check_runs("abc123", ["ruff-checks", "mypy-checks"])
+        fake_github.inject_failures(429, count=4, method="PATCH", retry_after=0)
+        gh_checks.upload_check_runs_updates(updates, max_workers=3)
+
+    assert all(run["conclusion"] == "success" for run in fake_github.check_runs)
+    # the batches of each run, but its final one, went through a limiter of its own,
+    # which backed off on each of the rate limited batches of that run
+    run_limiters = [
+        limiters_per_run[str(run_id)] - {None}
+        for run_id in (run["id"] for run in fake_github.check_runs)
+    ]
+    assert all(len(limiters) == 1 for limiters in run_limiters)
+    assert run_limiters[0] != run_limiters[1]
+    assert len(throttled_limiters) == 4  # noqa: PLR2004
+    assert set(throttled_limiters) <= run_limiters[0] | run_limiters[1]
+
+
+def test_app_jwt_is_reused_until_key_file_changes(
+    app_privkey_pem: Path,
+    tmp_path: Path,
+) -> None:
+    pem_fp = tmp_path / "app.pem"
+    shutil.copy(app_privkey_pem, pem_fp)
+    with patch("jwt.jwk_from_pem", wraps=jwt.jwk_from_pem) as jwk_from_pem:
+        first_jwt = _generate_app_jwt_from_pem(pem_fp, "1", ttl_seconds=570)
+        assert _generate_app_jwt_from_pem(pem_fp, "1", ttl_seconds=570) == first_jwt
+        assert jwk_from_pem.call_count == 1
+
+        # e.g. a rotated key, which is loaded & signed with right away
+        os.utime(pem_fp, ns=(0, 0))
+        _generate_app_jwt_from_pem(pem_fp, "1", ttl_seconds=570)
+        assert jwk_from_pem.call_count == 2  # noqa: PLR2004
+
+
+def test_mint_installation_tokens_signs_once(
+    fake_github,  # noqa: ANN001
+    app_privkey_pem: Path,
+    tmp_path: Path,
+) -> None:
+    pem_fp = tmp_path / "app.pem"
+    shutil.copy(app_privkey_pem, pem_fp)
+    installation_ids = [str(i) for i in range(20)]
+    with patch("jwt.JWT.encode", autospec=True, wraps=jwt.JWT.encode) as encode:
+        tokens = mint_installation_tokens(
+            "1",
+            pem_fp,
+            installation_ids,
+            fake_github.base_url,
+            max_workers=4,
+            scheduler=RequestScheduler(requests_per_minute=60_000, burst=1000),
+        )
+    assert encode.call_count == 1
+    assert list(tokens) == installation_ids
+    assert all(token == "fake-token" for token, _ in tokens.values())  # noqa: S105
+    assert sorted(path for _, path, _ in fake_github.requests) == sorted(
+        f"/app/installations/{i}/access_tokens" for i in installation_ids
+    )
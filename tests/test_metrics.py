@@ -0,0 +1,94 @@
+# type: ignore  # noqa: PGH003
+# ruff: noqa: S101, D103, D100, INP001, ANN001
+import json
+import shutil
+from collections.abc import Iterator
+from pathlib import Path
+
+import pytest
+
+from github_checks.formatters.utils import filter_for_checksignore
+from github_checks.github_api import GitHubChecks, RequestScheduler
+from github_checks.metrics import MetricsCollector, register_hooks, unregister_hooks
+from github_checks.models import (
+    CheckRunConclusion,
+    CheckRunOutput,
+)
+
+
+@pytest.fixture
+def collector() -> Iterator[MetricsCollector]:
+    metrics_collector = MetricsCollector()
+    register_hooks(metrics_collector)
+    yield metrics_collector
+    unregister_hooks(metrics_collector)
+
+
+def test_collector_measures_upload_pipeline(
+    collector: MetricsCollector,
+    fake_github,
+    app_privkey_pem: Path,
+    tmp_path: Path,
+    output_with_annotations,
+) -> None:
+    # a key of its own, as app JWTs are reused per key file
+    pem_fp = tmp_path / "app.pem"
+    shutil.copy(app_privkey_pem, pem_fp)
+    gh_checks = GitHubChecks(
+        repo_base_url="https://github.com/jdoe/myproject",
+        app_id="1",
+        app_installation_id="2",
+        app_privkey_pem=pem_fp,
+        github_api_base_url=fake_github.base_url,
+        scheduler=RequestScheduler(requests_per_minute=60_000, burst=1000),
+    )
+    gh_checks.start_check_run("abc123", "ruff")
+    annotations = list(
+        filter_for_checksignore(
+            output_with_annotations(120).annotations,
+            ["*.md"],
+            tmp_path,
+        ),
+    )
+    gh_checks.finish_check_run(
+        CheckRunConclusion.SUCCESS,
+        CheckRunOutput(title="title", summary="summary", annotations=annotations),
+    )
+
+    snapshot = collector.snapshot()
+    # token exchange, start & 3 batches of annotations
+    assert snapshot["requests"] == 5  # noqa: PLR2004
+    assert snapshot["requests_failed"] == 0
+    assert snapshot["batches"] == 3  # noqa: PLR2004
+    assert snapshot["annotations"] == 120  # noqa: PLR2004
+    assert snapshot["annotations_per_second"] > 0
+    assert snapshot["bytes_sent"] > 120 * len("Warning message")
+    assert 0 < snapshot["request_seconds_p50"] <= snapshot["request_seconds_p95"]
+    assert set(snapshot["phase_seconds"]) == {
+        "jwt_signing",
+        "token_exchange",
+        "filtering",
+        "encoding",
+        "upload",
+    }
+
+    json_fp = tmp_path / "metrics.json"
+    collector.write(json_fp, "json", {"command": "finish-check-run"})
+    collector.write(json_fp, "json", {"command": "finish-check-run"})
+    lines = json_fp.read_text().splitlines()
+    assert len(lines) == 2  # noqa: PLR2004
+    assert json.loads(lines[0])["command"] == "finish-check-run"
+
+    prom_fp = tmp_path / "metrics.prom"
+    collector.write(prom_fp, "prometheus", {"command": "finish-check-run"})
+    prom_lines = prom_fp.read_text().splitlines()
+    assert 'github_checks_annotations{command="finish-check-run"} 120' in prom_lines
+    assert any(
+        line.startswith(
+            'github_checks_phase_seconds{command="finish-check-run",phase="upload"} ',
+        )
+        for line in prom_lines
+    )
+
+    collector.reset()
+    assert collector.snapshot()["requests"] == 0
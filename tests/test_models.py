@@ -0,0 +1,108 @@
+# type: ignore  # noqa: PGH003
+# ruff: noqa: S101, D103, D100, INP001, SLF001
+import pickle
+
+import pytest
+
+from github_checks.github_api import _encode_annotation, _infer_conclusion
+from github_checks.models import (
+    AnnotationLevel,
+    AnnotationStore,
+    CheckAnnotation,
+    CheckRunConclusion,
+    CheckRunOutput,
+)
+
+
+@pytest.fixture
+def annotations() -> list[CheckAnnotation]:
+    return [
+        CheckAnnotation(
+            path="src/módule.py",
+            message='Line too long, "quoted"\nand\tescaped \x01 €',
+            annotation_level=AnnotationLevel.WARNING,
+            start_line=3,
+            end_line=3,
+            start_column=89,
+            end_column=120,
+            title="[E501] line-too-long",
+            raw_details="Background for this rule",
+        ),
+        CheckAnnotation(
+            path="src/módule.py",
+            message="Unused import",
+            annotation_level=AnnotationLevel.NOTICE,
+        ),
+        CheckAnnotation(
+            path="README.md",
+            message="Broken link",
+            annotation_level=AnnotationLevel.FAILURE,
+            start_line=0,
+            end_line=7,
+            title="[E501] line-too-long",
+        ),
+    ]
+
+
+def test_annotation_store_sequence(annotations: list[CheckAnnotation]) -> None:
+    store = AnnotationStore(annotations)
+
+    assert len(store) == len(annotations)
+    assert store == annotations
+    assert annotations == store
+    assert store[-1] == annotations[-1]
+    assert store[1:] == annotations[1:]
+    assert store != annotations[:2]
+    with pytest.raises(IndexError):
+        store[3]
+
+
+def test_annotation_store_encoded(annotations: list[CheckAnnotation]) -> None:
+    store = AnnotationStore(annotations)
+
+    # identical to the annotations' own encoding, i.e. without unset & null fields
+    assert list(store.encoded()) == [
+        _encode_annotation(annotation) for annotation in annotations
+    ]
+
+
+def test_annotation_store_dedupes_strings(annotations: list[CheckAnnotation]) -> None:
+    store = AnnotationStore(annotations)
+    store.extend(AnnotationStore(annotations))
+    store.add(
+        "src/módule.py",
+        "Unused import",
+        AnnotationLevel.NOTICE,
+        start_line=1,
+        end_line=1,
+    )
+
+    assert len(store) == 7  # noqa: PLR2004
+    assert store._paths[0] is store._paths[1] is store._paths[3] is store._paths[6]
+    assert store._titles[0] is store._titles[2] is store._titles[5]
+    assert store[6] == CheckAnnotation(
+        path="src/módule.py",
+        message="Unused import",
+        annotation_level=AnnotationLevel.NOTICE,
+        start_line=1,
+        end_line=1,
+    )
+
+
+def test_annotation_store_in_output(annotations: list[CheckAnnotation]) -> None:
+    store = AnnotationStore(annotations)
+    output = CheckRunOutput(title="ruff", summary="Issues found", annotations=store)
+
+    assert output.annotations is store
+    assert list(store.annotation_levels()) == [
+        AnnotationLevel.WARNING,
+        AnnotationLevel.NOTICE,
+        AnnotationLevel.FAILURE,
+    ]
+    assert _infer_conclusion(store) == CheckRunConclusion.ACTION_REQUIRED
+    assert pickle.loads(pickle.dumps(output)).annotations == annotations  # noqa: S301
+    assert output.model_dump_json(exclude_none=True) == CheckRunOutput(
+        title="ruff",
+        summary="Issues found",
+        annotations=annotations,
+    ).model_dump_json(exclude_none=True)
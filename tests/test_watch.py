@@ -0,0 +1,52 @@
+# type: ignore  # noqa: PGH003
+# ruff: noqa: S101, D103, D100, INP001
+import threading
+import time
+from pathlib import Path
+
+from github_checks.watch import watch_log
+
+
+def test_watch_log_passes_on_lines_as_they_are_written(tmp_path: Path) -> None:
+    log_fp = tmp_path / "mypy.json"
+    batches: list[list[str]] = []
+    writer_done = threading.Event()
+
+    def write_log() -> None:
+        time.sleep(0.05)  # the log doesn't exist yet when watching starts
+        with log_fp.open("w", encoding="utf-8") as log_file:
+            for i in range(120):
+                log_file.write(f"line {i}\n")
+                if i % 60 == 59:  # noqa: PLR2004
+                    log_file.flush()
+                    time.sleep(0.05)
+            log_file.write("unterminated")
+        writer_done.set()
+
+    writer = threading.Thread(target=write_log)
+    writer.start()
+    lines_passed = watch_log(
+        log_fp,
+        batches.append,
+        flush_interval=3600,
+        poll_interval=0.01,
+        should_stop=writer_done.is_set,
+    )
+    writer.join()
+
+    lines = [line for batch in batches for line in batch]
+    assert lines == [f"line {i}" for i in range(120)] + ["unterminated"]
+    assert lines_passed == len(lines)
+    # partial batches are held back until the end, as the flush interval never passed
+    assert len(batches) >= 2  # noqa: PLR2004
+    assert all(len(batch) >= 50 for batch in batches[:-1])  # noqa: PLR2004
+
+
+def test_watch_log_stops_once_writer_exited(tmp_path: Path) -> None:
+    log_fp = tmp_path / "mypy.json"
+    log_fp.write_text("first\nsecond\n", encoding="utf-8")
+    batches: list[list[str]] = []
+    # a PID which can't be running, as PIDs are capped well below it
+    lines_passed = watch_log(log_fp, batches.append, writer_pid=2**22 + 1)
+    assert batches == [["first", "second"]]
+    assert lines_passed == 2  # noqa: PLR2004